@@ -1,639 +1,976 @@
-import pandas as pd
-import customtkinter
-from PIL import Image
-import unicodedata
-import os
-import random
-
-# Leer el dataset ampliado
-try:
-    df = pd.read_csv("DATASET.csv", encoding='latin1')
-except FileNotFoundError:
-    print("❌ Error: No se encontró ningún archivo de dataset")
-    exit()
-
-
-# Preprocesamiento mejorado
-def preprocesar_datos(df):
-    # Limpieza de precios
-    df["Cars Prices"] = df["Cars Prices"].astype(str).str.replace("[$,]", "", regex=True)
-    df["Cars Prices"] = pd.to_numeric(df["Cars Prices"].replace('', '0'), errors='coerce')
-    
-    # Limpieza de caballos de fuerza
-    df["HorsePower"] = df["HorsePower"].astype(str).str.extract(r'(\d+)')
-    df["HorsePower"] = pd.to_numeric(df["HorsePower"], errors='coerce')
-    
-    # Limpieza de asientos
-    df["Seats"] = df["Seats"].astype(str).str.extract(r'(\d+)')
-    df["Seats"] = pd.to_numeric(df["Seats"], errors='coerce')
-    
-    # Limpieza de torque
-    if 'Torque' in df.columns:
-        df["Torque"] = df["Torque"].fillna('N/A')
-    
-    # Limpieza de performance
-    if 'Performance(0 - 100 )KM/H' in df.columns:
-        df['Performance(0 - 100 )KM/H'] = df['Performance(0 - 100 )KM/H'].fillna('N/A')
-    
-    # Limpieza de marcas
-    df["Company Names"] = df["Company Names"].str.strip().fillna('Desconocido')
-    
-    return df.dropna(subset=["Company Names", "Cars Prices"])
-
-df = preprocesar_datos(df)
-
-# Obtener opciones disponibles para filtros
-combustibles_disponibles = sorted(df["Fuel Types"].astype(str).str.strip().str.lower().dropna().unique())
-marcas_disponibles = sorted(df["Company Names"].astype(str).str.strip().str.lower().dropna().unique())
-
-# Convertir a título para mejor presentación
-marcas_disponibles = [marca.title() for marca in marcas_disponibles]
-combustibles_disponibles = [comb.title() for comb in combustibles_disponibles]
-
-# Valores mínimos y máximos
-min_precio, max_precio = int(df["Cars Prices"].min()), int(df["Cars Prices"].max())
-min_asientos, max_asientos = int(df["Seats"].min()), int(df["Seats"].max())
-min_hp, max_hp = int(df["HorsePower"].min()), int(df["HorsePower"].max())
-
-# Sistema de ponderación
-PESOS = {
-    'precio': 0.35,
-    'caballos_fuerza': 0.25,
-    'asientos': 0.15,
-    'combustible': 0.15,
-    'marca': 0.10
-}
-
-# Inicializar customtkinter
-customtkinter.set_appearance_mode("system")
-customtkinter.set_default_color_theme("blue")
-
-# Normalizador mejorado
-def normalizar(texto):
-    if not isinstance(texto, str):
-        return ""
-    texto = texto.lower().strip()
-    texto = unicodedata.normalize('NFD', texto).encode('ascii', 'ignore').decode('utf-8')
-    return texto
-
-# Variables globales
-respuestas = {
-    "presupuesto_min": 0,
-    "presupuesto_max": float('inf'),
-    "combustible": "",
-    "asientos": 0,
-    "marca": "",
-    "hp_min": 0,
-    "hp_max": float('inf')
-}
-
-# Banco de explicaciones ampliado y variado
-BANCO_EXPLICACIONES = {
-    'precio': [
-        ("Excelente relación precio-calidad", 0.8),
-        ("Oferta destacada en su rango de precios", 0.75),
-        ("Buena opción económica", 0.6),
-        ("Precio competitivo para sus características", 0.55),
-        ("Precio algo elevado pero justificado", 0.4),
-        ("Precio superior al promedio del mercado", 0.3)
-    ],
-    'caballos_fuerza': [
-        ("Potencia excepcional para su categoría", 0.85),
-        ("Alto rendimiento motor", 0.8),
-        ("Potencia más que suficiente", 0.7),
-        ("Balance ideal entre potencia y eficiencia", 0.6),
-        ("Potencia adecuada para uso cotidiano", 0.5),
-        ("Potencia modesta pero eficiente", 0.4)
-    ],
-    'asientos': [
-        ("Amplio espacio para familias numerosas", 7),
-        ("Ideal para familias grandes", 6),
-        ("Buen espacio para familia", 5),
-        ("Cómodo para pequeños grupos", 4),
-        ("Configuración práctica", 3),
-        ("Compacto pero funcional", 2)
-    ],
-    'combustible': [
-        ("Combustible preferido ({}) - Eficiente", 1),
-        ("Tecnología {} avanzada", 1),
-        ("Sistema {} de última generación", 1),
-        ("Motorización {} optimizada", 1),
-        ("Eficiencia en consumo de {}", 1)
-    ],
-    'marca': [
-        ("Marca preferida ({}) - Alta confiabilidad", 1),
-        ("{} reconocida por su calidad", 1),
-        ("Excelente reputación de {}", 1),
-        ("Tecnología {} de vanguardia", 1),
-        ("Servicio postventa {} destacado", 1)
-    ],
-    'general': [
-        "Elección muy bien valorada por expertos",
-        "Opción destacada en pruebas de manejo",
-        "Incluye tecnología de última generación",
-        "Sistema de seguridad muy completo",
-        "Diseño ergonómico y funcional",
-        "Bajo costo de mantenimiento",
-        "Alto valor de reventa",
-        "Paquete de conectividad avanzado",
-        "Sistema de infoentretenimiento premium",
-        "Asistencia a la conducción inteligente",
-        "Materiales de alta calidad en interior",
-        "Garantía extendida incluida",
-        "Bajas emisiones contaminantes",
-        "Suspensión optimizada para confort",
-        "Sistema de frenado de alto desempeño"
-    ]
-}
-
-# Función para generar explicaciones mejorada y más variada
-def generar_explicacion(fila):
-    explicaciones = []
-    
-    # Explicaciones específicas por criterio
-    if 'score_precio' in fila:
-        for msg, umbral in BANCO_EXPLICACIONES['precio']:
-            if fila['score_precio'] >= umbral:
-                explicaciones.append(msg)
-                break
-    
-    if 'score_hp' in fila:
-        for msg, umbral in BANCO_EXPLICACIONES['caballos_fuerza']:
-            if fila['score_hp'] >= umbral:
-                explicaciones.append(msg)
-                break
-    
-    if 'Seats' in fila:
-        for msg, umbral in BANCO_EXPLICACIONES['asientos']:
-            if fila['Seats'] >= umbral:
-                explicaciones.append(msg)
-                break
-    
-    if fila.get('score_combustible', 0) == 1:
-        msg = random.choice(BANCO_EXPLICACIONES['combustible'])[0]
-        explicaciones.append(msg.format(fila['Fuel Types']))
-    
-    if fila.get('score_marca', 0) == 1:
-        msg = random.choice(BANCO_EXPLICACIONES['marca'])[0]
-        explicaciones.append(msg.format(fila['Company Names']))
-    
-    # Añadir explicaciones generales aleatorias (2-3)
-    explicaciones_generales = random.sample(BANCO_EXPLICACIONES['general'], k=random.randint(2, 3))
-    explicaciones.extend(explicaciones_generales)
-    
-    # Determinar emoji de recomendación
-    puntuacion = fila.get('puntuacion_total', 0)
-    if puntuacion >= 80:
-        emoji = "🏆 RECOMENDACIÓN TOP"
-    elif puntuacion >= 50:
-        emoji = "👍 BUENA OPCIÓN"
-    else:
-        emoji = "⚠️ CONSIDERA OTRAS OPCIONES"
-    
-    return f"{emoji}\n💡 " + " | ".join(explicaciones)
-
-# Función para calcular puntuación mejorada
-def calcular_puntuacion(df_resultados):
-    df = df_resultados.copy()
-    
-    # Puntuación por precio (menor precio = mayor puntuación)
-    if respuestas["presupuesto_max"] < float('inf'):
-        precio_max = respuestas["presupuesto_max"]
-    else:
-        precio_max = df["Cars Prices"].max() * 1.1
-    
-    df['score_precio'] = 1 - (df["Cars Prices"] / precio_max)
-    
-    # Puntuación por caballos de fuerza
-    if respuestas["hp_max"] < float('inf'):
-        hp_max = respuestas["hp_max"]
-    else:
-        hp_max = df["HorsePower"].max()
-    
-    df['score_hp'] = df["HorsePower"] / hp_max if hp_max > 0 else 0
-    
-    # Puntuación por asientos
-    if respuestas["asientos"] > 0:
-        asientos_min = respuestas["asientos"]
-    else:
-        asientos_min = df["Seats"].min()
-    
-    asientos_max = df["Seats"].max()
-    df['score_asientos'] = (df["Seats"] - asientos_min) / (asientos_max - asientos_min) if (asientos_max - asientos_min) > 0 else 0
-    
-    # Puntuación por combustible y marca (con normalización)
-    df['score_combustible'] = (df["Fuel Types"].astype(str).str.lower().str.strip() == normalizar(respuestas["combustible"])).astype(int)
-    df['score_marca'] = (df["Company Names"].astype(str).str.lower().str.strip() == normalizar(respuestas["marca"])).astype(int)
-    
-    # Puntuación total ponderada
-    df['puntuacion_total'] = (
-        df['score_precio'] * PESOS['precio'] +
-        df['score_hp'] * PESOS['caballos_fuerza'] +
-        df['score_asientos'] * PESOS['asientos'] +
-        df['score_combustible'] * PESOS['combustible'] +
-        df['score_marca'] * PESOS['marca']
-    ) * 100
-    
-    return df.round({'puntuacion_total': 2})
-
-# Función de recomendación mejorada
-def recomendar_vehiculos():
-    resultados = df.copy()
-    
-    # Aplicar filtros con manejo de mayúsculas/minúsculas
-    if respuestas["presupuesto_min"] > 0 or respuestas["presupuesto_max"] < float('inf'):
-        resultados = resultados[
-            (resultados["Cars Prices"] >= respuestas["presupuesto_min"]) & 
-            (resultados["Cars Prices"] <= respuestas["presupuesto_max"])
-        ]
-    
-    if respuestas["hp_min"] > 0 or respuestas["hp_max"] < float('inf'):
-        resultados = resultados[
-            (resultados["HorsePower"] >= respuestas["hp_min"]) & 
-            (resultados["HorsePower"] <= respuestas["hp_max"])
-        ]
-    
-    if respuestas["combustible"] != "":
-        resultados = resultados[
-            resultados["Fuel Types"].astype(str).str.lower().str.strip() == normalizar(respuestas["combustible"])
-        ]
-    
-    if respuestas["asientos"] > 0:
-        resultados = resultados[resultados["Seats"] >= respuestas["asientos"]]
-    
-    if respuestas["marca"] != "":
-        resultados = resultados[
-            resultados["Company Names"].astype(str).str.lower().str.strip() == normalizar(respuestas["marca"])
-        ]
-    
-    # Calcular puntuación si hay resultados
-    if not resultados.empty:
-        resultados = calcular_puntuacion(resultados)
-        return resultados.sort_values(by=['puntuacion_total', 'Cars Prices'], ascending=[False, True])
-    
-    return resultados
-
-# Crear ventanas
-ventana = customtkinter.CTk()
-ventana.geometry("1100x800")  # Ventana más grande
-ventana.title("Asesor Inteligente de CAR DEALER")
-
-# Contenedor de frames
-frames = {}
-
-# ================= INICIO =================
-inicio = customtkinter.CTkFrame(ventana)
-frames["inicio"] = inicio
-
-label = customtkinter.CTkLabel(inicio, text="Bienvenido al Asesor Inteligente de CAR DEALER",
-                             font=("Arial", 20), justify="center")
-label.pack(pady=40)
-
-try:
-    img_inicio = customtkinter.CTkImage(Image.open("assets/logo.png"), size=(300, 200))
-    label_img = customtkinter.CTkLabel(inicio, image=img_inicio, text="")
-    label_img.pack(pady=10)
-except:
-    pass
-
-label = customtkinter.CTkLabel(inicio, text="\nTe ayudaré a encontrar el vehículo ideal según tus necesidades", 
-                             font=("Arial", 20), justify="center")
-label.pack(pady=40)
-
-boton_empezar = customtkinter.CTkButton(inicio, text="🚗 Empezar", text_color=("#7AF04B"), fg_color=("#004E00"), command=lambda: mostrar_filtro("presupuesto"))
-boton_empezar.pack(pady=10)
-
-boton_salir = customtkinter.CTkButton(inicio, text="❌ Salir", text_color=("#E76969"), fg_color=("#530000"), command=ventana.destroy)
-boton_salir.pack(pady=10)
-
-# ================= FILTROS =================
-def mostrar_filtro(filtro):
-    frame = customtkinter.CTkFrame(ventana)
-    frames[f"filtro_{filtro}"] = frame
-    for f in frames.values():
-        f.pack_forget()
-    frame.pack(fill="both", expand=True)
-
-    # Diccionario de preguntas
-    pregunta = {
-        "presupuesto": "¿Deseas establecer un rango de presupuesto?",
-        "combustible": "¿Deseas elegir un tipo de combustible?",
-        "asientos": "¿Deseas establecer un número mínimo de asientos?",
-        "marca": "¿Deseas filtrar por marca?",
-        "hp": "¿Deseas establecer un rango de caballos de fuerza?"
-    }[filtro]
-
-    # Diccionario de imágenes (rutas a los archivos)
-    imagenes = {
-        "presupuesto": "assets/presupuesto.png",
-        "combustible": "assets/combustible.png",
-        "asientos": "assets/asientos.png",
-        "marca": "assets/marca.png",
-        "hp": "assets/hp.png"
-    }
-
-    customtkinter.CTkLabel(frame, text=pregunta, font=("Arial", 18)).pack(pady=40)
-
-    try:
-        # Cargar la imagen específica para el filtro actual
-        img_path = imagenes[filtro]
-        img = customtkinter.CTkImage(Image.open(img_path), size=(250, 180))
-        customtkinter.CTkLabel(frame, image=img, text="").pack(pady=10)
-    except Exception as e:
-        print(f"No se pudo cargar la imagen: {e}")
-        # Opcional: cargar una imagen por defecto si la específica falla
-        try:
-            img = customtkinter.CTkImage(Image.open("assets/filtro.png"), size=(250, 180))
-            customtkinter.CTkLabel(frame, image=img, text="").pack(pady=10)
-        except:
-            pass
-
-    customtkinter.CTkButton(frame, text="Sí", text_color=("#7AF04B"), fg_color=("#004E00"), command=lambda: mostrar_pregunta(filtro)).pack(pady=10)
-    customtkinter.CTkButton(frame, text="No", text_color=("#E76969"), fg_color=("#530000"), command=lambda: siguiente_filtro(filtro)).pack(pady=10)
-
-# ================= PREGUNTAS =================
-def mostrar_pregunta(filtro):
-    frame = customtkinter.CTkFrame(ventana)
-    frames[f"pregunta_{filtro}"] = frame
-    for f in frames.values():
-        f.pack_forget()
-    frame.pack(fill="both", expand=True)
-
-    if filtro == "presupuesto":
-        customtkinter.CTkLabel(frame, text=f"Establece tu rango de presupuesto (USD {min_precio:,} - {max_precio:,})", 
-                             font=("Arial", 18)).pack(pady=20)
-        
-        input_frame = customtkinter.CTkFrame(frame)
-        input_frame.pack(pady=10)
-        
-        customtkinter.CTkLabel(input_frame, text="Mínimo:", font=("Arial", 14)).grid(row=0, column=0, padx=5, pady=5)
-        min_entry = customtkinter.CTkEntry(input_frame, placeholder_text=f" {min_precio:,}")
-        min_entry.grid(row=0, column=1, padx=5, pady=5)
-        customtkinter.CTkLabel(input_frame, text="USD", font=("Arial", 14)).grid(row=0, column=2, padx=5, pady=5)
-        
-        customtkinter.CTkLabel(input_frame, text="Máximo:", font=("Arial", 14)).grid(row=1, column=0, padx=5, pady=5)
-        max_entry = customtkinter.CTkEntry(input_frame, placeholder_text=f" {max_precio:,}")
-        max_entry.grid(row=1, column=1, padx=5, pady=5)
-        customtkinter.CTkLabel(input_frame, text="USD", font=("Arial", 14)).grid(row=1, column=2, padx=5, pady=5)
-        
-        def guardar_presupuesto():
-            try:
-                min_val = float(min_entry.get()) if min_entry.get() else 0
-                max_val = float(max_entry.get()) if max_entry.get() else float('inf')
-                
-                if min_val > max_val:
-                    min_val, max_val = max_val, min_val
-                
-                respuestas["presupuesto_min"] = max(min_val, 0)
-                respuestas["presupuesto_max"] = max_val
-                siguiente_filtro(filtro)
-            except ValueError:
-                respuestas["presupuesto_min"] = 0
-                respuestas["presupuesto_max"] = float('inf')
-                siguiente_filtro(filtro)
-                
-        customtkinter.CTkButton(frame, text="Siguiente", text_color=("#7AF04B"), fg_color=("#004E00"), command=guardar_presupuesto).pack(pady=20)
-        
-    elif filtro == "asientos":
-        customtkinter.CTkLabel(frame, text=f"Selecciona el número mínimo de asientos ({min_asientos}-{max_asientos})", 
-                             font=("Arial", 16)).pack(pady=20)
-        
-        slider = customtkinter.CTkSlider(
-            frame, 
-            from_=min_asientos, 
-            to=max_asientos,
-            number_of_steps=max_asientos-min_asientos,
-            command=lambda value: slider_label.configure(text=f"Asientos: {int(value)}")
-        )
-        slider.set(min_asientos)
-        slider.pack(pady=10)
-        
-        slider_label = customtkinter.CTkLabel(frame, text=f"Asientos: {min_asientos}")
-        slider_label.pack()
-        
-        def guardar_asientos():
-            respuestas["asientos"] = int(slider.get())
-            siguiente_filtro(filtro)
-            
-        customtkinter.CTkButton(frame, text="Siguiente", text_color=("#7AF04B"), fg_color=("#004E00"), command=guardar_asientos).pack(pady=20)
-        
-    elif filtro == "hp":
-        customtkinter.CTkLabel(frame, text=f"Establece tu rango de caballos de fuerza ({min_hp}-{max_hp} hp)", 
-                             font=("Arial", 18)).pack(pady=20)
-        
-        input_frame = customtkinter.CTkFrame(frame)
-        input_frame.pack(pady=10)
-        
-        customtkinter.CTkLabel(input_frame, text="Mínimo:", font=("Arial", 14)).grid(row=0, column=0, padx=5, pady=5)
-        min_entry = customtkinter.CTkEntry(input_frame, placeholder_text=f" {min_hp}")
-        min_entry.grid(row=0, column=1, padx=5, pady=5)
-        customtkinter.CTkLabel(input_frame, text="hp", font=("Arial", 14)).grid(row=0, column=2, padx=5, pady=5)
-        
-        customtkinter.CTkLabel(input_frame, text="Máximo:", font=("Arial", 14)).grid(row=1, column=0, padx=5, pady=5)
-        max_entry = customtkinter.CTkEntry(input_frame, placeholder_text=f" {max_hp}")
-        max_entry.grid(row=1, column=1, padx=5, pady=5)
-        customtkinter.CTkLabel(input_frame, text="hp", font=("Arial", 14)).grid(row=1, column=2, padx=5, pady=5)
-        
-        def guardar_hp():
-            try:
-                min_val = float(min_entry.get()) if min_entry.get() else 0
-                max_val = float(max_entry.get()) if max_entry.get() else float('inf')
-                
-                if min_val > max_val:
-                    min_val, max_val = max_val, min_val
-                
-                respuestas["hp_min"] = max(min_val, 0)
-                respuestas["hp_max"] = max_val
-                siguiente_filtro(filtro)
-            except ValueError:
-                respuestas["hp_min"] = 0
-                respuestas["hp_max"] = float('inf')
-                siguiente_filtro(filtro)
-                
-        customtkinter.CTkButton(frame, text="Siguiente", text_color=("#7AF04B"), fg_color=("#004E00"), command=guardar_hp).pack(pady=20)
-        
-    elif filtro == "combustible":
-        customtkinter.CTkLabel(frame, text="Selecciona el tipo de combustible:", font=("Arial", 16)).pack(pady=20)
-        
-        combobox = customtkinter.CTkComboBox(
-            frame,
-            values=combustibles_disponibles,
-            state="readonly"
-        )
-        combobox.pack(pady=10)
-        
-        def guardar_combustible():
-            respuestas[filtro] = combobox.get().lower()  # Guardar en minúsculas para comparación
-            siguiente_filtro(filtro)
-            
-        customtkinter.CTkButton(frame, text="Siguiente", text_color=("#7AF04B"), fg_color=("#004E00"), command=guardar_combustible).pack(pady=20)
-        
-    elif filtro == "marca":
-        customtkinter.CTkLabel(frame, text="Selecciona la marca:", font=("Arial", 16)).pack(pady=20)
-        
-        combobox = customtkinter.CTkComboBox(
-            frame,
-            values=marcas_disponibles,
-            state="readonly"
-        )
-        combobox.pack(pady=10)
-        
-        def guardar_marca():
-            respuestas[filtro] = combobox.get().lower()  # Guardar en minúsculas para comparación
-            siguiente_filtro(filtro)
-            
-        customtkinter.CTkButton(frame, text="Siguiente", text_color=("#7AF04B"), fg_color=("#004E00"), command=guardar_marca).pack(pady=20)
-
-# ================= SUGERENCIAS =================
-def mostrar_sugerencias():
-    frame = customtkinter.CTkFrame(ventana)
-    frames["sugerencias"] = frame
-    for f in frames.values():
-        f.pack_forget()
-    frame.pack(fill="both", expand=True)
-
-    # Botón de volver al inicio EN LA PARTE SUPERIOR (fijo)
-    boton_volver = customtkinter.CTkButton(frame, text="← Volver al inicio", 
-                                         command=lambda: [resetear_filtros(), mostrar_ventana("inicio")],
-                                         fg_color="#ff7b00", hover_color="#3a3a3a",
-                                         font=("Arial", 14, "bold"))
-    boton_volver.pack(pady=10, padx=20, anchor="w")
-
-    resultados = recomendar_vehiculos()
-    num_resultados = len(resultados)
-    
-    # Mostrar resumen de filtros aplicados
-    filtros_aplicados = []
-    if respuestas["presupuesto_min"] > 0 or respuestas["presupuesto_max"] < float('inf'):
-        min_str = f"${respuestas['presupuesto_min']:,.0f}" if respuestas["presupuesto_min"] > 0 else "sin mínimo"
-        max_str = f"${respuestas['presupuesto_max']:,.0f}" if respuestas["presupuesto_max"] < float('inf') else "sin máximo"
-        filtros_aplicados.append(f"Presupuesto: {min_str} - {max_str}")
-    if respuestas["combustible"]:
-        filtros_aplicados.append(f"Combustible: {respuestas['combustible'].title()}")
-    if respuestas["asientos"] > 0:
-        filtros_aplicados.append(f"Asientos: ≥ {respuestas['asientos']}")
-    if respuestas["marca"]:
-        filtros_aplicados.append(f"Marca: {respuestas['marca'].title()}")
-    if respuestas["hp_min"] > 0 or respuestas["hp_max"] < float('inf'):
-        min_str = f"{respuestas['hp_min']}" if respuestas["hp_min"] > 0 else "sin mínimo"
-        max_str = f"{respuestas['hp_max']}" if respuestas["hp_max"] < float('inf') else "sin máximo"
-        filtros_aplicados.append(f"Caballos de fuerza: {min_str} - {max_str} hp")
-    
-    if filtros_aplicados:
-        lbl_filtros = customtkinter.CTkLabel(frame, text="Filtros aplicados: " + ", ".join(filtros_aplicados), 
-                                           font=("Arial", 14))
-        lbl_filtros.pack(pady=(0, 10), padx=20, anchor="w")
-
-    lbl_titulo = customtkinter.CTkLabel(frame, 
-                                      text=f"Vehículos Sugeridos ({min(num_resultados, 10)} de {num_resultados} resultados)", 
-                                      font=("Arial", 22, "bold"))
-    lbl_titulo.pack(pady=(0, 20), padx=20, anchor="w")
-
-    if num_resultados == 0:
-        lbl_error = customtkinter.CTkLabel(frame, 
-                                         text="❌ No se encontraron autos que coincidan con tus preferencias.", 
-                                         font=("Arial", 16))
-        lbl_error.pack(pady=20, padx=20)
-        
-        # Sugerir relajar filtros
-        sugerencia_frame = customtkinter.CTkFrame(frame)
-        sugerencia_frame.pack(pady=10, padx=20, fill="x")
-        
-        lbl_sugerencia = customtkinter.CTkLabel(sugerencia_frame, text="Prueba:", 
-                                              font=("Arial", 14, "bold"))
-        lbl_sugerencia.pack(anchor="w")
-        
-        consejos = customtkinter.CTkLabel(sugerencia_frame, 
-                                        text="• Aumentar tu presupuesto máximo\n• Considerar otros tipos de combustible\n• Reducir los caballos de fuerza requeridos\n• Flexibilizar la marca preferida", 
-                                        justify="left")
-        consejos.pack(anchor="w")
-    else:
-        scroll_frame = customtkinter.CTkScrollableFrame(frame, width=1000, height=550)
-        scroll_frame.pack(pady=(0, 20), padx=20, fill="both", expand=True)
-
-        # Limitar a 10 sugerencias como máximo
-        for _, fila in resultados.head(10).iterrows():
-            explicacion = generar_explicacion(fila)
-            
-            # Obtener todos los campos con manejo seguro de valores faltantes
-            company = fila.get('Company Names', 'N/A')
-            car_name = fila.get('Cars Names', 'N/A')
-            engine = fila.get('Engines', 'N/A')
-            cc_battery = fila.get('CC/Battery Capacity', 'N/A')
-            horsepower = fila.get('HorsePower', 'N/A')
-            total_speed = fila.get('Total Speed', 'N/A')
-            performance = fila.get('Performance(0 - 100 )KM/H', 'N/A')
-            price = fila.get('Cars Prices', 'N/A')
-            fuel = fila.get('Fuel Types', 'N/A')
-            seats = fila.get('Seats', 'N/A')
-            torque = fila.get('Torque', 'N/A')
-            
-            # Formatear valores numéricos
-            try:
-                price_str = f"${float(price):,.0f}" if str(price).replace('.','').isdigit() else str(price)
-                horsepower_str = f"{int(horsepower)} hp" if str(horsepower).isdigit() else str(horsepower)
-                seats_str = str(int(seats)) if str(seats).replace('.','').isdigit() else str(seats)
-            except:
-                price_str = str(price)
-                horsepower_str = str(horsepower)
-                seats_str = str(seats)
-            
-            auto_info = (
-                f"🔹 {company} {car_name}\n"
-                f"⭐ Puntuación total: {fila.get('puntuacion_total', 'N/A')}%\n"
-                f"{explicacion}\n\n"
-                f"📌 ESPECIFICACIONES TÉCNICAS:\n"
-                f"⚙️ Motor: {engine}\n"
-                f"🔋 CC/Capacidad Batería: {cc_battery}\n"
-                f"🏇 Caballos de fuerza: {horsepower_str}\n"
-                f"🚀 Velocidad máxima: {total_speed}\n"
-                f"⏱️ Aceleración (0-100 km/h): {performance}\n"
-                f"🔧 Torque: {torque}\n\n"
-                f"💵 INFORMACIÓN GENERAL:\n"
-                f"💲 Precio: {price_str}\n"
-                f"⛽ Combustible: {fuel}\n"
-                f"🪑 Asientos: {seats_str}\n"
-                + "─" * 100
-            )
-            
-            etiqueta = customtkinter.CTkLabel(scroll_frame, text=auto_info, anchor="w", justify="left", 
-                                            font=("Arial", 14))
-            etiqueta.pack(pady=10, anchor="w", padx=10, fill="x")
-
-    # Botón de volver al inicio también en la parte inferior
-    boton_volver_abajo = customtkinter.CTkButton(frame, text="← Volver al inicio", 
-                                               command=lambda: [resetear_filtros(), mostrar_ventana("inicio")],
-                                               fg_color="#ff7b00", hover_color="#3a3a3a",
-                                               font=("Arial", 14, "bold"))
-    boton_volver_abajo.pack(pady=20, side="bottom")
-
-# Función para resetear los filtros
-def resetear_filtros():
-    respuestas.update({
-        "presupuesto_min": 0,
-        "presupuesto_max": float('inf'),
-        "combustible": "",
-        "asientos": 0,
-        "marca": "",
-        "hp_min": 0,
-        "hp_max": float('inf')
-    })
-
-# ================= FLUJO =================
-def siguiente_filtro(actual):
-    orden = ["presupuesto", "combustible", "asientos", "marca", "hp"]
-    idx = orden.index(actual)
-    if idx + 1 < len(orden):
-        mostrar_filtro(orden[idx + 1])
-    else:
-        mostrar_sugerencias()
-
-def mostrar_ventana(nombre):
-    for f in frames.values():
-        f.pack_forget()
-    frames[nombre].pack(fill="both", expand=True)
-
-# Iniciar app
-resetear_filtros()
-mostrar_ventana("inicio")
-ventana.mainloop()
\ No newline at end of file
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import customtkinter
+
+import metricas
+import motor
+import perfiles_pesos
+from imagenes import lista, obtener_imagen, precargar
+from lista_virtual import ListaVirtual
+from motor import (RESPUESTAS_POR_DEFECTO, VistaPrevia, cargar_catalogo, generar_explicaciones,
+                   texto_resultado)
+from recarga import CatalogoVivo, VigilanteCatalogo
+
+# El catálogo y la ventana se crean en crear_ventana() (ver main al final):
+# importar este módulo no lee el dataset ni abre ninguna ventana. Los cambios
+# de DATASET.csv y de la carpeta deltas/ se aplican en segundo plano y cada
+# pantalla toma catalogo_vivo.actual (opciones, mínimos y máximos) al mostrarse.
+catalogo_vivo = None
+ventana = None
+
+# Variables globales
+respuestas = dict(RESPUESTAS_POR_DEFECTO)
+
+# La ventana es un cliente delgado del motor: le pasa las respuestas actuales
+def calcular_puntuacion(df_resultados):
+    return motor.calcular_puntuacion(df_resultados, respuestas)
+
+def recomendar_vehiculos():
+    return motor.recomendar_vehiculos(respuestas, catalogo_vivo.actual)
+
+# Imágenes del asistente (dentro de assets.zip) y tamaños en que se muestran
+LOGO = ("assets/logo.png", (300, 200))
+IMAGENES_FILTROS = {
+    "presupuesto": "assets/presupuesto.png",
+    "combustible": "assets/combustible.png",
+    "asientos": "assets/asientos.png",
+    "marca": "assets/marca.png",
+    "hp": "assets/hp.png"
+}
+TAMANO_FILTRO = (250, 180)
+
+# Contenedor de frames: cada pantalla se construye la primera vez y se reutiliza
+frames = {}
+
+# Funciones que devuelven cada pantalla de pregunta a su estado inicial y que
+# la preparan al mostrarla (recuento incluido)
+reinicios = {}
+preparaciones = {}
+
+# Lee el catálogo y crea la ventana con la pantalla de inicio (sin arrancar el
+# bucle de eventos)
+def crear_ventana():
+    global catalogo_vivo, ventana
+    # Leer y preprocesar el dataset ampliado
+    try:
+        # Cada catálogo recargado llega con el buscador de marcas y modelos
+        # construido: la búsqueda mientras se escribe corre en la ventana
+        catalogo_vivo = CatalogoVivo(cargar_catalogo(), preparar=lambda catalogo: catalogo.buscador_modelos)
+    except FileNotFoundError:
+        print("❌ Error: No se encontró ningún archivo de dataset")
+        exit()
+
+    # Decodificar las imágenes en segundo plano mientras se construye la primera pantalla
+    precargar([LOGO] + [(ruta, TAMANO_FILTRO) for ruta in IMAGENES_FILTROS.values()])
+
+    # Inicializar customtkinter
+    customtkinter.set_appearance_mode("system")
+    customtkinter.set_default_color_theme("blue")
+
+    ventana = customtkinter.CTk()
+    ventana.geometry("1100x800")  # Ventana más grande
+    ventana.title("Asesor Inteligente de CAR DEALER")
+    construir_inicio()
+    return ventana
+
+# ================= INICIO =================
+def construir_inicio():
+    inicio = customtkinter.CTkFrame(ventana)
+    frames["inicio"] = inicio
+
+    label = customtkinter.CTkLabel(inicio, text="Bienvenido al Asesor Inteligente de CAR DEALER",
+                                 font=("Arial", 20), justify="center")
+    label.pack(pady=40)
+
+    # El logo se coloca en cuanto termina de decodificarse (el hueco ya está reservado)
+    label_img = customtkinter.CTkLabel(inicio, text="", width=LOGO[1][0], height=LOGO[1][1])
+    label_img.pack(pady=10)
+
+    def colocar_logo():
+        if not lista(*LOGO):
+            ventana.after(50, colocar_logo)
+            return
+        img_inicio = obtener_imagen(*LOGO)
+        if img_inicio is not None:
+            label_img.configure(image=img_inicio)
+
+    colocar_logo()
+
+    label = customtkinter.CTkLabel(inicio, text="\nTe ayudaré a encontrar el vehículo ideal según tus necesidades", 
+                                 font=("Arial", 20), justify="center")
+    label.pack(pady=40)
+
+    boton_empezar = customtkinter.CTkButton(inicio, text="🚗 Empezar", text_color=("#7AF04B"), fg_color=("#004E00"), command=lambda: mostrar_filtro("presupuesto"))
+    boton_empezar.pack(pady=10)
+
+    boton_salir = customtkinter.CTkButton(inicio, text="❌ Salir", text_color=("#E76969"), fg_color=("#530000"), command=ventana.destroy)
+    boton_salir.pack(pady=10)
+
+# ================= FILTROS =================
+def mostrar_filtro(filtro):
+    nombre = f"filtro_{filtro}"
+    if nombre not in frames:
+        construir_filtro(filtro)
+    mostrar_ventana(nombre)
+
+def construir_filtro(filtro):
+    frame = customtkinter.CTkFrame(ventana)
+    frames[f"filtro_{filtro}"] = frame
+
+    # Diccionario de preguntas
+    pregunta = {
+        "presupuesto": "¿Deseas establecer un rango de presupuesto?",
+        "combustible": "¿Deseas elegir un tipo de combustible?",
+        "asientos": "¿Deseas establecer un número mínimo de asientos?",
+        "marca": "¿Deseas filtrar por marca?",
+        "hp": "¿Deseas establecer un rango de caballos de fuerza?"
+    }[filtro]
+
+    customtkinter.CTkLabel(frame, text=pregunta, font=("Arial", 18)).pack(pady=40)
+
+    # Imagen específica para el filtro actual (o la de por defecto si falla)
+    img = obtener_imagen(IMAGENES_FILTROS[filtro], TAMANO_FILTRO) or obtener_imagen("assets/filtro.png", TAMANO_FILTRO)
+    if img is not None:
+        customtkinter.CTkLabel(frame, image=img, text="").pack(pady=10)
+
+    customtkinter.CTkButton(frame, text="Sí", text_color=("#7AF04B"), fg_color=("#004E00"), command=lambda: mostrar_pregunta(filtro)).pack(pady=10)
+    customtkinter.CTkButton(frame, text="No", text_color=("#E76969"), fg_color=("#530000"), command=lambda: siguiente_filtro(filtro)).pack(pady=10)
+
+# ================= PREGUNTAS =================
+# Recuento en vivo de coincidencias: se recalcula un momento después del último
+# cambio (al escribir o mover el control), no en cada pulsación
+ESPERA_CONTEO_MS = 120
+esperas_conteo = {}
+
+def programar_conteo(filtro, actualizar):
+    if filtro in esperas_conteo:
+        ventana.after_cancel(esperas_conteo.pop(filtro))
+    def ejecutar():
+        esperas_conteo.pop(filtro, None)
+        actualizar()
+    esperas_conteo[filtro] = ventana.after(ESPERA_CONTEO_MS, ejecutar)
+
+def texto_conteo(cantidad):
+    if cantidad == 0:
+        return "🔎 Ningún vehículo coincide con estas respuestas"
+    return f"🔎 {cantidad:,} vehículos coinciden hasta ahora"
+
+# Rango escrito en dos campos, con los mismos valores por defecto que al guardar
+def leer_rango(min_entry, max_entry):
+    try:
+        min_val = float(min_entry.get()) if min_entry.get() else 0
+        max_val = float(max_entry.get()) if max_entry.get() else float('inf')
+    except ValueError:
+        return 0, float('inf')
+    return min_val, max_val
+
+def mostrar_pregunta(filtro):
+    nombre = f"pregunta_{filtro}"
+    if nombre not in frames:
+        construir_pregunta(filtro)
+    # Opciones y rangos del catálogo vigente al abrir la pregunta
+    preparaciones[nombre]()
+    mostrar_ventana(nombre)
+
+def construir_pregunta(filtro):
+    frame = customtkinter.CTkFrame(ventana)
+    frames[f"pregunta_{filtro}"] = frame
+
+    # Coincidencias con las respuestas anteriores y el valor que se está eligiendo
+    lbl_conteo = customtkinter.CTkLabel(frame, text="", font=("Arial", 14))
+    vista = {}
+
+    if filtro == "presupuesto":
+        titulo = customtkinter.CTkLabel(frame, text="", font=("Arial", 18))
+        titulo.pack(pady=20)
+        
+        input_frame = customtkinter.CTkFrame(frame)
+        input_frame.pack(pady=10)
+        
+        customtkinter.CTkLabel(input_frame, text="Mínimo:", font=("Arial", 14)).grid(row=0, column=0, padx=5, pady=5)
+        min_entry = customtkinter.CTkEntry(input_frame)
+        min_entry.grid(row=0, column=1, padx=5, pady=5)
+        customtkinter.CTkLabel(input_frame, text="USD", font=("Arial", 14)).grid(row=0, column=2, padx=5, pady=5)
+        
+        customtkinter.CTkLabel(input_frame, text="Máximo:", font=("Arial", 14)).grid(row=1, column=0, padx=5, pady=5)
+        max_entry = customtkinter.CTkEntry(input_frame)
+        max_entry.grid(row=1, column=1, padx=5, pady=5)
+        customtkinter.CTkLabel(input_frame, text="USD", font=("Arial", 14)).grid(row=1, column=2, padx=5, pady=5)
+
+        def contar():
+            return vista["actual"].contar(*leer_rango(min_entry, max_entry))
+
+        def reiniciar():
+            catalogo = catalogo_vivo.actual
+            titulo.configure(text=f"Establece tu rango de presupuesto (USD {catalogo.min_precio:,} - {catalogo.max_precio:,})")
+            min_entry.delete(0, "end")
+            min_entry.configure(placeholder_text=f" {catalogo.min_precio:,}")
+            max_entry.delete(0, "end")
+            max_entry.configure(placeholder_text=f" {catalogo.max_precio:,}")
+        
+        def guardar_presupuesto():
+            try:
+                min_val = float(min_entry.get()) if min_entry.get() else 0
+                max_val = float(max_entry.get()) if max_entry.get() else float('inf')
+                
+                if min_val > max_val:
+                    min_val, max_val = max_val, min_val
+                
+                respuestas["presupuesto_min"] = max(min_val, 0)
+                respuestas["presupuesto_max"] = max_val
+                siguiente_filtro(filtro)
+            except ValueError:
+                respuestas["presupuesto_min"] = 0
+                respuestas["presupuesto_max"] = float('inf')
+                siguiente_filtro(filtro)
+                
+        customtkinter.CTkButton(frame, text="Siguiente", text_color=("#7AF04B"), fg_color=("#004E00"), command=guardar_presupuesto).pack(pady=20)
+        
+    elif filtro == "asientos":
+        titulo = customtkinter.CTkLabel(frame, text="", font=("Arial", 16))
+        titulo.pack(pady=20)
+        
+        slider = customtkinter.CTkSlider(
+            frame, 
+            command=lambda value: [slider_label.configure(text=f"Asientos: {int(value)}"),
+                                   programar_conteo(filtro, actualizar_conteo)]
+        )
+        slider.pack(pady=10)
+        
+        slider_label = customtkinter.CTkLabel(frame, text="")
+        slider_label.pack()
+
+        def contar():
+            return vista["actual"].contar(int(slider.get()))
+
+        def reiniciar():
+            catalogo = catalogo_vivo.actual
+            min_asientos, max_asientos = catalogo.min_asientos, catalogo.max_asientos
+            titulo.configure(text=f"Selecciona el número mínimo de asientos ({min_asientos}-{max_asientos})")
+            slider.configure(from_=min_asientos, to=max_asientos,
+                             number_of_steps=max(max_asientos - min_asientos, 1))
+            slider.set(min_asientos)
+            slider_label.configure(text=f"Asientos: {min_asientos}")
+        
+        def guardar_asientos():
+            respuestas["asientos"] = int(slider.get())
+            siguiente_filtro(filtro)
+            
+        customtkinter.CTkButton(frame, text="Siguiente", text_color=("#7AF04B"), fg_color=("#004E00"), command=guardar_asientos).pack(pady=20)
+        
+    elif filtro == "hp":
+        titulo = customtkinter.CTkLabel(frame, text="", font=("Arial", 18))
+        titulo.pack(pady=20)
+        
+        input_frame = customtkinter.CTkFrame(frame)
+        input_frame.pack(pady=10)
+        
+        customtkinter.CTkLabel(input_frame, text="Mínimo:", font=("Arial", 14)).grid(row=0, column=0, padx=5, pady=5)
+        min_entry = customtkinter.CTkEntry(input_frame)
+        min_entry.grid(row=0, column=1, padx=5, pady=5)
+        customtkinter.CTkLabel(input_frame, text="hp", font=("Arial", 14)).grid(row=0, column=2, padx=5, pady=5)
+        
+        customtkinter.CTkLabel(input_frame, text="Máximo:", font=("Arial", 14)).grid(row=1, column=0, padx=5, pady=5)
+        max_entry = customtkinter.CTkEntry(input_frame)
+        max_entry.grid(row=1, column=1, padx=5, pady=5)
+        customtkinter.CTkLabel(input_frame, text="hp", font=("Arial", 14)).grid(row=1, column=2, padx=5, pady=5)
+
+        def contar():
+            return vista["actual"].contar(*leer_rango(min_entry, max_entry))
+
+        def reiniciar():
+            catalogo = catalogo_vivo.actual
+            titulo.configure(text=f"Establece tu rango de caballos de fuerza ({catalogo.min_hp}-{catalogo.max_hp} hp)")
+            min_entry.delete(0, "end")
+            min_entry.configure(placeholder_text=f" {catalogo.min_hp}")
+            max_entry.delete(0, "end")
+            max_entry.configure(placeholder_text=f" {catalogo.max_hp}")
+        
+        def guardar_hp():
+            try:
+                min_val = float(min_entry.get()) if min_entry.get() else 0
+                max_val = float(max_entry.get()) if max_entry.get() else float('inf')
+                
+                if min_val > max_val:
+                    min_val, max_val = max_val, min_val
+                
+                respuestas["hp_min"] = max(min_val, 0)
+                respuestas["hp_max"] = max_val
+                siguiente_filtro(filtro)
+            except ValueError:
+                respuestas["hp_min"] = 0
+                respuestas["hp_max"] = float('inf')
+                siguiente_filtro(filtro)
+                
+        customtkinter.CTkButton(frame, text="Siguiente", text_color=("#7AF04B"), fg_color=("#004E00"), command=guardar_hp).pack(pady=20)
+        
+    elif filtro == "marca":
+        customtkinter.CTkLabel(frame, text="Escribe una marca o un modelo:", font=("Arial", 16)).pack(pady=20)
+
+        # Búsqueda mientras se escribe (tolera erratas): un momento después de
+        # la última pulsación se muestran las mejores coincidencias; al elegir
+        # una se fijan su marca y, si la tiene, su modelo
+        busqueda = customtkinter.CTkEntry(frame, width=320, placeholder_text="p. ej. toyota corola")
+        busqueda.pack(pady=10)
+        coincidencias_frame = customtkinter.CTkFrame(frame, fg_color="transparent")
+        coincidencias_frame.pack(pady=5)
+        botones_coincidencias = [
+            customtkinter.CTkButton(coincidencias_frame, text="", width=320, anchor="w",
+                                    command=lambda i=i: elegir_coincidencia(i))
+            for i in range(motor.RESULTADOS_BUSQUEDA)
+        ]
+        lbl_eleccion = customtkinter.CTkLabel(frame, text="", font=("Arial", 14))
+        lbl_eleccion.pack(pady=5)
+        eleccion = {"coincidencias": [], "elegida": None}
+
+        def texto_coincidencia(coincidencia):
+            if not coincidencia["modelo"]:
+                return f"{coincidencia['marca']} (todos los modelos, {coincidencia['filas']:,})"
+            return f"{coincidencia['marca']} {coincidencia['modelo']}"
+
+        def buscar_coincidencias():
+            texto = busqueda.get()
+            eleccion["coincidencias"] = motor.buscar_modelos(texto, catalogo_vivo.actual) if texto.strip() else []
+            for boton, coincidencia in zip(botones_coincidencias, eleccion["coincidencias"]):
+                boton.configure(text=texto_coincidencia(coincidencia))
+                boton.pack(pady=2)
+            for boton in botones_coincidencias[len(eleccion["coincidencias"]):]:
+                boton.pack_forget()
+            if texto.strip() and not eleccion["coincidencias"]:
+                lbl_eleccion.configure(text="Sin coincidencias")
+            actualizar_conteo()
+
+        def escribir(evento):
+            if evento.keysym == "Return":
+                return
+            eleccion["elegida"] = None
+            lbl_eleccion.configure(text="")
+            programar_conteo("busqueda_marca", buscar_coincidencias)
+
+        def elegir_coincidencia(i):
+            if i >= len(eleccion["coincidencias"]):
+                return
+            eleccion["elegida"] = eleccion["coincidencias"][i]
+            lbl_eleccion.configure(text=f"✔ {texto_coincidencia(eleccion['elegida'])}")
+            actualizar_conteo()
+
+        busqueda.bind("<KeyRelease>", escribir)
+        busqueda.bind("<Return>", lambda evento: elegir_coincidencia(0))
+
+        # La elegida o, si se ha escrito algo sin elegir, la mejor coincidencia
+        def coincidencia_actual():
+            if eleccion["elegida"] is not None or not busqueda.get().strip():
+                return eleccion["elegida"]
+            mejores = motor.buscar_modelos(busqueda.get(), catalogo_vivo.actual, 1)
+            return mejores[0] if mejores else None
+
+        def contar():
+            coincidencia = coincidencia_actual()
+            if coincidencia is None:
+                return vista["actual"].contar("")
+            return vista["actual"].contar(coincidencia["marca"].lower(), coincidencia["modelo"])
+
+        def reiniciar():
+            busqueda.delete(0, "end")
+            eleccion.update(coincidencias=[], elegida=None)
+            for boton in botones_coincidencias:
+                boton.pack_forget()
+            lbl_eleccion.configure(text="")
+
+        def guardar_marca():
+            coincidencia = coincidencia_actual()
+            respuestas["marca"] = coincidencia["marca"].lower() if coincidencia else ""
+            respuestas["modelo"] = coincidencia["modelo"] if coincidencia else ""
+            siguiente_filtro(filtro)
+
+        customtkinter.CTkButton(frame, text="Siguiente", text_color=("#7AF04B"), fg_color=("#004E00"), command=guardar_marca).pack(pady=20)
+
+    elif filtro == "combustible":
+        customtkinter.CTkLabel(frame, text="Selecciona el tipo de combustible:", font=("Arial", 16)).pack(pady=20)
+        
+        combobox = customtkinter.CTkComboBox(
+            frame,
+            values=[],
+            state="readonly",
+            command=lambda valor: programar_conteo(filtro, actualizar_conteo)
+        )
+        combobox.pack(pady=10)
+
+        def contar():
+            return vista["actual"].contar(combobox.get().lower())
+
+        def reiniciar():
+            opciones = catalogo_vivo.actual.combustibles_disponibles
+            combobox.configure(values=opciones)
+            combobox.set(opciones[0] if opciones else "")
+        
+        def guardar_opcion():
+            respuestas[filtro] = combobox.get().lower()  # Guardar en minúsculas para comparación
+            siguiente_filtro(filtro)
+            
+        customtkinter.CTkButton(frame, text="Siguiente", text_color=("#7AF04B"), fg_color=("#004E00"), command=guardar_opcion).pack(pady=20)
+
+    if filtro in ("presupuesto", "hp"):
+        for entrada in (min_entry, max_entry):
+            entrada.bind("<KeyRelease>", lambda evento: programar_conteo(filtro, actualizar_conteo))
+
+    # Sin la vista previa todavía (se está preparando) no hay nada que contar
+    def actualizar_conteo():
+        if "actual" in vista:
+            lbl_conteo.configure(text=texto_conteo(contar()))
+
+    # Al mostrar la pregunta: campos a su estado inicial y candidatas que dejan
+    # las respuestas anteriores, filtradas una sola vez por visita en el hilo
+    # de consultas
+    def preparar():
+        reiniciar()
+        vista.clear()
+        lbl_conteo.configure(text="🔎 Contando vehículos...")
+        vista["pedida"] = ejecutor_consultas.submit(VistaPrevia, filtro, dict(respuestas), catalogo_vivo.actual)
+        esperar_vista(vista["pedida"])
+
+    def esperar_vista(pedida):
+        if vista.get("pedida") is not pedida:
+            return  # La pregunta se volvió a mostrar y la sustituye otra
+        if not pedida.done():
+            ventana.after(INTERVALO_CONSULTA_MS, esperar_vista, pedida)
+            return
+        del vista["pedida"]
+        try:
+            vista["actual"] = pedida.result()
+        except Exception as e:
+            lbl_conteo.configure(text=f"❌ Error al contar vehículos: {e}")
+            return
+        actualizar_conteo()
+
+    lbl_conteo.pack(side="bottom", pady=20)
+    reinicios[f"pregunta_{filtro}"] = reiniciar
+    preparaciones[f"pregunta_{filtro}"] = preparar
+
+# ================= SUGERENCIAS =================
+# La búsqueda, la puntuación y las explicaciones se ejecutan en un hilo aparte
+# (el mismo que prepara el recuento de cada pregunta); la ventana comprueba con
+# after() si han terminado y sigue respondiendo mientras
+ejecutor_consultas = ThreadPoolExecutor(max_workers=1, thread_name_prefix="consultas")
+consulta_actual = None
+INTERVALO_CONSULTA_MS = 30
+
+# Orden de los resultados: por puntuación ponderada o por capas de Pareto
+ORDENES = {"Puntuación": "puntuacion", "Pareto": "pareto"}
+orden_resultados = "puntuacion"
+
+# Pesos de la puntuación ajustables en la pantalla de resultados (normalizados)
+# y valor de cada control deslizante (0-100, sin normalizar)
+NOMBRES_PESOS = {"precio": "Precio", "caballos_fuerza": "Potencia", "asientos": "Asientos",
+                 "combustible": "Combustible", "marca": "Marca"}
+pesos_resultados = dict(motor.PESOS)
+valores_pesos = {criterio: peso * 100 for criterio, peso in motor.PESOS.items()}
+
+# Con cargando=False (al mover los pesos) se reordena sin vaciar la pantalla
+def mostrar_sugerencias(cargando=True):
+    global consulta_actual
+    if "sugerencias" not in frames:
+        construir_sugerencias()
+    if cargando:
+        mostrar_cargando()
+        mostrar_ventana("sugerencias")
+
+    cancelar_consulta()
+    # Con la instrumentación activa (ASESOR_METRICAS) se miden las etapas de la
+    # búsqueda en el hilo de consultas y el pintado de resultados en este
+    medicion = metricas.consulta("asistente")
+    consulta_actual = ejecutor_consultas.submit(buscar, dict(respuestas), catalogo_vivo.actual,
+                                                orden_resultados, dict(pesos_resultados), medicion)
+    esperar_consulta(consulta_actual, medicion)
+
+def buscar(respuestas_consulta, catalogo, orden, pesos, medicion):
+    with medicion:
+        return cargador_resultados(respuestas_consulta, catalogo, orden, pesos)
+
+def cambiar_orden(etiqueta):
+    global orden_resultados
+    orden_resultados = ORDENES[etiqueta]
+    # Los pesos solo intervienen al ordenar por puntuación
+    if orden_resultados == "pareto":
+        pesos_frame.pack_forget()
+    else:
+        pesos_frame.pack(pady=(0, 10), padx=20, fill="x", after=selector_orden)
+    mostrar_sugerencias()
+
+# Al mover un peso se actualizan los porcentajes al momento y la lista un poco
+# después del último movimiento (el motor solo recalcula el producto de la
+# matriz de componentes por los pesos y los primeros puestos)
+def mover_peso(criterio, valor):
+    valores_pesos[criterio] = valor
+    pintar_pesos()
+    programar_conteo("pesos", aplicar_pesos)
+
+def aplicar_pesos():
+    global pesos_resultados
+    try:
+        pesos_resultados = motor.normalizar_pesos(valores_pesos)
+    except ValueError as e:
+        lbl_perfil_pesos.configure(text=f"⚠️ {e}")
+        return
+    mostrar_sugerencias(cargando=False)
+
+def pintar_pesos():
+    total = sum(valores_pesos.values())
+    for criterio, etiqueta in etiquetas_pesos.items():
+        parte = valores_pesos[criterio] / total if total > 0 else 0
+        etiqueta.configure(text=f"{NOMBRES_PESOS[criterio]}: {parte:.0%}")
+    lbl_perfil_pesos.configure(text="")
+
+def seleccionar_perfil_pesos(nombre):
+    pesos = perfiles_pesos.cargar_perfiles().get(nombre)
+    if pesos is None:
+        return
+    for criterio, peso in pesos.items():
+        valores_pesos[criterio] = peso * 100
+        sliders_pesos[criterio].set(peso * 100)
+    pintar_pesos()
+    aplicar_pesos()
+
+def guardar_perfil_pesos():
+    dialogo = customtkinter.CTkInputDialog(text="Nombre del perfil de pesos:", title="Guardar pesos")
+    nombre = dialogo.get_input()
+    if nombre is None:
+        return
+    try:
+        perfiles_pesos.guardar_perfil(nombre, valores_pesos)
+    except (ValueError, OSError) as e:
+        lbl_perfil_pesos.configure(text=f"⚠️ {e}")
+        return
+    actualizar_perfiles_pesos(nombre.strip())
+    lbl_perfil_pesos.configure(text=f"💾 Guardado como «{nombre.strip()}»")
+
+def borrar_perfil_pesos():
+    nombre = combo_perfiles_pesos.get()
+    if nombre == perfiles_pesos.PERFIL_PREDETERMINADO:
+        return
+    try:
+        perfiles_pesos.borrar_perfil(nombre)
+    except OSError as e:
+        lbl_perfil_pesos.configure(text=f"⚠️ {e}")
+        return
+    actualizar_perfiles_pesos(perfiles_pesos.PERFIL_PREDETERMINADO)
+
+def actualizar_perfiles_pesos(seleccionado):
+    combo_perfiles_pesos.configure(values=list(perfiles_pesos.cargar_perfiles()))
+    combo_perfiles_pesos.set(seleccionado)
+
+def esperar_consulta(consulta, medicion):
+    global consulta_actual
+    if consulta is not consulta_actual:
+        return  # Cancelada (o sustituida por otra búsqueda): se descarta
+    if not consulta.done():
+        ventana.after(INTERVALO_CONSULTA_MS, esperar_consulta, consulta, medicion)
+        return
+
+    consulta_actual = None
+    ocultar_cargando()
+    try:
+        cargar = consulta.result()
+    except Exception as e:
+        lbl_titulo.configure(text=f"❌ Error al buscar vehículos: {e}")
+        mostrar_metricas(medicion.terminar())
+        return
+    with medicion.etapa("widgets"):
+        actualizar_sugerencias(cargar)
+    mostrar_metricas(medicion.terminar())
+
+# Descarta la búsqueda en curso. Si aún no había empezado no llega a
+# ejecutarse; si ya estaba en marcha, su resultado se ignora al terminar.
+def cancelar_consulta():
+    global consulta_actual
+    if consulta_actual is not None:
+        consulta_actual.cancel()
+        consulta_actual = None
+
+def volver_al_inicio():
+    cancelar_consulta()
+    ocultar_cargando()
+    resetear_filtros()
+    mostrar_ventana("inicio")
+
+def mostrar_cargando():
+    lbl_filtros.pack_forget()
+    vacio_frame.pack_forget()
+    lista_resultados.pack_forget()
+    lbl_titulo.configure(text="⏳ Buscando vehículos...")
+    cargando_barra.pack(pady=20, padx=20, fill="x", after=lbl_titulo)
+    cargando_barra.start()
+
+def ocultar_cargando():
+    if "sugerencias" in frames:
+        cargando_barra.stop()
+        cargando_barra.pack_forget()
+
+def construir_sugerencias():
+    global boton_volver, lbl_filtros, lbl_titulo, cargando_barra, vacio_frame, consejos, botones_sugerencia, lista_resultados, selector_orden
+    global pesos_frame, etiquetas_pesos, sliders_pesos, combo_perfiles_pesos, lbl_perfil_pesos
+
+    frame = customtkinter.CTkFrame(ventana)
+    frames["sugerencias"] = frame
+
+    # Botón de volver al inicio EN LA PARTE SUPERIOR (fijo)
+    boton_volver = customtkinter.CTkButton(frame, text="← Volver al inicio", 
+                                         command=volver_al_inicio,
+                                         fg_color="#ff7b00", hover_color="#3a3a3a",
+                                         font=("Arial", 14, "bold"))
+    boton_volver.pack(pady=10, padx=20, anchor="w")
+
+    # Resumen de filtros aplicados (solo se muestra si hay alguno)
+    lbl_filtros = customtkinter.CTkLabel(frame, text="", font=("Arial", 14))
+
+    # Ordenar por puntuación o por capas de Pareto (precio, caballos y asientos)
+    selector_orden = customtkinter.CTkSegmentedButton(frame, values=list(ORDENES), command=cambiar_orden)
+    selector_orden.set("Puntuación")
+    selector_orden.pack(pady=(0, 10), padx=20, anchor="w")
+
+    # Pesos de la puntuación: un control por criterio y perfiles guardados
+    pesos_frame = customtkinter.CTkFrame(frame)
+    pesos_frame.pack(pady=(0, 10), padx=20, fill="x")
+    etiquetas_pesos, sliders_pesos = {}, {}
+    for columna, criterio in enumerate(NOMBRES_PESOS):
+        etiquetas_pesos[criterio] = customtkinter.CTkLabel(pesos_frame, text="", font=("Arial", 13))
+        etiquetas_pesos[criterio].grid(row=0, column=columna, padx=10, pady=(5, 0))
+        sliders_pesos[criterio] = customtkinter.CTkSlider(
+            pesos_frame, from_=0, to=100, number_of_steps=100, width=150,
+            command=lambda valor, criterio=criterio: mover_peso(criterio, valor)
+        )
+        sliders_pesos[criterio].set(valores_pesos[criterio])
+        sliders_pesos[criterio].grid(row=1, column=columna, padx=10, pady=(0, 5))
+
+    perfiles_frame = customtkinter.CTkFrame(pesos_frame, fg_color="transparent")
+    perfiles_frame.grid(row=2, column=0, columnspan=len(NOMBRES_PESOS), sticky="w", padx=10, pady=(0, 5))
+    customtkinter.CTkLabel(perfiles_frame, text="Perfil de pesos:").pack(side="left")
+    combo_perfiles_pesos = customtkinter.CTkComboBox(perfiles_frame, values=[], state="readonly",
+                                                     command=seleccionar_perfil_pesos)
+    combo_perfiles_pesos.pack(side="left", padx=10)
+    customtkinter.CTkButton(perfiles_frame, text="💾 Guardar", width=100,
+                            command=guardar_perfil_pesos).pack(side="left", padx=5)
+    customtkinter.CTkButton(perfiles_frame, text="🗑️ Borrar", width=100,
+                            command=borrar_perfil_pesos).pack(side="left", padx=5)
+    lbl_perfil_pesos = customtkinter.CTkLabel(perfiles_frame, text="")
+    lbl_perfil_pesos.pack(side="left", padx=10)
+    actualizar_perfiles_pesos(perfiles_pesos.PERFIL_PREDETERMINADO)
+    pintar_pesos()
+
+    lbl_titulo = customtkinter.CTkLabel(frame, text="", font=("Arial", 22, "bold"))
+    lbl_titulo.pack(pady=(0, 20), padx=20, anchor="w")
+
+    # Indicador de búsqueda en curso
+    cargando_barra = customtkinter.CTkProgressBar(frame, mode="indeterminate")
+
+    # Mensaje cuando no hay resultados
+    vacio_frame = customtkinter.CTkFrame(frame, fg_color="transparent")
+
+    lbl_error = customtkinter.CTkLabel(vacio_frame, 
+                                     text="❌ No se encontraron autos que coincidan con tus preferencias.", 
+                                     font=("Arial", 16))
+    lbl_error.pack(pady=20, padx=20)
+    
+    # Sugerir relajar filtros
+    sugerencia_frame = customtkinter.CTkFrame(vacio_frame)
+    sugerencia_frame.pack(pady=10, padx=20, fill="x")
+    
+    lbl_sugerencia = customtkinter.CTkLabel(sugerencia_frame, text="Prueba:", 
+                                          font=("Arial", 14, "bold"))
+    lbl_sugerencia.pack(anchor="w")
+    
+    # Consejos generales (solo si el motor no encuentra una relajación concreta)
+    consejos = customtkinter.CTkLabel(sugerencia_frame, 
+                                    text="• Aumentar tu presupuesto máximo\n• Considerar otros tipos de combustible\n• Reducir los caballos de fuerza requeridos\n• Flexibilizar la marca preferida", 
+                                    justify="left")
+
+    # Relajaciones concretas calculadas por el motor; al pulsar se aplican
+    botones_sugerencia = [
+        customtkinter.CTkButton(sugerencia_frame, text="", anchor="w", font=("Arial", 14))
+        for _ in range(motor.MAX_SUGERENCIAS)
+    ]
+
+    # Lista virtual de resultados: solo existen las etiquetas de las filas visibles
+    lista_resultados = ListaVirtual(frame, width=1000, height=550, accion=("🔁 Más como este", mostrar_similares))
+
+    # Botón de volver al inicio también en la parte inferior
+    boton_volver_abajo = customtkinter.CTkButton(frame, text="← Volver al inicio", 
+                                               command=volver_al_inicio,
+                                               fg_color="#ff7b00", hover_color="#3a3a3a",
+                                               font=("Arial", 14, "bold"))
+    boton_volver_abajo.pack(pady=20, side="bottom")
+
+# Muestra los resultados de una búsqueda terminada (cargar viene de
+# cargador_resultados, con la primera página ya calculada)
+def actualizar_sugerencias(cargar):
+    global cargar_mostrado
+    respuestas = cargar.respuestas
+    num_resultados = cargar.total
+    
+    # Mostrar resumen de filtros aplicados
+    filtros_aplicados = []
+    if respuestas["presupuesto_min"] > 0 or respuestas["presupuesto_max"] < float('inf'):
+        min_str = f"${respuestas['presupuesto_min']:,.0f}" if respuestas["presupuesto_min"] > 0 else "sin mínimo"
+        max_str = f"${respuestas['presupuesto_max']:,.0f}" if respuestas["presupuesto_max"] < float('inf') else "sin máximo"
+        filtros_aplicados.append(f"Presupuesto: {min_str} - {max_str}")
+    if respuestas["combustible"]:
+        filtros_aplicados.append(f"Combustible: {respuestas['combustible'].title()}")
+    if respuestas["asientos"] > 0:
+        filtros_aplicados.append(f"Asientos: ≥ {respuestas['asientos']}")
+    if respuestas["marca"]:
+        filtros_aplicados.append(f"Marca: {respuestas['marca'].title()}")
+    if respuestas["modelo"]:
+        filtros_aplicados.append(f"Modelo: {respuestas['modelo'].upper()}")
+    if respuestas["hp_min"] > 0 or respuestas["hp_max"] < float('inf'):
+        min_str = f"{respuestas['hp_min']}" if respuestas["hp_min"] > 0 else "sin mínimo"
+        max_str = f"{respuestas['hp_max']}" if respuestas["hp_max"] < float('inf') else "sin máximo"
+        filtros_aplicados.append(f"Caballos de fuerza: {min_str} - {max_str} hp")
+    
+    if filtros_aplicados:
+        lbl_filtros.configure(text="Filtros aplicados: " + ", ".join(filtros_aplicados))
+        lbl_filtros.pack(pady=(0, 10), padx=20, anchor="w", after=boton_volver)
+    else:
+        lbl_filtros.pack_forget()
+
+    lbl_titulo.configure(text=getattr(cargar, "titulo", f"Vehículos Sugeridos ({num_resultados} resultados)"))
+
+    if num_resultados == 0:
+        lista_resultados.pack_forget()
+        mostrar_relajaciones(cargar.sugerencias, respuestas)
+        vacio_frame.pack(fill="x", after=lbl_titulo)
+        return
+
+    vacio_frame.pack_forget()
+    lista_resultados.pack(pady=(0, 20), padx=20, fill="both", expand=True, after=lbl_titulo)
+    lista_resultados.mostrar(num_resultados, cargar)
+    cargar_mostrado = cargar
+
+# "Más como este": busca los vehículos parecidos al de la fila i de la lista
+# mostrada (del mismo combustible si la búsqueda pedía uno)
+MAX_SIMILARES = 10
+cargar_mostrado = None
+
+def mostrar_similares(i):
+    global consulta_actual
+    fila = cargar_mostrado.fila(i)
+    if fila is None:
+        return  # Su página aún se está cargando
+    mostrar_cargando()
+    cancelar_consulta()
+    medicion = metricas.consulta("similares")
+    consulta_actual = ejecutor_consultas.submit(buscar_similares, fila, cargar_mostrado.respuestas,
+                                                catalogo_vivo.actual, medicion)
+    esperar_consulta(consulta_actual, medicion)
+
+def buscar_similares(fila, respuestas_consulta, catalogo, medicion):
+    with medicion:
+        return cargador_similares(fila, respuestas_consulta, catalogo)
+
+# Mínimo de coincidencias que debe alcanzar una relajación sugerida
+MINIMO_RELAJACION = 5
+
+def mostrar_relajaciones(sugerencias, respuestas_consulta):
+    for boton in botones_sugerencia:
+        boton.pack_forget()
+    if not sugerencias:
+        consejos.pack(anchor="w")
+        return
+
+    consejos.pack_forget()
+    for boton, sugerencia in zip(botones_sugerencia, sugerencias):
+        boton.configure(text=texto_relajacion(sugerencia, respuestas_consulta),
+                        command=lambda ajustadas=sugerencia["respuestas"]: aplicar_relajacion(ajustadas))
+        boton.pack(pady=5, anchor="w", fill="x")
+
+def aplicar_relajacion(ajustadas):
+    respuestas.update(ajustadas)
+    mostrar_sugerencias()
+
+def texto_relajacion(sugerencia, respuestas_consulta):
+    ajustadas = sugerencia["respuestas"]
+    partes = []
+    for criterio in sugerencia["relajar"]:
+        if criterio == "presupuesto":
+            maximo = f"${ajustadas['presupuesto_max']:,.0f}" if ajustadas["presupuesto_max"] < float('inf') else "sin máximo"
+            partes.append(f"Presupuesto de ${ajustadas['presupuesto_min']:,.0f} a {maximo}")
+        elif criterio == "hp":
+            maximo = f"{ajustadas['hp_max']:,.0f} hp" if ajustadas["hp_max"] < float('inf') else "sin máximo"
+            partes.append(f"Caballos de fuerza de {ajustadas['hp_min']:,.0f} a {maximo}")
+        elif criterio == "asientos":
+            partes.append(f"Asientos: ≥ {ajustadas['asientos']}" if ajustadas["asientos"] > 0 else "Cualquier número de asientos")
+        elif ajustadas[criterio]:
+            antes = respuestas_consulta[criterio]
+            if criterio == "marca":
+                antes = f"{antes} {respuestas_consulta['modelo']}".strip()
+            partes.append(f"{criterio.title()}: {ajustadas[criterio].title()} en vez de {antes.title()}")
+        else:
+            partes.append(f"Cualquier {criterio}")
+    return f"• {' y '.join(partes)} → {sugerencia['coincidencias']} resultados"
+
+# Devuelve cargar(inicio, cantidad) con los textos de esas filas de la
+# clasificación. La primera página se calcula aquí (en el hilo de consultas);
+# las demás se piden a ese mismo hilo cuando la lista las necesita y se guardan
+# las últimas usadas. cargar.total es el número de coincidencias. Con orden
+# "pareto" las filas van por capas de Pareto (motor.recomendar_pareto) y si no
+# por la puntuación con los pesos dados (los de motor.PESOS si no se dan).
+PAGINAS_EN_MEMORIA = 8
+
+def cargador_resultados(respuestas_consulta, catalogo, orden="puntuacion", pesos=None):
+    paginas = {}
+    pedidas = {}
+
+    # (textos, filas, total) de una página; se ejecuta en el hilo de consultas
+    def calcular(numero):
+        inicio = numero * motor.TAMANO_PAGINA
+        if orden == "pareto":
+            resultados, total = motor.recomendar_pareto(respuestas_consulta, catalogo, inicio, motor.TAMANO_PAGINA)
+        else:
+            resultados, total = motor.recomendar_pagina(respuestas_consulta, catalogo, inicio,
+                                                        motor.TAMANO_PAGINA, pesos=pesos)
+        explicaciones = generar_explicaciones(resultados, respuestas_consulta)
+        if orden == "pareto":
+            explicaciones = [texto_capa(capa) + "\n" + explicacion
+                             for capa, explicacion in zip(resultados["capa_pareto"], explicaciones)]
+        with metricas.etapa("texto_resultado") as medicion:
+            medicion.filas = len(resultados)
+            textos = [texto_resultado(fila, explicacion)
+                      for (_, fila), explicacion in zip(resultados.iterrows(), explicaciones)]
+        return textos, resultados, total
+
+    def guardar(numero, pagina):
+        while len(paginas) >= PAGINAS_EN_MEMORIA:
+            paginas.pop(next(iter(paginas)))
+        paginas[numero] = pagina
+
+    # Las páginas que faltan se piden al hilo de consultas y se devuelve None;
+    # la lista se vuelve a pintar cuando llegan (ver esperar_pagina). Las
+    # pedidas que ya no se ven y aún no han empezado se cancelan.
+    def cargar(inicio, cantidad):
+        fin = min(inicio + cantidad, cargar.total)
+        numeros = range(inicio // motor.TAMANO_PAGINA, (fin - 1) // motor.TAMANO_PAGINA + 1)
+        for numero, futuro in list(pedidas.items()):
+            if numero not in numeros and futuro.cancel():
+                del pedidas[numero]
+        faltan = [numero for numero in numeros if numero not in paginas]
+        for numero in faltan:
+            if numero not in pedidas:
+                pedidas[numero] = ejecutor_consultas.submit(calcular, numero)
+                esperar_pagina(numero, pedidas[numero])
+        if faltan:
+            return None
+        return [paginas[i // motor.TAMANO_PAGINA][0][i % motor.TAMANO_PAGINA] for i in range(inicio, fin)]
+
+    def esperar_pagina(numero, futuro):
+        if futuro.cancelled():
+            return
+        if not futuro.done():
+            ventana.after(INTERVALO_CONSULTA_MS, esperar_pagina, numero, futuro)
+            return
+        del pedidas[numero]
+        try:
+            guardar(numero, futuro.result())
+        except Exception as e:
+            lbl_titulo.configure(text=f"❌ Error al cargar resultados: {e}")
+            return
+        if cargar is cargar_mostrado:
+            lista_resultados.refrescar()
+
+    # Fila (del catálogo) que muestra la posición i, para "más como este"; None
+    # si su página todavía no ha llegado
+    def fila(i):
+        pagina = paginas.get(i // motor.TAMANO_PAGINA)
+        return None if pagina is None else pagina[1].iloc[i % motor.TAMANO_PAGINA]
+
+    cargar.respuestas = respuestas_consulta
+    cargar.fila = fila
+    primera = calcular(0)
+    guardar(0, primera)
+    cargar.total = primera[2]
+    if orden == "pareto":
+        cargar.titulo = f"Vehículos Sugeridos por capas de Pareto ({cargar.total} resultados)"
+    elif pesos is not None and not motor.pesos_por_defecto(motor.normalizar_pesos(pesos)):
+        cargar.titulo = f"Vehículos Sugeridos con tus pesos ({cargar.total} resultados)"
+    # Sin resultados: qué filtros relajar (también en el hilo de la consulta)
+    cargar.sugerencias = []
+    if cargar.total == 0:
+        cargar.sugerencias = motor.sugerir_relajaciones(respuestas_consulta, catalogo, minimo=MINIMO_RELAJACION)
+    return cargar
+
+def texto_capa(capa):
+    if capa == 1:
+        return "🥇 Frontera de Pareto: ningún otro lo mejora a la vez en precio, caballos y asientos"
+    return f"📐 Capa de Pareto {capa}"
+
+# Panel de depuración con el desglose de la última búsqueda (solo si la
+# instrumentación está activa)
+lbl_metricas = None
+
+def mostrar_metricas(registro):
+    global lbl_metricas
+    if registro is None:
+        return
+    if lbl_metricas is None:
+        lbl_metricas = customtkinter.CTkLabel(ventana, text="", font=("Courier", 11), justify="left",
+                                              fg_color="#202020", text_color="#d0d0d0", corner_radius=6)
+        lbl_metricas.place(relx=1.0, rely=1.0, x=-10, y=-10, anchor="se")
+    lineas = [f"{registro['nombre']}: {registro['total_ms']:.1f} ms"]
+    for nombre, etapa in registro["etapas"].items():
+        filas = f" {etapa['filas']:>7,} filas" if "filas" in etapa else ""
+        lineas.append(f"  {nombre:<20} {etapa['ms']:8.1f} ms{filas}")
+    lbl_metricas.configure(text="\n".join(lineas))
+    lbl_metricas.lift()
+
+# Como cargador_resultados, con los vehículos parecidos a "fila". Se puntúan
+# con las respuestas de la búsqueda para que la tarjeta tenga su explicación.
+def cargador_similares(fila, respuestas_consulta, catalogo):
+    combustible = respuestas_consulta["combustible"]
+    similares = motor.vehiculos_similares(fila, catalogo, MAX_SIMILARES, combustible=combustible)
+    if len(similares):
+        similares = motor.calcular_puntuacion(similares, respuestas_consulta)
+    explicaciones = generar_explicaciones(similares, respuestas_consulta)
+    textos = [texto_resultado(similar, f"🔁 Similitud: {similar['similitud']:.0f}%\n{explicacion}")
+              for (_, similar), explicacion in zip(similares.iterrows(), explicaciones)]
+
+    def cargar(inicio, cantidad):
+        return textos[inicio:inicio + cantidad]
+
+    cargar.respuestas = dict(RESPUESTAS_POR_DEFECTO, combustible=combustible)
+    cargar.fila = lambda i: similares.iloc[i]
+    cargar.total = len(textos)
+    cargar.sugerencias = []
+    cargar.titulo = f"Similares a {fila['Company Names']} {fila['Cars Names']} ({len(textos)} vehículos)"
+    return cargar
+
+# Función para resetear los filtros (respuestas y campos de las preguntas)
+def resetear_filtros():
+    respuestas.update(RESPUESTAS_POR_DEFECTO)
+    for reiniciar in reinicios.values():
+        reiniciar()
+
+# ================= FLUJO =================
+def siguiente_filtro(actual):
+    orden = ["presupuesto", "combustible", "asientos", "marca", "hp"]
+    idx = orden.index(actual)
+    if idx + 1 < len(orden):
+        mostrar_filtro(orden[idx + 1])
+    else:
+        mostrar_sugerencias()
+
+def mostrar_ventana(nombre):
+    for f in frames.values():
+        f.pack_forget()
+    frames[nombre].pack(fill="both", expand=True)
+
+# Iniciar app
+def main():
+    crear_ventana()
+    VigilanteCatalogo(catalogo_vivo).iniciar()
+    # Índices de búsqueda de marcas y modelos, listos antes de llegar a esa pregunta
+    threading.Thread(target=lambda: catalogo_vivo.actual.buscador_modelos, daemon=True).start()
+    resetear_filtros()
+    mostrar_ventana("inicio")
+    ventana.mainloop()
+
+if __name__ == "__main__":
+    main()
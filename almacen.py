@@ -0,0 +1,338 @@
+# Almacén en disco del catálogo para inventarios que no caben en memoria
+#
+# La ingesta lee el CSV por trozos, limpia cada trozo con las mismas reglas que
+# motor.preprocesar_datos y lo escribe como un segmento columnar (formato de
+# cache_catalogo). Las estadísticas globales (mínimos/máximos, marcas y
+# combustibles) se actualizan trozo a trozo y cada segmento guarda un mapa de
+# zonas (mínimo y máximo por columna y códigos presentes) para poder saltarlo.
+#
+# Las consultas recorren los segmentos de uno en uno con memoria mapeada, así
+# que la memoria usada depende del tamaño de segmento y no del catálogo:
+#
+#     python almacen.py ingerir inventario.csv inventario.almacen
+#     python almacen.py consultar inventario.almacen '{"marca": "kia", "presupuesto_max": 50000}'
+
+import argparse
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+import cache_catalogo
+import motor
+
+VERSION_ALMACEN = 1
+FILAS_POR_SEGMENTO = 250_000
+
+# Columnas numéricas con mapa de zonas para descartar segmentos
+COLUMNAS_ZONA = ["Cars Prices", "HorsePower", "Seats"] + sorted(
+    {columna for columna, _ in motor.FILTROS_ESPECIFICACIONES.values()}
+)
+COLUMNAS_CATEGORICAS = {"Company Names": motor.clave_marca, "Fuel Types": motor.clave_combustible}
+
+
+# Lee el CSV por trozos y escribe el almacén en "directorio"
+def ingerir_csv(ruta_csv, directorio, filas_por_segmento=FILAS_POR_SEGMENTO, encoding='latin1'):
+    temporal = directorio.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(os.path.join(temporal, "segmentos"))
+
+    # Categorías globales (en orden de aparición) y estadísticas incrementales
+    categorias = {columna: [] for columna in COLUMNAS_CATEGORICAS}
+    codigo_de = {columna: {} for columna in COLUMNAS_CATEGORICAS}
+    extremos = {columna: [np.nan, np.nan] for columna in ["Cars Prices", "HorsePower", "Seats"]}
+    segmentos = []
+    filas = 0
+
+    try:
+        for trozo in pd.read_csv(ruta_csv, encoding=encoding, chunksize=filas_por_segmento):
+            limpio = motor.preprocesar_datos(trozo)
+            if limpio.empty:
+                continue
+
+            # Traducir las categorías del trozo a códigos globales
+            for columna in COLUMNAS_CATEGORICAS:
+                for categoria in limpio[columna].cat.categories:
+                    if categoria not in codigo_de[columna]:
+                        codigo_de[columna][categoria] = len(categorias[columna])
+                        categorias[columna].append(categoria)
+                limpio[columna] = limpio[columna].cat.set_categories(categorias[columna])
+
+            nombre = f"{len(segmentos):06d}"
+            carpeta = os.path.join(temporal, "segmentos", nombre)
+            os.makedirs(carpeta)
+            columnas = cache_catalogo.escribir_columnas(limpio, carpeta)
+            with open(os.path.join(carpeta, "columnas.json"), "w", encoding="utf-8") as archivo:
+                json.dump(columnas, archivo, ensure_ascii=False)
+
+            # Mapa de zonas del segmento y estadísticas globales
+            zonas = {}
+            for columna in COLUMNAS_ZONA:
+                if columna in limpio.columns:
+                    valores = limpio[columna].to_numpy(dtype=float)
+                    validos = valores[~np.isnan(valores)]
+                    zonas[columna] = [float(validos.min()), float(validos.max())] if len(validos) else None
+            for columna, extremo in extremos.items():
+                if zonas.get(columna):
+                    extremo[0] = float(np.fmin(extremo[0], zonas[columna][0]))
+                    extremo[1] = float(np.fmax(extremo[1], zonas[columna][1]))
+
+            segmentos.append({
+                "nombre": nombre,
+                "filas": len(limpio),
+                "inicio": filas,
+                "zonas": zonas,
+                "codigos": {
+                    columna: sorted(int(c) for c in np.unique(limpio[columna].cat.codes) if c >= 0)
+                    for columna in COLUMNAS_CATEGORICAS
+                },
+            })
+            filas += len(limpio)
+
+        meta = {
+            "version": VERSION_ALMACEN,
+            "origen": {"ruta": os.path.abspath(ruta_csv), "tamano": os.path.getsize(ruta_csv)},
+            "filas": filas,
+            "categorias": categorias,
+            "extremos": extremos,
+            "segmentos": segmentos,
+        }
+        with open(os.path.join(temporal, "meta.json"), "w", encoding="utf-8") as archivo:
+            json.dump(meta, archivo, ensure_ascii=False, indent=1)
+
+        shutil.rmtree(directorio, ignore_errors=True)
+        os.replace(temporal, directorio)
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+    return AlmacenCatalogo(directorio)
+
+
+# Catálogo en disco con la misma API de consulta que motor.recomendar_top
+class AlmacenCatalogo:
+    def __init__(self, directorio):
+        self.directorio = directorio
+        with open(os.path.join(directorio, "meta.json"), encoding="utf-8") as archivo:
+            self.meta = json.load(archivo)
+        if self.meta.get("version") != VERSION_ALMACEN:
+            raise ValueError(f"Versión de almacén no soportada en {directorio}")
+        self.segmentos = self.meta["segmentos"]
+
+        # Códigos globales por clave canónica y categorías en el orden del catálogo en memoria
+        self.categorias = self.meta["categorias"]
+        self.codigo_de = {
+            columna: {canonica(c): i for i, c in enumerate(self.categorias[columna])}
+            for columna, canonica in COLUMNAS_CATEGORICAS.items()
+        }
+        self.categorias_ordenadas = {
+            columna: sorted(self.categorias[columna], key=canonica)
+            for columna, canonica in COLUMNAS_CATEGORICAS.items()
+        }
+
+        # Mismos atributos que motor.Catalogo para el asistente
+        self.combustibles_disponibles = self.categorias_ordenadas["Fuel Types"]
+        self.marcas_disponibles = self.categorias_ordenadas["Company Names"]
+        extremos = self.meta["extremos"]
+        self.min_precio, self.max_precio = motor.extremos_enteros(*extremos["Cars Prices"])
+        self.min_asientos, self.max_asientos = motor.extremos_enteros(*extremos["Seats"])
+        self.min_hp, self.max_hp = motor.extremos_enteros(*extremos["HorsePower"])
+
+        self._columnas = {}
+        self._modelos = {}
+
+    def __len__(self):
+        return self.meta["filas"]
+
+    def _carpeta(self, segmento):
+        return os.path.join(self.directorio, "segmentos", segmento["nombre"])
+
+    def _columnas_de(self, segmento):
+        if segmento["nombre"] not in self._columnas:
+            with open(os.path.join(self._carpeta(segmento), "columnas.json"), encoding="utf-8") as archivo:
+                self._columnas[segmento["nombre"]] = {c["nombre"]: c for c in json.load(archivo)}
+        return self._columnas[segmento["nombre"]]
+
+    # Columna de un segmento como arreglo mapeado en memoria (códigos si es categórica)
+    def _columna(self, segmento, nombre):
+        columna = self._columnas_de(segmento).get(nombre)
+        if columna is None:
+            return np.full(segmento["filas"], np.nan)
+        datos = np.load(os.path.join(self._carpeta(segmento), columna["archivo"]), mmap_mode="r")
+        return datos if columna["tipo"] == "categoria" else datos.astype(float, copy=False)
+
+    # Rangos pedidos sobre columnas numéricas: columna -> (mínimo, máximo)
+    @staticmethod
+    def _rangos(respuestas):
+        rangos = {}
+        if respuestas["presupuesto_min"] > 0 or respuestas["presupuesto_max"] < float('inf'):
+            rangos["Cars Prices"] = (respuestas["presupuesto_min"], respuestas["presupuesto_max"])
+        if respuestas["hp_min"] > 0 or respuestas["hp_max"] < float('inf'):
+            rangos["HorsePower"] = (respuestas["hp_min"], respuestas["hp_max"])
+        if respuestas["asientos"] > 0:
+            rangos["Seats"] = (respuestas["asientos"], np.inf)
+        for campo, (columna, tipo) in motor.FILTROS_ESPECIFICACIONES.items():
+            if tipo == "min" and respuestas[campo] > 0:
+                rangos[columna] = (respuestas[campo], np.inf)
+            elif tipo == "max" and respuestas[campo] < float('inf'):
+                rangos[columna] = (-np.inf, respuestas[campo])
+        return rangos
+
+    # Códigos globales pedidos por columna categórica y, con un modelo, su clave
+    # en "Cars Names" (columna de texto con códigos propios de cada segmento)
+    def _codigos_pedidos(self, respuestas):
+        pedidos = {}
+        for columna, campo in (("Fuel Types", "combustible"), ("Company Names", "marca")):
+            if respuestas[campo] != "":
+                pedidos[columna] = self.codigo_de[columna].get(respuestas[campo], -1)
+        if respuestas["modelo"] != "":
+            pedidos["Cars Names"] = respuestas["modelo"]
+        return pedidos
+
+    # Códigos de "Cars Names" en un segmento con una clave de modelo (varios
+    # textos pueden dar la misma). Las claves se calculan una vez por segmento y
+    # texto distinto.
+    def _codigos_modelo(self, segmento, modelo):
+        if segmento["nombre"] not in self._modelos:
+            columna = self._columnas_de(segmento).get("Cars Names")
+            por_clave = {}
+            for codigo, valor in enumerate(columna["valores"] if columna else []):
+                por_clave.setdefault(motor.clave_marca(valor), []).append(codigo)
+            self._modelos[segmento["nombre"]] = por_clave
+        return self._modelos[segmento["nombre"]].get(modelo, [])
+
+    # Un segmento se descarta si su mapa de zonas no puede cumplir los filtros
+    def _descartable(self, segmento, rangos, pedidos):
+        for columna, (minimo, maximo) in rangos.items():
+            zona = segmento["zonas"].get(columna)
+            if zona is None or zona[1] < minimo or zona[0] > maximo:
+                return True
+        if "Cars Names" in pedidos and not self._codigos_modelo(segmento, pedidos["Cars Names"]):
+            return True
+        return any(codigo not in segmento["codigos"][columna]
+                   for columna, codigo in pedidos.items() if columna in COLUMNAS_CATEGORICAS)
+
+    # Posiciones del segmento que cumplen los filtros (None si se descarta entero)
+    def _filtrar(self, segmento, rangos, pedidos):
+        if self._descartable(segmento, rangos, pedidos):
+            return None
+        mascara = np.ones(segmento["filas"], dtype=bool)
+        for columna, (minimo, maximo) in rangos.items():
+            valores = self._columna(segmento, columna)
+            mascara &= (valores >= minimo) & (valores <= maximo)
+        for columna, codigo in pedidos.items():
+            if columna in COLUMNAS_CATEGORICAS:
+                mascara &= self._columna(segmento, columna) == codigo
+        if "Cars Names" in pedidos:
+            columna = self._columnas_de(segmento)["Cars Names"]
+            nombres = np.load(os.path.join(self._carpeta(segmento), columna["archivo"]), mmap_mode="r")
+            mascara &= np.isin(nombres, self._codigos_modelo(segmento, pedidos["Cars Names"]))
+        return np.flatnonzero(mascara)
+
+    def _puntuar(self, segmento, posiciones, respuestas, resumen):
+        precios = self._columna(segmento, "Cars Prices")[posiciones]
+        hp = self._columna(segmento, "HorsePower")[posiciones]
+        asientos = self._columna(segmento, "Seats")[posiciones]
+        coincide = {}
+        for columna, campo in (("Fuel Types", "combustible"), ("Company Names", "marca")):
+            codigo = self.codigo_de[columna].get(respuestas[campo], -1)
+            coincide[campo] = self._columna(segmento, columna)[posiciones] == codigo
+        if resumen is None:
+            return motor.resumen_filtrado(precios, hp, asientos)
+        return precios, motor.componentes_puntuacion(
+            precios, hp, asientos, coincide["combustible"], coincide["marca"], respuestas, resumen
+        )
+
+    # Filas completas (con todas las columnas) de un segmento
+    def _materializar(self, segmento, posiciones):
+        carpeta = self._carpeta(segmento)
+        datos = {}
+        for nombre, columna in self._columnas_de(segmento).items():
+            valores = cache_catalogo.leer_columna(carpeta, columna, posiciones)
+            if columna["tipo"] == "categoria":
+                valores = valores.set_categories(self.categorias_ordenadas[nombre])
+            datos[nombre] = valores
+        return pd.DataFrame(datos, index=cache_catalogo.leer_indice(carpeta, posiciones))
+
+    # Los k mejores vehículos y el total de coincidencias, recorriendo los
+    # segmentos dos veces: una para el resumen global del conjunto filtrado y
+    # otra para puntuar y quedarse con los k mejores de cada segmento
+    def recomendar_top(self, respuestas=None, k=motor.TOP_K):
+        k = motor.validar_k(k)
+        respuestas = motor.canonizar_respuestas(respuestas)
+        rangos, pedidos = self._rangos(respuestas), self._codigos_pedidos(respuestas)
+
+        total, resumenes = 0, []
+        for segmento in self.segmentos:
+            posiciones = self._filtrar(segmento, rangos, pedidos)
+            if posiciones is not None and len(posiciones):
+                total += len(posiciones)
+                resumenes.append(self._puntuar(segmento, posiciones, respuestas, None))
+        if total == 0:
+            return self._materializar(self.segmentos[0], []) if self.segmentos else pd.DataFrame(), 0
+        resumen = motor.combinar_resumenes(resumenes)
+
+        candidatos = []
+        for numero, segmento in enumerate(self.segmentos):
+            posiciones = self._filtrar(segmento, rangos, pedidos)
+            if posiciones is None or not len(posiciones):
+                continue
+            precios, componentes = self._puntuar(segmento, posiciones, respuestas, resumen)
+            mejores = motor.seleccionar_top(componentes['puntuacion_total'], precios, k)
+            candidatos.append((numero, posiciones[mejores], precios[mejores],
+                               {nombre: np.asarray(v)[mejores] for nombre, v in componentes.items()}))
+
+        # Mezcla de los candidatos: mismo orden que el catálogo en memoria
+        orden_global = np.concatenate([self.segmentos[n]["inicio"] + p for n, p, _, _ in candidatos])
+        precios = np.concatenate([c[2] for c in candidatos])
+        puntuacion = np.concatenate([c[3]['puntuacion_total'] for c in candidatos])
+        elegidos = np.lexsort((orden_global, precios, -puntuacion))[:k]
+
+        # Materializar solo las filas elegidas, segmento por segmento
+        limites = np.cumsum([0] + [len(c[1]) for c in candidatos])
+        partes = []
+        for i, (numero, posiciones, _, componentes) in enumerate(candidatos):
+            locales = elegidos[(elegidos >= limites[i]) & (elegidos < limites[i + 1])] - limites[i]
+            if len(locales):
+                parte = self._materializar(self.segmentos[numero], posiciones[locales])
+                for nombre, valores in componentes.items():
+                    parte[nombre] = valores[locales]
+                parte["_orden"] = limites[i] + locales
+                partes.append(parte)
+        resultados = pd.concat(partes)
+        rango = {posicion: i for i, posicion in enumerate(elegidos)}
+        resultados = resultados.iloc[np.argsort([rango[o] for o in resultados["_orden"]])]
+        return resultados.drop(columns="_orden"), total
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Almacén en disco del catálogo del Asesor Inteligente")
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+
+    ingerir = ordenes.add_parser("ingerir", help="Convierte un CSV en un almacén por segmentos")
+    ingerir.add_argument("csv")
+    ingerir.add_argument("directorio")
+    ingerir.add_argument("--filas-por-segmento", type=int, default=FILAS_POR_SEGMENTO)
+
+    consultar = ordenes.add_parser("consultar", help="Recomienda vehículos desde un almacén")
+    consultar.add_argument("directorio")
+    consultar.add_argument("respuestas", nargs="?", default="{}", help="Preferencias en JSON")
+    consultar.add_argument("-k", type=int, default=motor.TOP_K)
+
+    args = parser.parse_args(argumentos)
+    if args.orden == "ingerir":
+        almacen = ingerir_csv(args.csv, args.directorio, args.filas_por_segmento)
+        print(f"✅ {len(almacen):,} vehículos en {len(almacen.segmentos)} segmentos")
+    else:
+        almacen = AlmacenCatalogo(args.directorio)
+        resultados, total = almacen.recomendar_top(json.loads(args.respuestas), k=args.k)
+        print(f"{len(resultados)} de {total} resultados")
+        for _, fila in resultados.iterrows():
+            print(f"  {fila['puntuacion_total']:6.2f}  {fila['Company Names']} {fila['Cars Names']}"
+                  f"  ${fila['Cars Prices']:,.0f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# Mide el arranque en frío del motor sin interfaz y del asistente Tk.
+#
+# Cada medición se ejecuta en un proceso nuevo para que no influyan los
+# módulos ya importados. Uso:
+#
+#     python benchmarks/arranque.py [repeticiones]
+
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Código que se cronometra en cada ruta (importación + carga + una consulta)
+RUTAS = {
+    "motor (sin interfaz)": (
+        "import motor\n"
+        "catalogo = motor.cargar_catalogo()\n"
+        "motor.recomendar_vehiculos({}, catalogo)\n"
+    ),
+    "asistente Tk": (
+        "import customtkinter\n"
+        "from PIL import Image\n"
+        "import motor\n"
+        "catalogo = motor.cargar_catalogo()\n"
+        "motor.recomendar_vehiculos({}, catalogo)\n"
+        "import os\n"
+        "if os.environ.get('DISPLAY') or os.name == 'nt':\n"
+        "    ventana = customtkinter.CTk()\n"
+        "    ventana.update()\n"
+        "    ventana.destroy()\n"
+    ),
+}
+
+PLANTILLA = (
+    "import time\n"
+    "t0 = time.perf_counter()\n"
+    "{codigo}"
+    "print(time.perf_counter() - t0)\n"
+)
+
+
+def medir(codigo, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        proceso = subprocess.run(
+            [sys.executable, "-c", PLANTILLA.format(codigo=codigo)],
+            cwd=RAIZ, capture_output=True, text=True
+        )
+        if proceso.returncode != 0:
+            return None, proceso.stderr.strip().splitlines()[-1]
+        tiempos.append(float(proceso.stdout.strip().splitlines()[-1]))
+    return tiempos, None
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"Arranque en frío ({repeticiones} procesos por ruta)")
+    for nombre, codigo in RUTAS.items():
+        tiempos, error = medir(codigo, repeticiones)
+        if error:
+            print(f"  {nombre:<22} no disponible: {error}")
+            continue
+        print(f"  {nombre:<22} mediana {statistics.median(tiempos) * 1000:8.1f} ms"
+              f"   mín {min(tiempos) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Búsqueda de marcas y modelos: tiempo de construir el índice de modelos y el
+# buscador (una vez al cargar) y latencia por pulsación (p50 y p99) al escribir
+# letra a letra nombres del catálogo, sin erratas y con una o dos (letra
+# cambiada, quitada o intercambiada), sobre copias del catálogo con un sufijo
+# distinto en cada modelo.
+#
+#     python benchmarks/busqueda.py [modelos ...]
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import motor  # noqa: E402
+
+CONSULTAS = 200
+LETRAS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def con_erratas(texto, erratas, azar):
+    for _ in range(erratas):
+        if len(texto) < 4:
+            break
+        i = int(azar.integers(1, len(texto) - 1))
+        cambio = azar.integers(3)
+        if cambio == 0:
+            texto = texto[:i] + LETRAS[azar.integers(len(LETRAS))] + texto[i + 1:]
+        elif cambio == 1:
+            texto = texto[:i] + texto[i + 1:]
+        else:
+            texto = texto[:i - 1] + texto[i] + texto[i - 1] + texto[i + 1:]
+    return texto
+
+
+def percentiles(tiempos):
+    return f"{np.percentile(tiempos, 50) * 1000:>8.2f} ms {np.percentile(tiempos, 99) * 1000:>8.2f} ms"
+
+
+def main():
+    tamanos = [int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    base = motor.cargar_catalogo().df
+    azar = np.random.default_rng(0)
+
+    print(f"{'modelos':>10} {'índice':>10} {'buscador':>10} {'prefijos p50':>13} {'p99':>11}"
+          f" {'erratas p50':>12} {'p99':>11}")
+    for modelos in tamanos:
+        df = base.iloc[np.arange(modelos) % len(base)].reset_index(drop=True)
+        sufijos = ["".join(letras) for letras in azar.choice(list(LETRAS), (modelos, 3))]
+        df["Cars Names"] = [f"{nombre} {sufijo}{i // len(base)}"
+                            for i, (nombre, sufijo) in enumerate(zip(df["Cars Names"].astype(str), sufijos))]
+        catalogo = motor.Catalogo(df)
+
+        comienzo = time.perf_counter()
+        catalogo.indice_modelo
+        indice = time.perf_counter() - comienzo
+        comienzo = time.perf_counter()
+        catalogo.buscador_modelos
+        buscador = time.perf_counter() - comienzo
+
+        nombres = (df["Company Names"].astype(str) + " " + df["Cars Names"]).to_numpy()
+        prefijos, erratas = [], []
+        for fila in azar.choice(modelos, CONSULTAS, replace=False):
+            nombre = nombres[fila].lower()
+            for tiempos, texto in ((prefijos, nombre), (erratas, con_erratas(nombre, 1 + fila % 2, azar))):
+                for fin in range(1, min(len(texto), 16) + 1):
+                    comienzo = time.perf_counter()
+                    motor.buscar_modelos(texto[:fin], catalogo)
+                    tiempos.append(time.perf_counter() - comienzo)
+
+        print(f"{modelos:>10,} {indice * 1000:>7.0f} ms {buscador * 1000:>7.0f} ms"
+              f" {percentiles(prefijos):>25} {percentiles(erratas):>24}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Compara el arranque leyendo el CSV (lectura + preprocesar_datos) con la carga
+# desde la caché columnar.
+#
+#     python benchmarks/cache_catalogo.py [copias] [repeticiones]
+#
+# "copias" replica DATASET.csv N veces en un CSV temporal para ver cómo escala
+# cada ruta con el tamaño del catálogo (por defecto 1 = el dataset original).
+
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import motor  # noqa: E402
+
+
+def preparar_csv(copias, carpeta):
+    if copias <= 1:
+        ruta = os.path.join(carpeta, "DATASET.csv")
+        shutil.copyfile(motor.RUTA_DATASET, ruta)
+        return ruta
+    with open(motor.RUTA_DATASET, encoding="latin1") as archivo:
+        cabecera, *filas = archivo.readlines()
+    ruta = os.path.join(carpeta, f"DATASET_x{copias}.csv")
+    with open(ruta, "w", encoding="latin1") as archivo:
+        archivo.write(cabecera)
+        for _ in range(copias):
+            archivo.writelines(filas)
+    return ruta
+
+
+def cronometrar(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return statistics.median(tiempos)
+
+
+def main():
+    copias = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = preparar_csv(copias, carpeta)
+        filas = len(motor.cargar_catalogo(ruta))  # También genera la caché
+
+        frio = cronometrar(lambda: motor.cargar_catalogo(ruta, usar_cache=False), repeticiones)
+        caliente = cronometrar(lambda: motor.cargar_catalogo(ruta), repeticiones)
+
+    print(f"Catálogo de {filas:,} filas (mediana de {repeticiones})")
+    print(f"  CSV + preprocesar_datos : {frio * 1000:9.1f} ms")
+    print(f"  caché columnar          : {caliente * 1000:9.1f} ms   ({frio / caliente:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
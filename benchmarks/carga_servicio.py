@@ -0,0 +1,96 @@
+# Prueba de carga del servicio HTTP: varios clientes concurrentes envían
+# preferencias al azar a /recommend y se mide el rendimiento y la latencia vista
+# por el cliente. Sin URL arranca el servicio en este mismo proceso (puerto
+# libre); con URL prueba un servicio ya en marcha.
+#
+#     python benchmarks/carga_servicio.py [clientes] [peticiones_por_cliente] [url]
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import motor  # noqa: E402
+import servicio  # noqa: E402
+from recarga import CatalogoVivo  # noqa: E402
+
+
+def preferencias_aleatorias(catalogo, azar):
+    preferencias = {"k": motor.TOP_K}
+    if azar.random() < 0.6:
+        preferencias["presupuesto_max"] = azar.choice([20000, 40000, 80000, 200000])
+    if azar.random() < 0.4:
+        preferencias["combustible"] = azar.choice(catalogo.combustibles_disponibles)
+    if azar.random() < 0.4:
+        preferencias["asientos"] = azar.choice([2, 4, 5, 7])
+    if azar.random() < 0.3:
+        preferencias["marca"] = azar.choice(catalogo.marcas_disponibles)
+    if azar.random() < 0.4:
+        preferencias["hp_min"] = azar.choice([100, 200, 400])
+    return preferencias
+
+
+def cliente(url, peticiones, catalogo, semilla, latencias, errores):
+    azar = random.Random(semilla)
+    for _ in range(peticiones):
+        cuerpo = json.dumps(preferencias_aleatorias(catalogo, azar)).encode()
+        peticion = urllib.request.Request(url + "/recommend", data=cuerpo,
+                                          headers={"Content-Type": "application/json"})
+        comienzo = time.perf_counter()
+        try:
+            with urllib.request.urlopen(peticion) as respuesta:
+                respuesta.read()
+        except OSError:
+            errores.append(1)
+            continue
+        latencias.append(time.perf_counter() - comienzo)
+
+
+def main():
+    clientes = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    peticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    url = sys.argv[3].rstrip("/") if len(sys.argv) > 3 else None
+
+    catalogo = motor.cargar_catalogo()
+    servidor = None
+    if url is None:
+        servidor = servicio.ServidorRecomendaciones(("127.0.0.1", 0), servicio.Servicio(CatalogoVivo(catalogo)))
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{servidor.server_port}"
+
+    latencias, errores = [], []
+    hilos = [threading.Thread(target=cliente, args=(url, peticiones, catalogo, i, latencias, errores))
+             for i in range(clientes)]
+    comienzo = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - comienzo
+
+    ms = np.array(latencias) * 1000
+    print(f"{clientes} clientes x {peticiones} peticiones contra {url}")
+    print(f"  {len(latencias) / duracion:8.1f} peticiones/s   errores: {len(errores)}")
+    if len(ms):
+        print(f"  cliente  p50 {np.percentile(ms, 50):7.2f} ms   p95 {np.percentile(ms, 95):7.2f} ms"
+              f"   p99 {np.percentile(ms, 99):7.2f} ms")
+    with urllib.request.urlopen(url + "/stats") as respuesta:
+        estadisticas = json.load(respuesta)
+    latencia = estadisticas["latencia"]
+    print(f"  servidor p50 {latencia['p50_ms']} ms   p95 {latencia['p95_ms']} ms   p99 {latencia['p99_ms']} ms"
+          f"   (caché: {estadisticas['cache']['tasa_aciertos']:.0%} aciertos)")
+
+    if servidor is not None:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
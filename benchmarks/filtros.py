@@ -0,0 +1,70 @@
+# Latencia de la cadena de filtros: máscaras booleanas sobre una copia del
+# catálogo (implementación anterior) frente a los índices de indices.py.
+#
+#     python benchmarks/filtros.py [copias ...]
+
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import motor  # noqa: E402
+
+CONSULTAS = [
+    {"presupuesto_min": 20000, "presupuesto_max": 45000, "combustible": "petrol"},
+    {"marca": "kia", "asientos": 7},
+    {"hp_min": 300, "hp_max": 600, "combustible": "petrol", "asientos": 4},
+    {"presupuesto_max": 30000, "marca": "toyota", "hp_min": 100},
+]
+
+
+# Cadena de máscaras tal como estaba en recomendar_vehiculos
+def filtrar_con_mascaras(df, respuestas):
+    resultados = df.copy()
+    if respuestas["presupuesto_min"] > 0 or respuestas["presupuesto_max"] < float('inf'):
+        resultados = resultados[(resultados["Cars Prices"] >= respuestas["presupuesto_min"]) &
+                                (resultados["Cars Prices"] <= respuestas["presupuesto_max"])]
+    if respuestas["hp_min"] > 0 or respuestas["hp_max"] < float('inf'):
+        resultados = resultados[(resultados["HorsePower"] >= respuestas["hp_min"]) &
+                                (resultados["HorsePower"] <= respuestas["hp_max"])]
+    if respuestas["combustible"] != "":
+        resultados = resultados[resultados["Fuel Types"].astype(str).str.lower().str.strip()
+                                == motor.normalizar(respuestas["combustible"])]
+    if respuestas["asientos"] > 0:
+        resultados = resultados[resultados["Seats"] >= respuestas["asientos"]]
+    if respuestas["marca"] != "":
+        resultados = resultados[resultados["Company Names"].astype(str).str.lower().str.strip()
+                                == motor.normalizar(respuestas["marca"])]
+    return resultados
+
+
+def cronometrar(funcion, repeticiones=5):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return statistics.median(tiempos)
+
+
+def main():
+    tamanos = [int(x) for x in sys.argv[1:]] or [1, 10, 100]
+    base = motor.cargar_catalogo().df
+    consultas = [motor.normalizar_respuestas(c) for c in CONSULTAS]
+
+    print(f"{'filas':>10} {'máscaras':>12} {'índices':>12}")
+    for copias in tamanos:
+        df = pd.concat([base] * copias, ignore_index=True)
+        catalogo = motor.Catalogo(df)
+        mascaras = sum(cronometrar(lambda: filtrar_con_mascaras(df, c)) for c in consultas) / len(consultas)
+        indices = sum(cronometrar(lambda: catalogo.df.iloc[motor.filtrar_posiciones(c, catalogo)])
+                      for c in consultas) / len(consultas)
+        print(f"{len(df):>10,} {mascaras * 1000:>10.2f}ms {indices * 1000:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
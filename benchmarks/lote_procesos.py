@@ -0,0 +1,42 @@
+# Escalado del modo por lotes (lote.py) con el número de procesos: genera un
+# archivo de perfiles al azar y mide clientes/s con 1, 2, 4... procesos hasta
+# el número de núcleos.
+#
+#     python benchmarks/lote_procesos.py [perfiles]
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lote  # noqa: E402
+import motor  # noqa: E402
+from puntuacion_lote import perfiles_aleatorios  # noqa: E402
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    catalogo = motor.cargar_catalogo()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        entrada = os.path.join(carpeta, "perfiles.jsonl")
+        with open(entrada, "w", encoding="utf-8") as archivo:
+            for i, perfil in enumerate(perfiles_aleatorios(catalogo, n, semilla=0)):
+                datos = {c: v for c, v in perfil.items() if v not in ("", 0, float("inf"))}
+                archivo.write(json.dumps(dict(datos, cliente=i)) + "\n")
+
+        procesos, nucleos = 1, os.cpu_count() or 1
+        print(f"{n:,} perfiles, {len(catalogo):,} vehículos, {nucleos} núcleos")
+        while procesos <= nucleos:
+            comienzo = time.perf_counter()
+            lote.procesar_archivo(entrada, os.path.join(carpeta, "salida.jsonl"), procesos=procesos)
+            duracion = time.perf_counter() - comienzo
+            print(f"  {procesos:3d} procesos  {duracion:7.2f} s  {n / duracion:9.0f} clientes/s")
+            procesos *= 2
+
+
+if __name__ == "__main__":
+    main()
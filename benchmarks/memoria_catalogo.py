@@ -0,0 +1,37 @@
+# Memoria del catálogo con marcas y combustibles como texto (antes) frente a
+# categorías canónicas con códigos enteros (ahora).
+#
+#     python benchmarks/memoria_catalogo.py [copias ...]
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import motor  # noqa: E402
+
+COLUMNAS = ["Company Names", "Fuel Types"]
+
+
+def mib(bytes_):
+    return bytes_ / 2**20
+
+
+def main():
+    tamanos = [int(x) for x in sys.argv[1:]] or [1, 1000]
+    categorico = motor.cargar_catalogo().df
+    texto = categorico.astype({columna: str for columna in COLUMNAS})
+
+    print(f"{'filas':>10} {'marca+combustible':>26} {'catálogo completo':>26}")
+    for copias in tamanos:
+        antes = pd.concat([texto] * copias, ignore_index=True).memory_usage(deep=True)
+        ahora = pd.concat([categorico] * copias, ignore_index=True).memory_usage(deep=True)
+        print(f"{len(categorico) * copias:>10,}"
+              f" {mib(antes[COLUMNAS].sum()):>10.2f} -> {mib(ahora[COLUMNAS].sum()):6.2f} MiB"
+              f" {mib(antes.sum()):>12.2f} -> {mib(ahora.sum()):7.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Modo Pareto: skyline (frontera) del catálogo completo frente a la comparación
+# por pares, y tiempo de recomendar_pareto para la primera página y para
+# páginas más profundas (que obligan a pelar más capas; cada una se pide
+# después de la anterior, así que solo mide las capas nuevas), sobre copias del
+# catálogo con los precios variados.
+#
+#     python benchmarks/pareto.py [copias ...]
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import motor  # noqa: E402
+
+# Por encima de estas filas no se mide la comparación por pares (cuadrática)
+MAX_PARES = 20_000
+PAGINAS = (0, 10, 100)
+
+
+def skyline_pares(precios, hp, asientos):
+    hp = np.where(np.isnan(hp), -np.inf, hp)
+    asientos = np.where(np.isnan(asientos), -np.inf, asientos)
+    frente = np.ones(len(precios), dtype=bool)
+    for i in range(len(precios)):
+        al_menos = (precios <= precios[i]) & (hp >= hp[i]) & (asientos >= asientos[i])
+        mejor = (precios < precios[i]) | (hp > hp[i]) | (asientos > asientos[i])
+        frente[i] = not (al_menos & mejor).any()
+    return frente
+
+
+def main():
+    tamanos = [int(x) for x in sys.argv[1:]] or [1, 10, 100, 1000]
+    base = motor.cargar_catalogo().df
+    azar = np.random.default_rng(0)
+
+    cabecera = "".join(f"{f'página {p}':>12}" for p in PAGINAS)
+    print(f"{'filas':>10} {'skyline':>12} {'por pares':>12} {'frontera':>9}{cabecera}")
+    for copias in tamanos:
+        df = pd.concat([base] * copias, ignore_index=True)
+        if copias > 1:
+            df["Cars Prices"] = df["Cars Prices"] * azar.uniform(0.8, 1.2, len(df))
+        catalogo = motor.Catalogo(df)
+        precios = catalogo.indice_precio.valores
+        hp, asientos = catalogo.indice_hp.valores, catalogo.indice_asientos.valores
+
+        comienzo = time.perf_counter()
+        frente = motor.skyline(precios, hp, asientos)
+        rapido = time.perf_counter() - comienzo
+
+        pares = ""
+        if len(df) <= MAX_PARES:
+            comienzo = time.perf_counter()
+            if not np.array_equal(skyline_pares(precios, hp, asientos), frente):
+                print("  ⚠️ el skyline no coincide con la comparación por pares")
+            pares = f"{(time.perf_counter() - comienzo) * 1000:9.1f} ms"
+
+        # La clasificación se calcula antes para medir solo las capas
+        motor.clasificar(motor.canonizar_respuestas({}), catalogo)
+        paginas = ""
+        for pagina in PAGINAS:
+            comienzo = time.perf_counter()
+            motor.recomendar_pareto({}, catalogo, pagina * motor.TAMANO_PAGINA)
+            paginas += f"{(time.perf_counter() - comienzo) * 1000:9.1f} ms"
+
+        print(f"{len(df):>10,} {rapido * 1000:>9.1f} ms {pares:>12} {int(frente.sum()):>9,}{paginas}")
+
+
+if __name__ == "__main__":
+    main()
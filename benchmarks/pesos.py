@@ -0,0 +1,79 @@
+# Pesos ajustables: coste de reordenar con otros pesos a partir de la matriz
+# de componentes ya calculada (producto matriz-vector y los primeros puestos)
+# frente a volver a puntuar y ordenar todo el conjunto filtrado, sobre copias
+# del catálogo con los precios variados. Las dos rutas devuelven la misma
+# página (filas con sus componentes y puntuación); "cálculo" es solo el
+# producto y la selección, sin construir el DataFrame de la página.
+#
+#     python benchmarks/pesos.py [copias ...]
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import motor  # noqa: E402
+
+CAMBIOS = 20
+
+
+def pesos_aleatorios(azar):
+    return dict(zip(motor.PESOS, azar.uniform(0.05, 1, len(motor.PESOS))))
+
+
+def main():
+    tamanos = [int(x) for x in sys.argv[1:]] or [1, 10, 100, 1000]
+    base = motor.cargar_catalogo().df
+    azar = np.random.default_rng(0)
+    respuestas = motor.canonizar_respuestas({})
+
+    print(f"{'filas':>10} {'matriz':>12} {'cálculo p50':>12} {'reordenar p50':>14} {'repuntuar p50':>14}")
+    for copias in tamanos:
+        df = pd.concat([base] * copias, ignore_index=True)
+        if copias > 1:
+            df["Cars Prices"] = df["Cars Prices"] * azar.uniform(0.8, 1.2, len(df))
+        catalogo = motor.Catalogo(df)
+        motor.clasificar(respuestas, catalogo)
+
+        comienzo = time.perf_counter()
+        motor.matriz_componentes(respuestas, catalogo)
+        matriz = time.perf_counter() - comienzo
+
+        calculo, reordenar, repuntuar = [], [], []
+        posiciones = motor.filtrar_posiciones(respuestas, catalogo)
+        for _ in range(CAMBIOS):
+            pesos = pesos_aleatorios(azar)
+
+            comienzo = time.perf_counter()
+            componentes = motor.matriz_componentes(respuestas, catalogo)
+            motor.seleccionar_top(componentes.puntuacion(motor.normalizar_pesos(pesos)), componentes.precios,
+                                  motor.TAMANO_PAGINA)
+            calculo.append(time.perf_counter() - comienzo)
+
+            comienzo = time.perf_counter()
+            motor.recomendar_pagina(respuestas, catalogo, pesos=pesos)
+            reordenar.append(time.perf_counter() - comienzo)
+
+            # Sin matriz: puntuar de nuevo cada fila con los pesos y ordenar
+            comienzo = time.perf_counter()
+            componentes = motor.puntuar_posiciones(posiciones, respuestas, catalogo)
+            normalizados = motor.normalizar_pesos(pesos)
+            puntuacion = np.round(sum(componentes[columna] * normalizados[criterio]
+                                      for criterio, columna in motor.COMPONENTES_PESOS.items()) * 100, 2)
+            pagina = np.lexsort((catalogo.indice_precio.valores[posiciones], -puntuacion))[:motor.TAMANO_PAGINA]
+            filas = catalogo.df.iloc[posiciones[pagina]]
+            columnas = {columna: componentes[columna][pagina] for columna in motor.COMPONENTES_PESOS.values()}
+            columnas["puntuacion_total"] = puntuacion[pagina]
+            pd.concat([filas, pd.DataFrame(columnas, index=filas.index)], axis=1)
+            repuntuar.append(time.perf_counter() - comienzo)
+
+        print(f"{len(df):>10,} {matriz * 1000:>9.1f} ms {np.median(calculo) * 1000:>9.2f} ms"
+              f" {np.median(reordenar) * 1000:>11.2f} ms {np.median(repuntuar) * 1000:>11.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Puntuación de muchos perfiles: bucle perfil a perfil (recomendar_vehiculos
+# con calcular_puntuacion, y recomendar_top) frente a recomendar_lote.
+#
+#     python benchmarks/puntuacion_lote.py [perfiles] [copias]
+
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import motor  # noqa: E402
+
+
+def perfiles_aleatorios(catalogo, n, semilla=0):
+    azar = random.Random(semilla)
+    combustibles = [""] + [c.lower() for c in catalogo.combustibles_disponibles]
+    marcas = [""] * 5 + [m.lower() for m in catalogo.marcas_disponibles]
+    perfiles = []
+    for _ in range(n):
+        minimo = azar.choice([0, 0, 10000, 25000, 50000])
+        perfiles.append({
+            "presupuesto_min": minimo,
+            "presupuesto_max": azar.choice([float("inf"), minimo + 30000, minimo + 150000]),
+            "combustible": azar.choice(combustibles),
+            "asientos": azar.choice([0, 0, 2, 4, 5, 7]),
+            "marca": azar.choice(marcas),
+            "hp_min": azar.choice([0, 0, 100, 200]),
+            "hp_max": azar.choice([float("inf"), 400, 800]),
+        })
+    return perfiles
+
+
+def cronometrar(funcion):
+    t0 = time.perf_counter()
+    funcion()
+    return time.perf_counter() - t0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    copias = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    base = motor.cargar_catalogo().df
+    catalogo = motor.Catalogo(pd.concat([base] * copias, ignore_index=True))
+    perfiles = perfiles_aleatorios(catalogo, n)
+
+    vehiculos = cronometrar(lambda: [motor.recomendar_vehiculos(p, catalogo).head(motor.TOP_K) for p in perfiles])
+    top = cronometrar(lambda: [motor.recomendar_top(p, catalogo, usar_cache=False) for p in perfiles])
+    lote = cronometrar(lambda: motor.recomendar_lote(perfiles, catalogo))
+
+    print(f"{n} perfiles sobre {len(catalogo):,} filas")
+    print(f"  bucle recomendar_vehiculos : {vehiculos * 1000:9.1f} ms")
+    print(f"  bucle recomendar_top       : {top * 1000:9.1f} ms")
+    print(f"  recomendar_lote            : {lote * 1000:9.1f} ms   ({vehiculos / lote:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# "Más como este": construcción del árbol k-d y búsqueda de los k vecinos
+# frente a medir la distancia a todo el catálogo, sobre copias del catálogo
+# con los precios variados y los modelos renombrados (para que no haya puntos ni
+# modelos repetidos).
+#
+#     python benchmarks/similares.py [copias ...]
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import motor  # noqa: E402
+
+
+def main():
+    tamanos = [int(x) for x in sys.argv[1:]] or [1, 100, 1000]
+    base = motor.cargar_catalogo().df
+    azar = np.random.default_rng(0)
+
+    print(f"{'filas':>10} {'construir':>12} {'árbol p50':>12} {'directo p50':>12} {'similares p50':>14}")
+    for copias in tamanos:
+        df = pd.concat([base] * copias, ignore_index=True)
+        if copias > 1:
+            df["Cars Prices"] = df["Cars Prices"] * azar.uniform(0.8, 1.2, len(df))
+            df["Cars Names"] = df["Cars Names"].astype(str) + " #" + (df.index // len(base)).astype(str)
+        catalogo = motor.Catalogo(df)
+
+        comienzo = time.perf_counter()
+        indice = catalogo.indice_similitud
+        construir = time.perf_counter() - comienzo
+
+        puntos = indice.arbol.puntos
+        muestras = azar.integers(len(df), size=200)
+        arbol, directo, similares = [], [], []
+        for i in muestras:
+            comienzo = time.perf_counter()
+            indice.arbol.vecinos(puntos[i], motor.TOP_K)
+            arbol.append(time.perf_counter() - comienzo)
+
+            comienzo = time.perf_counter()
+            distancias = ((puntos - puntos[i]) ** 2).sum(axis=1)
+            np.argpartition(distancias, motor.TOP_K)[:motor.TOP_K]
+            directo.append(time.perf_counter() - comienzo)
+
+            comienzo = time.perf_counter()
+            motor.vehiculos_similares(df.iloc[i], catalogo)
+            similares.append(time.perf_counter() - comienzo)
+
+        print(f"{len(df):>10,} {construir * 1000:>9.1f} ms {np.median(arbol) * 1000:>9.3f} ms"
+              f" {np.median(directo) * 1000:>9.3f} ms {np.median(similares) * 1000:>11.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# Prueba de resistencia del asistente Tk: recorre el asistente completo miles
+# de veces (las cinco preguntas, las sugerencias y "Volver al inicio") y muestra
+# cuántos widgets existen y cuánta memoria usa el proceso cada cierto número de
+# ciclos. Con las pantallas reutilizadas ambas cifras deben quedarse planas.
+# Necesita una pantalla (DISPLAY), por ejemplo con xvfb-run.
+#
+#     python benchmarks/soak_asistente.py [ciclos] [cada]
+
+import importlib.util
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+ORDEN = ["presupuesto", "combustible", "asientos", "marca", "hp"]
+
+# Respuestas que se aplican al azar tras cada pregunta contestada
+PERFILES = [
+    {"presupuesto_max": 30000},
+    {"combustible": "petrol"},
+    {"asientos": 7},
+    {"marca": "toyota"},
+    {"hp_min": 300},
+    {"marca": "marca inexistente"},
+]
+
+
+# Importa "ASESOR INTELIGENTE.py" y crea su ventana sin arrancar el bucle de eventos
+def cargar_asistente():
+    os.chdir(RAIZ)
+    spec = importlib.util.spec_from_file_location("asistente", os.path.join(RAIZ, "ASESOR INTELIGENTE.py"))
+    asistente = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(asistente)
+    asistente.crear_ventana()
+    return asistente
+
+
+def contar_widgets(widget):
+    return 1 + sum(contar_widgets(hijo) for hijo in widget.winfo_children())
+
+
+def memoria_residente_mib():
+    try:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return float("nan")
+
+
+# Un recorrido completo con respuestas al azar
+def ciclo(asistente, azar):
+    asistente.mostrar_ventana("inicio")
+    for filtro in ORDEN:
+        asistente.mostrar_filtro(filtro)
+        if azar.random() < 0.5:
+            asistente.mostrar_pregunta(filtro)
+            asistente.respuestas.update(azar.choice(PERFILES))
+    asistente.mostrar_sugerencias()
+    # La búsqueda corre en otro hilo: procesar eventos hasta que llegue
+    while asistente.consulta_actual is not None:
+        asistente.ventana.update()
+        time.sleep(0.001)
+    asistente.ventana.update()
+    asistente.resetear_filtros()
+    asistente.mostrar_ventana("inicio")
+    asistente.ventana.update()
+
+
+def main():
+    ciclos = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cada = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    if not os.environ.get("DISPLAY") and os.name != "nt":
+        print("Se necesita una pantalla (DISPLAY); prueba con: xvfb-run python benchmarks/soak_asistente.py")
+        return
+
+    asistente = cargar_asistente()
+    azar = random.Random(0)
+    tracemalloc.start()
+
+    print(f"{'ciclo':>7} {'widgets':>8} {'python MiB':>11} {'proceso MiB':>12}")
+    for i in range(1, ciclos + 1):
+        ciclo(asistente, azar)
+        if i == 1 or i % cada == 0:
+            actual, _ = tracemalloc.get_traced_memory()
+            print(f"{i:>7} {contar_widgets(asistente.ventana):>8} {actual / 2**20:>11.2f}"
+                  f" {memoria_residente_mib():>12.1f}")
+    asistente.ventana.destroy()
+
+
+if __name__ == "__main__":
+    main()
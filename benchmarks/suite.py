@@ -0,0 +1,255 @@
+# Suite de rendimiento por etapas sobre catálogos sintéticos
+#
+# Genera catálogos con el mismo formato que DATASET.csv ("$1,100,000",
+# "70-85 hp", "2.5 sec"...) del tamaño pedido y mide, para un conjunto fijo de
+# perfiles representativos, el tiempo y el pico de memoria de cada etapa:
+# preprocesar_datos, construcción del catálogo (índices), filtrar_posiciones,
+# calcular_puntuacion (sobre las filas ya filtradas), recomendar_vehiculos
+# completo (filtro, puntuación y orden), recomendar_top, generar_explicaciones y
+# el texto de las tarjetas de resultados. También guarda una huella de los k
+# primeros de cada perfil, para detectar cambios en los resultados además de en
+# el rendimiento.
+#
+#     python benchmarks/suite.py                          # 1k, 100k y 1M filas
+#     python benchmarks/suite.py 1000 10000000            # 10M necesita varios GB de RAM
+#     python benchmarks/suite.py --guardar                # guarda la línea base
+#     python benchmarks/suite.py --comparar               # compara con la línea base
+#
+# Con --comparar sale con código 1 si alguna etapa es más lenta o usa más
+# memoria que la línea base por encima de la tolerancia, si cambian los
+# resultados o si recomendar_top no coincide con recomendar_vehiculos. El pico
+# de memoria se mide con tracemalloc en una pasada aparte (más lenta) para no
+# falsear los tiempos; --sin-memoria la omite.
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import motor  # noqa: E402
+
+TAMANOS = [1_000, 100_000, 1_000_000]
+SEMILLA = 0
+RUTA_LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linea_base.json")
+TOLERANCIA = 0.25
+# Diferencia de tiempo por debajo de la cual no se marca una regresión (las
+# etapas de pocos milisegundos varían más que eso entre ejecuciones)
+MARGEN_SEGUNDOS = 0.002
+
+# Variaciones de precio de las filas sintéticas respecto a la fila real de la
+# que salen (del 80 % al 120 %, de 1 en 1)
+FACTORES_PRECIO = np.arange(80, 121) / 100
+
+PERFILES = {
+    "sin_filtros": {},
+    "familiar_economico": {"presupuesto_max": 40000, "asientos": 7},
+    "urbano": {"presupuesto_max": 25000, "asientos": 4, "hp_max": 200},
+    "deportivo": {"presupuesto_min": 100000, "hp_min": 500, "aceleracion_max": 4},
+    "electrico": {"combustible": "electric", "presupuesto_max": 80000},
+    "marca_fiel": {"marca": "toyota", "presupuesto_max": 60000},
+    "diesel_potente": {"combustible": "diesel", "torque_min": 400},
+    "sin_resultados": {"marca": "ferrari", "presupuesto_max": 10000},
+}
+
+ETAPAS = ["preprocesar_datos", "catalogo", "filtrar_posiciones", "calcular_puntuacion",
+          "recomendar_vehiculos", "recomendar_top", "generar_explicaciones", "texto_resultado"]
+
+
+# Catálogo crudo (como lo devuelve read_csv) de "filas" filas: cada una copia
+# una fila real al azar con el precio variado, así que los textos mantienen
+# exactamente los formatos del CSV y las columnas siguen correlacionadas.
+def catalogo_sintetico(filas, semilla=SEMILLA):
+    real = pd.read_csv(motor.RUTA_DATASET, encoding="latin1")
+    azar = np.random.default_rng(semilla)
+    origen = azar.integers(len(real), size=filas)
+    factor = azar.integers(len(FACTORES_PRECIO), size=filas)
+
+    # Cada texto de precio distinto (fila real x factor) se formatea una vez
+    precios = pd.to_numeric(real["Cars Prices"].astype(str).str.replace("[$,]", "", regex=True),
+                            errors="coerce").to_numpy()
+    variados = np.round(precios[:, None] * FACTORES_PRECIO[None, :], -2).ravel()
+    textos = np.array([f"${v:,.0f}" if np.isfinite(v) else "" for v in variados], dtype=object)
+
+    crudo = pd.DataFrame({columna: real[columna].to_numpy(dtype=object)[origen] for columna in real.columns})
+    crudo["Cars Prices"] = textos[origen * len(FACTORES_PRECIO) + factor]
+    return crudo
+
+
+# Huella de los k primeros vehículos de un perfil
+def huella(resultados):
+    if resultados.empty:
+        return "vacio"
+    columnas = resultados[["Company Names", "Cars Names", "Cars Prices", "puntuacion_total"]]
+    texto = columnas.astype(str).to_csv(index=False)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()[:16]
+
+
+# Ejecuta las etapas sobre un catálogo crudo y devuelve (segundos por etapa,
+# huellas por perfil, perfiles en los que recomendar_top no coincide con
+# recomendar_vehiculos). "medir" envuelve cada etapa (cronómetro o tracemalloc).
+def ejecutar_etapas(crudo, medir):
+    medidas, huellas = {}, {}
+
+    df = medir(medidas, "preprocesar_datos", lambda: motor.preprocesar_datos(crudo.copy()))
+    catalogo = medir(medidas, "catalogo", lambda: motor.Catalogo(df))
+
+    filtrados = medir(medidas, "filtrar_posiciones", lambda: {
+        nombre: catalogo.df.iloc[motor.filtrar_posiciones(motor.canonizar_respuestas(perfil), catalogo)]
+        for nombre, perfil in PERFILES.items()
+    })
+    medir(medidas, "calcular_puntuacion", lambda: [
+        motor.calcular_puntuacion(filtrados[nombre], PERFILES[nombre])
+        for nombre in PERFILES if not filtrados[nombre].empty
+    ])
+    completos = medir(medidas, "recomendar_vehiculos", lambda: {
+        nombre: motor.recomendar_vehiculos(perfil, catalogo)
+        for nombre, perfil in PERFILES.items()
+    })
+    top = medir(medidas, "recomendar_top", lambda: {
+        nombre: motor.recomendar_top(perfil, catalogo, usar_cache=False)[0]
+        for nombre, perfil in PERFILES.items()
+    })
+    explicaciones = medir(medidas, "generar_explicaciones", lambda: {
+        nombre: motor.generar_explicaciones(resultados, PERFILES[nombre])
+        for nombre, resultados in top.items()
+    })
+    medir(medidas, "texto_resultado", lambda: [
+        motor.texto_resultado(fila, explicacion)
+        for nombre, resultados in top.items()
+        for (_, fila), explicacion in zip(resultados.iterrows(), explicaciones[nombre])
+    ])
+
+    distintos = []
+    for nombre, resultados in top.items():
+        huellas[nombre] = huella(resultados)
+        if huella(completos[nombre].head(motor.TOP_K)) != huellas[nombre]:
+            distintos.append(nombre)
+    return medidas, huellas, distintos
+
+
+def cronometrar(medidas, etapa, funcion):
+    comienzo = time.perf_counter()
+    resultado = funcion()
+    medidas[etapa] = time.perf_counter() - comienzo
+    return resultado
+
+
+def medir_memoria(medidas, etapa, funcion):
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    resultado = funcion()
+    medidas[etapa] = tracemalloc.get_traced_memory()[1] - base
+    return resultado
+
+
+def medir_tamano(filas, repeticiones, con_memoria):
+    crudo = catalogo_sintetico(filas)
+    tiempos, huellas, distintos = None, None, []
+    for _ in range(repeticiones):
+        medidas, huellas, distintos = ejecutar_etapas(crudo, cronometrar)
+        tiempos = medidas if tiempos is None else {e: min(tiempos[e], medidas[e]) for e in medidas}
+
+    memoria = {}
+    if con_memoria:
+        tracemalloc.start()
+        try:
+            memoria, _, _ = ejecutar_etapas(crudo, medir_memoria)
+        finally:
+            tracemalloc.stop()
+    return {"segundos": tiempos, "bytes_pico": memoria, "huellas": huellas, "distintos": distintos}
+
+
+def mostrar(filas, medida, base=None):
+    print(f"\n{filas:,} filas, {len(PERFILES)} perfiles")
+    print(f"  {'etapa':<22} {'tiempo':>12} {'pico memoria':>14}")
+    for etapa in ETAPAS:
+        tiempo = f"{medida['segundos'][etapa] * 1000:10.1f} ms"
+        pico = medida["bytes_pico"].get(etapa)
+        memoria = f"{pico / 2**20:10.1f} MiB" if pico is not None else ""
+        linea = f"  {etapa:<22} {tiempo:>12} {memoria:>14}"
+        if base is not None and base["segundos"].get(etapa):
+            linea += f"   ({medida['segundos'][etapa] / base['segundos'][etapa] - 1:+.0%} tiempo"
+            if pico is not None and base["bytes_pico"].get(etapa):
+                linea += f", {pico / base['bytes_pico'][etapa] - 1:+.0%} memoria"
+            linea += ")"
+        print(linea)
+
+
+# Regresiones de una medida frente a la línea base, como textos
+def regresiones(filas, medida, base, tolerancia):
+    encontradas = []
+    for etapa in ETAPAS:
+        segundos, segundos_base = medida["segundos"][etapa], base["segundos"].get(etapa)
+        if segundos_base is None:
+            continue
+        if segundos > segundos_base * (1 + tolerancia) and segundos - segundos_base > MARGEN_SEGUNDOS:
+            encontradas.append(f"{filas:,} filas, {etapa}: tiempo "
+                               f"{segundos_base * 1000:.1f} -> {segundos * 1000:.1f} ms")
+        pico, pico_base = medida["bytes_pico"].get(etapa), base["bytes_pico"].get(etapa)
+        if pico is not None and pico_base and pico > pico_base * (1 + tolerancia):
+            encontradas.append(f"{filas:,} filas, {etapa}: memoria "
+                               f"{pico_base / 2**20:.1f} -> {pico / 2**20:.1f} MiB")
+    for perfil, valor in medida["huellas"].items():
+        if base["huellas"].get(perfil) not in (None, valor):
+            encontradas.append(f"{filas:,} filas, {perfil}: han cambiado los resultados")
+    return encontradas
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Tiempo y memoria por etapa sobre catálogos sintéticos")
+    parser.add_argument("tamanos", type=int, nargs="*", default=TAMANOS, help="Filas de cada catálogo")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Se toma el mejor tiempo")
+    parser.add_argument("--sin-memoria", action="store_true", help="No medir el pico de memoria")
+    parser.add_argument("--guardar", action="store_true", help="Guardar los resultados como línea base")
+    parser.add_argument("--comparar", action="store_true", help="Comparar con la línea base")
+    parser.add_argument("--linea-base", default=RUTA_LINEA_BASE)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help="Empeoramiento admitido antes de marcar una regresión (0.25 = 25%%)")
+    args = parser.parse_args(argumentos)
+
+    linea_base = {}
+    if args.comparar:
+        with open(args.linea_base, encoding="utf-8") as archivo:
+            linea_base = json.load(archivo)["tamanos"]
+
+    medidas, encontradas = {}, []
+    for filas in args.tamanos:
+        medida = medir_tamano(filas, args.repeticiones, not args.sin_memoria)
+        medidas[str(filas)] = medida
+        base = linea_base.get(str(filas))
+        mostrar(filas, medida, base)
+        for perfil in medida["distintos"]:
+            print(f"  ⚠️ {perfil}: recomendar_top no coincide con recomendar_vehiculos")
+            encontradas.append(f"{filas:,} filas, {perfil}: recomendar_top no coincide con recomendar_vehiculos")
+        if base is not None:
+            encontradas += regresiones(filas, medida, base, args.tolerancia)
+
+    if args.guardar:
+        with open(args.linea_base, "w", encoding="utf-8") as archivo:
+            json.dump({"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+                       "maquina": platform.machine(), "nucleos": os.cpu_count(), "tamanos": medidas},
+                      archivo, indent=2)
+        print(f"\n✅ Línea base guardada en {args.linea_base}")
+
+    if args.comparar:
+        if encontradas:
+            print("\n❌ Regresiones respecto a la línea base o entre recomendar_top y recomendar_vehiculos:")
+            for texto in encontradas:
+                print(f"  - {texto}")
+            return 1
+        print("\n✅ Sin regresiones respecto a la línea base")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
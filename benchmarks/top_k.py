@@ -0,0 +1,57 @@
+# Orden completo de los resultados (recomendar_vehiculos + head) frente a la
+# selección parcial de recomendar_top, en consultas amplias.
+#
+#     python benchmarks/top_k.py [copias ...]
+
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import motor  # noqa: E402
+
+CONSULTAS = [
+    {},
+    {"presupuesto_max": 100000},
+    {"asientos": 4},
+]
+
+
+def medir(funcion, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    funcion()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(tiempos), pico
+
+
+def main():
+    tamanos = [int(x) for x in sys.argv[1:]] or [1, 100, 500]
+    base = motor.cargar_catalogo().df
+
+    print(f"{'filas':>10} {'orden completo':>24} {'top-k':>24}")
+    for copias in tamanos:
+        catalogo = motor.Catalogo(pd.concat([base] * copias, ignore_index=True))
+        completo = [medir(lambda: motor.recomendar_vehiculos(c, catalogo).head(motor.TOP_K)) for c in CONSULTAS]
+        top = [medir(lambda: motor.recomendar_top(c, catalogo, usar_cache=False)) for c in CONSULTAS]
+
+        def resumen(medidas):
+            tiempo = sum(m[0] for m in medidas) / len(medidas)
+            pico = max(m[1] for m in medidas)
+            return f"{tiempo * 1000:9.1f} ms {pico / 2**20:8.1f} MiB"
+
+        print(f"{len(catalogo):>10,} {resumen(completo):>24} {resumen(top):>24}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# Caché columnar del catálogo ya preprocesado
+#
+# Cada columna se guarda como un archivo .npy independiente: las numéricas tal
+# cual (se abren con memoria mapeada) y las de texto como códigos enteros más
+# una tabla de valores únicos (las categóricas guardan directamente sus
+# códigos y categorías). El archivo meta.json guarda el tamaño, la fecha
+# de modificación y el SHA-256 del CSV de origen; si el CSV cambia, la caché se
+# reconstruye.
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+VERSION_CACHE = 3
+DIRECTORIO_CACHE = ".cache_catalogo"
+
+
+# Carpeta de caché asociada a un CSV (junto al propio CSV)
+def ruta_cache(ruta_csv):
+    ruta_csv = os.path.abspath(ruta_csv)
+    return os.path.join(os.path.dirname(ruta_csv), DIRECTORIO_CACHE, os.path.basename(ruta_csv))
+
+
+def hash_archivo(ruta, bloque=1 << 20):
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as archivo:
+        for trozo in iter(lambda: archivo.read(bloque), b""):
+            sha.update(trozo)
+    return sha.hexdigest()
+
+
+def _huella(ruta_csv, con_hash=True):
+    info = os.stat(ruta_csv)
+    huella = {"tamano": info.st_size, "mtime_ns": info.st_mtime_ns}
+    if con_hash:
+        huella["sha256"] = hash_archivo(ruta_csv)
+    return huella
+
+
+def _leer_meta(directorio):
+    try:
+        with open(os.path.join(directorio, "meta.json"), encoding="utf-8") as archivo:
+            meta = json.load(archivo)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == VERSION_CACHE else None
+
+
+def _escribir_meta(directorio, meta):
+    temporal = os.path.join(directorio, "meta.json.tmp")
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(meta, archivo, ensure_ascii=False, indent=1)
+    os.replace(temporal, os.path.join(directorio, "meta.json"))
+
+
+# Comprueba si la caché corresponde al CSV actual. Si solo cambió la fecha de
+# modificación pero el contenido es el mismo, se actualiza la huella guardada.
+def cache_vigente(ruta_csv):
+    directorio = ruta_cache(ruta_csv)
+    meta = _leer_meta(directorio)
+    if meta is None:
+        return False
+
+    actual = _huella(ruta_csv, con_hash=False)
+    guardada = meta["origen"]
+    if actual["tamano"] != guardada["tamano"]:
+        return False
+    if actual["mtime_ns"] == guardada["mtime_ns"]:
+        return True
+
+    # Mismo tamaño con otra fecha: decide el contenido
+    if hash_archivo(ruta_csv) != guardada["sha256"]:
+        return False
+    meta["origen"]["mtime_ns"] = actual["mtime_ns"]
+    try:
+        _escribir_meta(directorio, meta)
+    except OSError:
+        pass
+    return True
+
+
+# Escribe cada columna de df (y su índice) como archivos .npy en "directorio".
+# Devuelve la descripción de las columnas que luego usa leer_columna.
+def escribir_columnas(df, directorio):
+    columnas = []
+    for i, nombre in enumerate(df.columns):
+        serie = df[nombre]
+        archivo = f"col_{i}.npy"
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(directorio, archivo), serie.cat.codes.to_numpy())
+            columnas.append({
+                "nombre": nombre,
+                "tipo": "categoria",
+                "archivo": archivo,
+                "valores": [str(v) for v in serie.cat.categories],
+            })
+        elif pd.api.types.is_numeric_dtype(serie.dtype):
+            np.save(os.path.join(directorio, archivo), serie.to_numpy())
+            columnas.append({"nombre": nombre, "tipo": "numerica", "archivo": archivo})
+        else:
+            codigos, valores = pd.factorize(serie, use_na_sentinel=True)
+            np.save(os.path.join(directorio, archivo), codigos.astype(np.int32))
+            columnas.append({
+                "nombre": nombre,
+                "tipo": "texto",
+                "dtype": str(serie.dtype),
+                "archivo": archivo,
+                "valores": [str(v) for v in valores],
+            })
+    np.save(os.path.join(directorio, "indice.npy"), df.index.to_numpy(dtype=np.int64))
+    return columnas
+
+
+# Lee una columna escrita por escribir_columnas, completa o solo las filas
+# indicadas. Las numéricas completas quedan mapeadas en memoria (solo lectura).
+def leer_columna(directorio, columna, filas=None):
+    datos = np.load(os.path.join(directorio, columna["archivo"]), mmap_mode="r")
+    if filas is not None:
+        datos = datos[filas]
+    if columna["tipo"] == "numerica":
+        return datos
+    if columna["tipo"] == "categoria":
+        return pd.Categorical.from_codes(np.asarray(datos), categories=columna["valores"])
+    # El código -1 (valor nulo) cae en el último elemento
+    valores = np.array(columna["valores"] + [np.nan], dtype=object)
+    return pd.Series(valores[datos], copy=False).astype(columna["dtype"]).array
+
+
+def leer_indice(directorio, filas=None):
+    indice = np.load(os.path.join(directorio, "indice.npy"), mmap_mode="r")
+    return pd.Index(np.asarray(indice if filas is None else indice[filas]))
+
+
+# Escribe el DataFrame preprocesado en la caché (de forma atómica)
+def guardar_cache(df, ruta_csv):
+    destino = ruta_cache(ruta_csv)
+    padre = os.path.dirname(destino)
+    os.makedirs(padre, exist_ok=True)
+    temporal = tempfile.mkdtemp(prefix=".tmp_", dir=padre)
+
+    try:
+        columnas = escribir_columnas(df, temporal)
+
+        _escribir_meta(temporal, {
+            "version": VERSION_CACHE,
+            "origen": _huella(ruta_csv),
+            "filas": len(df),
+            "columnas": columnas,
+        })
+
+        # Sustituir la caché anterior sin dejarla a medio escribir
+        if os.path.isdir(destino):
+            anterior = destino + ".old"
+            shutil.rmtree(anterior, ignore_errors=True)
+            os.replace(destino, anterior)
+            os.replace(temporal, destino)
+            shutil.rmtree(anterior, ignore_errors=True)
+        else:
+            os.replace(temporal, destino)
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+
+
+# Carga la caché; las columnas numéricas quedan mapeadas en memoria (solo lectura)
+def cargar_cache(ruta_csv):
+    directorio = ruta_cache(ruta_csv)
+    meta = _leer_meta(directorio)
+    if meta is None:
+        return None
+
+    datos = {columna["nombre"]: leer_columna(directorio, columna) for columna in meta["columnas"]}
+    return pd.DataFrame(datos, index=leer_indice(directorio), copy=False)
@@ -0,0 +1,71 @@
+# Caché LRU de recomendaciones
+#
+# Guarda los resultados de recomendar_top por clave canónica de respuestas
+# (ver motor.clave_respuestas). Tiene tamaño acotado, expulsa la entrada usada
+# hace más tiempo y cuenta aciertos, fallos y expulsiones. Cada Catalogo tiene
+# la suya, así que al recargar el catálogo se empieza con una caché vacía.
+
+import threading
+from collections import OrderedDict
+
+CAPACIDAD_POR_DEFECTO = 256
+
+
+class CacheLRU:
+    def __init__(self, capacidad=CAPACIDAD_POR_DEFECTO):
+        self.capacidad = capacidad
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, clave):
+        return clave in self._entradas
+
+    # Devuelve el valor guardado (y lo marca como el más reciente) o None
+    def obtener(self, clave):
+        with self._candado:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self._entradas[clave]
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave, valor):
+        if self.capacidad <= 0:
+            return
+        with self._candado:
+            self._entradas[clave] = valor
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+                self.expulsiones += 1
+
+    # Expulsión explícita de una clave; devuelve True si existía
+    def expulsar(self, clave):
+        with self._candado:
+            if self._entradas.pop(clave, None) is None:
+                return False
+            self.expulsiones += 1
+            return True
+
+    # Vacía la caché (por ejemplo, cuando cambian los datos del catálogo)
+    def invalidar(self):
+        with self._candado:
+            self._entradas.clear()
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._entradas),
+            "capacidad": self.capacidad,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "expulsiones": self.expulsiones,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+        }
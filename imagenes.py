@@ -0,0 +1,102 @@
+# Caché de imágenes del asistente
+#
+# Las imágenes se leen directamente de assets.zip (o, si no está dentro, de la
+# carpeta assets/ desempaquetada). Cada una se decodifica y se redimensiona una
+# sola vez por proceso al tamaño exacto en que se muestra; precargar() hace ese
+# trabajo en un hilo aparte durante el arranque. Las pantallas reutilizan el
+# mismo CTkImage en cada visita. Las rutas que no se pudieron abrir también se
+# recuerdan (como None) para no volver a intentarlo en cada navegación.
+
+import io
+import os
+import threading
+import zipfile
+
+import customtkinter
+from PIL import Image
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+RUTA_ASSETS = os.path.join(RAIZ, "assets.zip")
+
+_decodificadas = {}
+_imagenes = {}
+_candados = {}
+_candado = threading.Lock()
+_zip = None
+
+
+def _abrir_zip():
+    global _zip
+    if _zip is None and os.path.exists(RUTA_ASSETS):
+        _zip = zipfile.ZipFile(RUTA_ASSETS)
+    return _zip
+
+
+# Bytes de "ruta" (p. ej. "assets/logo.png"): del zip si está, si no del disco
+def leer_asset(ruta):
+    nombre = ruta.replace(os.sep, "/")
+    with _candado:
+        paquete = _abrir_zip()
+        if paquete is not None and nombre in paquete.NameToInfo:
+            return paquete.read(nombre)
+    with open(os.path.join(RAIZ, ruta), "rb") as archivo:
+        return archivo.read()
+
+
+def _decodificar(ruta, tamano):
+    try:
+        with Image.open(io.BytesIO(leer_asset(ruta))) as original:
+            return original.convert("RGBA").resize(tamano, Image.LANCZOS)
+    except Exception as e:
+        print(f"No se pudo cargar la imagen {ruta}: {e}")
+        return None
+
+
+# Imagen PIL ya decodificada y redimensionada (None si no se pudo abrir). Si otro
+# hilo la está decodificando, espera a que termine en vez de repetir el trabajo.
+def imagen_decodificada(ruta, tamano):
+    clave = (ruta, tuple(tamano))
+    with _candado:
+        candado = _candados.setdefault(clave, threading.Lock())
+    with candado:
+        if clave not in _decodificadas:
+            _decodificadas[clave] = _decodificar(ruta, clave[1])
+        return _decodificadas[clave]
+
+
+# True si la imagen ya está decodificada (obtener_imagen no bloqueará)
+def lista(ruta, tamano):
+    return (ruta, tuple(tamano)) in _decodificadas
+
+
+# Decodifica en segundo plano las imágenes indicadas como [(ruta, tamano), ...]
+def precargar(pedidos):
+    def trabajar():
+        for ruta, tamano in pedidos:
+            imagen_decodificada(ruta, tamano)
+
+    hilo = threading.Thread(target=trabajar, name="precarga-imagenes", daemon=True)
+    hilo.start()
+    return hilo
+
+
+# CTkImage de "ruta" a tamaño "tamano" (ancho, alto), o None si no se pudo abrir.
+# Debe llamarse desde el hilo de la interfaz.
+def obtener_imagen(ruta, tamano):
+    clave = (ruta, tuple(tamano))
+    if clave not in _imagenes:
+        imagen = imagen_decodificada(ruta, tamano)
+        _imagenes[clave] = None if imagen is None else customtkinter.CTkImage(light_image=imagen, size=clave[1])
+    return _imagenes[clave]
+
+
+def vaciar():
+    with _candado:
+        _decodificadas.clear()
+        _imagenes.clear()
+        _candados.clear()
+
+
+# Número de imágenes en caché (incluidas las que fallaron)
+def cantidad():
+    return len(_decodificadas)
@@ -0,0 +1,439 @@
+# Índices del catálogo para los filtros del asistente
+#
+# Se construyen una sola vez al cargar el catálogo. Una consulta parte del
+# conjunto de filas candidatas más pequeño (un tramo de un índice de rango o la
+# lista de filas de una categoría) y solo comprueba el resto de filtros sobre
+# esas filas, sin copiar el catálogo completo ni recorrer columnas de texto.
+
+import heapq
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+
+# Índice de rango: valores ordenados junto a la posición de fila de cada uno
+class IndiceRango:
+    def __init__(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        validas = np.flatnonzero(~np.isnan(valores))
+        orden = np.argsort(valores[validas], kind="stable")
+        self.valores = valores
+        self.posiciones = validas[orden]
+        self.ordenados = valores[self.posiciones]
+
+    # Posiciones (sin ordenar) con minimo <= valor <= maximo
+    def buscar(self, minimo=-np.inf, maximo=np.inf):
+        inicio = np.searchsorted(self.ordenados, minimo, side="left")
+        fin = np.searchsorted(self.ordenados, maximo, side="right")
+        return self.posiciones[inicio:fin]
+
+    def contar(self, minimo=-np.inf, maximo=np.inf):
+        inicio = np.searchsorted(self.ordenados, minimo, side="left")
+        fin = np.searchsorted(self.ordenados, maximo, side="right")
+        return max(fin - inicio, 0)
+
+    def comprobar(self, posiciones, minimo=-np.inf, maximo=np.inf):
+        valores = self.valores[posiciones]
+        return (valores >= minimo) & (valores <= maximo)
+
+    # Nuevo índice tras quitar filas (conservar[i] == False) y añadir otras en
+    # las posiciones finales "destino" (al final si no se dan; ver reubicacion).
+    # Mezcla los valores nuevos en el orden existente sin reordenar todo; el
+    # resultado es el mismo que construir el índice desde cero.
+    def combinar(self, conservar, valores_nuevos, destino=None):
+        valores_nuevos = np.asarray(valores_nuevos, dtype=np.float64)
+        reubicar, destino = reubicacion(conservar, len(valores_nuevos), destino)
+        quedan = conservar[self.posiciones]
+        posiciones = reubicar[self.posiciones[quedan]]
+        ordenados = self.ordenados[quedan]
+
+        validas = np.flatnonzero(~np.isnan(valores_nuevos))
+        orden = validas[np.lexsort((destino[validas], valores_nuevos[validas]))]
+        # A igual valor, las filas van por posición final
+        huecos = np.searchsorted(ordenados, valores_nuevos[orden], side="left")
+        fines = np.searchsorted(ordenados, valores_nuevos[orden], side="right")
+        for j in np.flatnonzero(fines > huecos):
+            huecos[j] += np.searchsorted(posiciones[huecos[j]:fines[j]], destino[orden[j]])
+
+        nuevo = IndiceRango.__new__(IndiceRango)
+        nuevo.valores = np.empty(len(destino) + int(conservar.sum()))
+        nuevo.valores[reubicar[conservar]] = self.valores[conservar]
+        nuevo.valores[destino] = valores_nuevos
+        nuevo.posiciones = np.insert(posiciones, huecos, destino[orden])
+        nuevo.ordenados = np.insert(ordenados, huecos, valores_nuevos[orden])
+        return nuevo
+
+
+# Índice categórico: cada fila lleva el código entero de su valor canónico y
+# cada código guarda la lista ordenada de filas que lo contienen (un mapa de
+# bits comprimido como lista de posiciones). "canonica" convierte un texto en
+# su clave; si la columna ya es categórica se reutilizan sus códigos.
+class IndiceCategorico:
+    def __init__(self, serie, canonica=None):
+        self.canonica = canonica or (lambda texto: str(texto).lower().strip())
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos = serie.cat.codes.to_numpy()
+            claves = [self.canonica(c) for c in serie.cat.categories]
+        else:
+            # La clave se calcula una vez por valor distinto, no por fila
+            crudos, valores = pd.factorize(serie.astype(str))
+            traduccion, claves = pd.factorize(np.array([self.canonica(v) for v in valores], dtype=object))
+            codigos = traduccion[crudos]
+            claves = list(claves)
+        self.codigos = codigos.astype(np.int32)
+        self.codigo_de = {clave: i for i, clave in enumerate(claves)}
+
+        orden = np.argsort(self.codigos, kind="stable")
+        limites = np.searchsorted(self.codigos[orden], np.arange(len(claves) + 1))
+        self.filas = [orden[limites[i]:limites[i + 1]] for i in range(len(claves))]
+
+    def codigo(self, texto):
+        return self.codigo_de.get(self.canonica(texto), -1)
+
+    def buscar(self, texto):
+        codigo = self.codigo(texto)
+        if codigo < 0:
+            return np.empty(0, dtype=np.intp)
+        return self.filas[codigo]
+
+    def comprobar(self, posiciones, texto):
+        return self.codigos[posiciones] == self.codigo(texto)
+
+    # Nuevo índice tras quitar filas (conservar[i] == False) y añadir otras en
+    # las posiciones finales "destino" (al final si no se dan). "serie" es la
+    # columna categórica completa ya combinada; las listas de filas existentes
+    # se reubican en vez de recalcularse.
+    def combinar(self, conservar, serie, destino=None):
+        nuevo = IndiceCategorico.__new__(IndiceCategorico)
+        nuevo.canonica = self.canonica
+        nuevo.codigos = serie.cat.codes.to_numpy().astype(np.int32)
+        claves = [self.canonica(c) for c in serie.cat.categories]
+        nuevo.codigo_de = {clave: i for i, clave in enumerate(claves)}
+
+        reubicar, destino = reubicacion(conservar, len(serie) - int(conservar.sum()), destino)
+        anadidos = nuevo.codigos[destino]
+        orden = np.argsort(anadidos, kind="stable")
+        limites = np.searchsorted(anadidos[orden], np.arange(len(claves) + 1))
+
+        nuevo.filas = []
+        for codigo, clave in enumerate(claves):
+            anterior = self.codigo_de.get(clave, -1)
+            viejas = self.filas[anterior] if anterior >= 0 else np.empty(0, dtype=np.intp)
+            viejas = reubicar[viejas[conservar[viejas]]]
+            nuevas = destino[orden[limites[codigo]:limites[codigo + 1]]]
+            nuevo.filas.append(np.sort(np.concatenate([viejas, nuevas])))
+        return nuevo
+
+
+# Posiciones finales al combinar un índice: las filas nuevas van a "destino"
+# (posiciones crecientes en el resultado; por defecto, al final) y las
+# conservadas ocupan los huecos restantes en su orden. Devuelve (reubicar,
+# destino), con reubicar[i] la posición final de la fila conservada i.
+def reubicacion(conservar, nuevas, destino=None):
+    conservadas = int(conservar.sum())
+    destino = np.arange(conservadas, conservadas + nuevas) if destino is None else np.asarray(destino, dtype=np.intp)
+    libres = np.ones(conservadas + nuevas, dtype=bool)
+    libres[destino] = False
+    reubicar = np.full(len(conservar), -1, dtype=np.intp)
+    reubicar[conservar] = np.flatnonzero(libres)
+    return reubicar, destino
+
+
+# Índice de vecinos más cercanos: árbol k-d sobre puntos sin NaN. Cada nodo
+# cubre un tramo de "orden" (los puntos de las hojas quedan contiguos) y guarda
+# su caja (mínimos y máximos por dimensión); se divide por la mediana de la
+# dimensión más extendida. Las búsquedas recorren primero los nodos con la caja
+# más cercana y descartan los que no pueden mejorar los k vecinos ya hallados.
+TAMANO_HOJA = 32
+# Con pocas filas permitidas es más rápido medir la distancia a todas ellas
+MAX_DIRECTO = 2048
+
+
+class IndiceVecinos:
+    def __init__(self, puntos, tamano_hoja=TAMANO_HOJA):
+        puntos = np.asarray(puntos, dtype=np.float64)
+        self.puntos = puntos
+        self.orden = np.arange(len(puntos))
+        inicios, fines, izquierdos, derechos, minimos, maximos = [], [], [], [], [], []
+
+        pendientes = [(0, len(puntos), -1, 0)]  # (inicio, fin, padre, lado)
+        while pendientes:
+            inicio, fin, padre, lado = pendientes.pop()
+            nodo = len(inicios)
+            if padre >= 0:
+                (izquierdos if lado == 0 else derechos)[padre] = nodo
+            tramo = puntos[self.orden[inicio:fin]]
+            inicios.append(inicio)
+            fines.append(fin)
+            izquierdos.append(-1)
+            derechos.append(-1)
+            minimos.append(tramo.min(axis=0) if len(tramo) else np.zeros(puntos.shape[1]))
+            maximos.append(tramo.max(axis=0) if len(tramo) else np.zeros(puntos.shape[1]))
+            if fin - inicio <= tamano_hoja:
+                continue
+
+            dimension = int(np.argmax(maximos[nodo] - minimos[nodo]))
+            medio = (fin - inicio) // 2
+            particion = np.argpartition(tramo[:, dimension], medio)
+            self.orden[inicio:fin] = self.orden[inicio:fin][particion]
+            pendientes.append((inicio + medio, fin, nodo, 1))
+            pendientes.append((inicio, inicio + medio, nodo, 0))
+
+        self._inicios, self._fines = inicios, fines
+        self._izquierdos, self._derechos = izquierdos, derechos
+        self._minimos, self._maximos = np.array(minimos), np.array(maximos)
+        self._ordenados = puntos[self.orden]
+
+    def __len__(self):
+        return len(self.puntos)
+
+    # Posiciones de los k puntos más cercanos a "punto" y sus distancias
+    # euclídeas, de menor a mayor (a igual distancia, menor posición primero).
+    # "permitidas" es una máscara opcional de los puntos que pueden devolverse.
+    def vecinos(self, punto, k, permitidas=None):
+        punto = np.asarray(punto, dtype=np.float64)
+        if permitidas is not None and np.count_nonzero(permitidas) <= MAX_DIRECTO:
+            return self._vecinos_directos(punto, k, np.flatnonzero(permitidas))
+
+        mejores = []  # Montículo de (-distancia², -posición): el peor arriba
+        cola = [(0.0, 0)]
+        while cola:
+            distancia_caja, nodo = heapq.heappop(cola)
+            if len(mejores) == k and distancia_caja > -mejores[0][0]:
+                break
+            izquierdo = self._izquierdos[nodo]
+            if izquierdo < 0:
+                inicio, fin = self._inicios[nodo], self._fines[nodo]
+                posiciones = self.orden[inicio:fin]
+                distancias = ((self._ordenados[inicio:fin] - punto) ** 2).sum(axis=1)
+                validas = distancias <= -mejores[0][0] if len(mejores) == k else None
+                if permitidas is not None:
+                    validas = permitidas[posiciones] if validas is None else validas & permitidas[posiciones]
+                if validas is not None:
+                    posiciones, distancias = posiciones[validas], distancias[validas]
+                for distancia, posicion in zip(distancias.tolist(), posiciones.tolist()):
+                    if len(mejores) < k:
+                        heapq.heappush(mejores, (-distancia, -posicion))
+                    elif (distancia, posicion) < (-mejores[0][0], -mejores[0][1]):
+                        heapq.heapreplace(mejores, (-distancia, -posicion))
+                continue
+
+            hijos = (izquierdo, self._derechos[nodo])
+            fuera = np.maximum(self._minimos[hijos, :] - punto, 0) + np.maximum(punto - self._maximos[hijos, :], 0)
+            for hijo, distancia_hijo in zip(hijos, (fuera * fuera).sum(axis=1).tolist()):
+                if len(mejores) < k or distancia_hijo <= -mejores[0][0]:
+                    heapq.heappush(cola, (distancia_hijo, hijo))
+
+        mejores = sorted((-d, -p) for d, p in mejores)
+        posiciones = np.array([p for _, p in mejores], dtype=np.intp)
+        distancias = np.sqrt(np.array([d for d, _ in mejores], dtype=np.float64))
+        return posiciones, distancias
+
+    def _vecinos_directos(self, punto, k, posiciones):
+        distancias = ((self.puntos[posiciones] - punto) ** 2).sum(axis=1)
+        orden = np.lexsort((posiciones, distancias))[:k]
+        return posiciones[orden], np.sqrt(distancias[orden])
+
+
+# Índice de búsqueda aproximada de textos cortos (marcas y modelos) mientras se
+# escribe. Las entradas son textos ya normalizados con "canonica" (que se
+# aplica a las consultas y debe dejar las palabras separadas por un espacio),
+# cada una con un peso (p. ej. sus filas en el catálogo). Las coincidencias se
+# ordenan por niveles:
+#   3: la entrada empieza por la consulta (búsqueda binaria en los textos
+#      ordenados);
+#   2: cada palabra de la consulta empieza alguna palabra de la entrada (con el
+#      vocabulario ordenado, las entradas de las palabras con un prefijo dado
+#      están contiguas);
+#   c/T: con erratas, la proporción de los T trigramas de la consulta que
+#      contiene la entrada (al menos T - 3 por errata permitida; se cuentan
+#      de una vez sumando las listas de entradas de esos trigramas).
+# En los dos primeros niveles gana el mayor peso, después el texto más corto y
+# después el orden alfabético; en el de trigramas, más trigramas en común y
+# menos trigramas propios.
+LONGITUD_TRIGRAMAS = 64
+ENTRADAS_POR_TANDA = 100_000
+
+
+# (códigos, entradas) de los trigramas distintos de cada texto, rellenado con
+# dos espacios delante y, si "cierre", uno detrás (una consulta a medio
+# escribir no lo lleva). Los códigos son los tres bytes del trigrama.
+def trigramas(textos, cierre=True):
+    rellenos = [("  " + texto + (" " if cierre else "")).encode("ascii", "ignore")[:LONGITUD_TRIGRAMAS]
+                for texto in textos]
+    largo = max((len(relleno) for relleno in rellenos), default=0)
+    if largo < 3:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.intp)
+    letras = np.array(rellenos, dtype=f"S{largo}").view(np.uint8).reshape(len(rellenos), largo).astype(np.int32)
+    codigos = (letras[:, :-2] << 16) | (letras[:, 1:-1] << 8) | letras[:, 2:]
+    codigos = np.where(letras[:, 2:] != 0, codigos, -1)
+    codigos.sort(axis=1)
+    nuevo = codigos >= 0
+    nuevo[:, 1:] &= codigos[:, 1:] != codigos[:, :-1]
+    entradas, _ = np.nonzero(nuevo)
+    return codigos[nuevo], entradas
+
+
+class IndiceTexto:
+    def __init__(self, claves, canonica=None, pesos=None):
+        self.canonica = canonica or (lambda texto: " ".join(str(texto).lower().split()))
+        claves = list(claves)
+        total = len(claves)
+        self.pesos = np.ones(total) if pesos is None else np.asarray(pesos, dtype=float)
+        longitudes = np.fromiter(map(len, claves), dtype=np.int64, count=total)
+
+        # Textos completos en orden alfabético
+        self._orden = np.array(sorted(range(total), key=claves.__getitem__), dtype=np.intp)
+        self._ordenadas = [claves[i] for i in self._orden]
+
+        # Rango de cada entrada para los desempates: peso, longitud y alfabeto
+        alfabetico = np.empty(total, dtype=np.intp)
+        alfabetico[self._orden] = np.arange(total)
+        self.rango = np.empty(total, dtype=np.intp)
+        self.rango[np.lexsort((alfabetico, longitudes, -self.pesos))] = np.arange(total)
+
+        # Vocabulario ordenado y, por palabra, sus entradas (sin repetir)
+        por_entrada = np.fromiter((clave.count(" ") + 1 if clave else 0 for clave in claves),
+                                  dtype=np.intp, count=total)
+        palabras, vocabulario = pd.factorize(np.array(" ".join(claves).split(), dtype=object))
+        orden = sorted(range(len(vocabulario)), key=vocabulario.__getitem__)
+        rangos = np.empty(len(vocabulario), dtype=np.intp)
+        rangos[orden] = np.arange(len(vocabulario))
+        palabras, vocabulario = rangos[palabras], vocabulario[orden]
+        entradas = np.repeat(np.arange(total), por_entrada)
+        orden = np.lexsort((entradas, palabras))
+        palabras, entradas = palabras[orden], entradas[orden]
+        distintas = np.ones(len(palabras), dtype=bool)
+        distintas[1:] = (palabras[1:] != palabras[:-1]) | (entradas[1:] != entradas[:-1])
+        self._palabras = list(vocabulario)
+        self._entradas_palabras = entradas[distintas]
+        self._limites_palabras = np.searchsorted(palabras[distintas], np.arange(len(vocabulario) + 1))
+
+        # Trigramas: código -> entradas (ordenadas), por tandas para acotar la memoria
+        codigos, entradas = [np.empty(0, dtype=np.int32)], [np.empty(0, dtype=np.intp)]
+        for inicio in range(0, total, ENTRADAS_POR_TANDA):
+            codigos_tanda, entradas_tanda = trigramas(claves[inicio:inicio + ENTRADAS_POR_TANDA])
+            codigos.append(codigos_tanda)
+            entradas.append(entradas_tanda + inicio)
+        # Renumerados de forma densa sobre los trigramas que aparecen: con pocos
+        # distintos (lo normal en textos normalizados) caben en 16 bits y la
+        # ordenación estable es por radix. Cada tanda se traduce por separado
+        # con una tabla hash, sin tablas del tamaño de todos los códigos posibles.
+        self._trigramas = np.unique(np.concatenate([pd.unique(tanda) for tanda in codigos]))
+        posiciones = pd.Index(self._trigramas)
+        tipo = np.uint16 if len(self._trigramas) <= 1 << 16 else np.int32
+        codigos = np.concatenate([posiciones.get_indexer(tanda).astype(tipo) for tanda in codigos])
+        entradas = np.concatenate(entradas)
+        self._entradas_trigramas = entradas[np.argsort(codigos, kind="stable")]
+        self._limites_trigramas = np.concatenate(
+            [[0], np.cumsum(np.bincount(codigos, minlength=len(self._trigramas)))])
+        self._trigramas_propios = np.bincount(entradas, minlength=total)
+
+    def __len__(self):
+        return len(self.pesos)
+
+    # (entradas, puntuaciones) de las k mejores coincidencias, de mejor a peor.
+    # Por defecto se permiten 0 erratas hasta 3 letras, 1 hasta 7 y 2 después.
+    def buscar(self, consulta, k=10, erratas=None):
+        consulta = self.canonica(consulta)
+        elegidas, puntuaciones = [], []
+        if not consulta or k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        # Nivel 3: empiezan por la consulta
+        inicio = bisect_left(self._ordenadas, consulta)
+        fin = bisect_left(self._ordenadas, consulta + "\uffff")
+        usadas = np.zeros(len(self), dtype=bool)
+        usadas[self._orden[inicio:fin]] = True
+        nivel = self._orden[inicio:fin]
+        self._elegir(nivel, -self.rango[nivel], k, 3.0, elegidas, puntuaciones)
+
+        # Nivel 2: cada palabra de la consulta empieza alguna palabra
+        if len(nivel) < k:
+            mascara = None
+            for palabra in consulta.split():
+                primera = bisect_left(self._palabras, palabra)
+                ultima = bisect_left(self._palabras, palabra + "\uffff")
+                tiene = np.zeros(len(self), dtype=bool)
+                tiene[self._entradas_palabras[self._limites_palabras[primera]:self._limites_palabras[ultima]]] = True
+                mascara = tiene if mascara is None else mascara & tiene
+            nivel = np.flatnonzero(mascara & ~usadas)
+            usadas[nivel] = True
+            self._elegir(nivel, -self.rango[nivel], k - sum(map(len, elegidas)), 2.0, elegidas, puntuaciones)
+
+        # Trigramas, con erratas
+        faltan = k - sum(map(len, elegidas))
+        if faltan > 0:
+            if erratas is None:
+                erratas = 0 if len(consulta) <= 3 else 1 if len(consulta) <= 7 else 2
+            entradas, comunes, total = self._por_trigramas(consulta, erratas)
+            nuevas = ~usadas[entradas]
+            entradas, comunes = entradas[nuevas], comunes[nuevas]
+            propios = self._trigramas_propios[entradas]
+            # Más trigramas en común y, a igualdad, menos trigramas propios
+            parecido = comunes + comunes / (total + propios - comunes)
+            self._elegir(entradas, parecido, faltan, comunes / total, elegidas, puntuaciones)
+
+        if not elegidas:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        return np.concatenate(elegidas), np.concatenate(puntuaciones)
+
+    # Añade a "elegidas" las k entradas con mayor "clave" (desempate por rango)
+    def _elegir(self, entradas, clave, k, puntuacion, elegidas, puntuaciones):
+        if k <= 0 or not len(entradas):
+            return
+        if len(entradas) > k:
+            umbral = np.partition(clave, len(clave) - k)[len(clave) - k]
+            conservar = clave >= umbral
+            entradas, clave = entradas[conservar], clave[conservar]
+            if not np.isscalar(puntuacion):
+                puntuacion = puntuacion[conservar]
+        orden = np.lexsort((self.rango[entradas], -clave))[:k]
+        elegidas.append(entradas[orden])
+        puntuaciones.append(np.full(len(orden), puntuacion) if np.isscalar(puntuacion) else puntuacion[orden])
+
+    # (entradas, trigramas en común, trigramas de la consulta) de las entradas
+    # con al menos T - 3 * erratas trigramas de la consulta
+    def _por_trigramas(self, consulta, erratas):
+        codigos, _ = trigramas([consulta], cierre=False)
+        total = len(codigos)
+        minimo = max(total - 3 * erratas, 1)
+        posiciones = np.searchsorted(self._trigramas, codigos)
+        listas = []
+        for codigo, posicion in zip(codigos, posiciones):
+            if posicion < len(self._trigramas) and self._trigramas[posicion] == codigo:
+                limites = self._limites_trigramas[posicion:posicion + 2]
+                listas.append(self._entradas_trigramas[limites[0]:limites[1]])
+            else:
+                listas.append(self._entradas_trigramas[:0])
+        if total == 0 or len(listas) - sum(1 for lista in listas if not len(lista)) < minimo:
+            return np.empty(0, dtype=np.intp), np.empty(0), max(total, 1)
+
+        comunes = np.bincount(np.concatenate(listas), minlength=len(self))
+        candidatas = np.flatnonzero(comunes >= minimo)
+        return candidatas, comunes[candidatas].astype(float), total
+
+
+# Filas del catálogo que cumplen todos los filtros activos, en orden original.
+# "filtros" es una lista de (índice, argumentos) para IndiceRango/IndiceCategorico.
+def interseccion(filtros, total_filas):
+    if not filtros:
+        return np.arange(total_filas)
+
+    def tamano(filtro):
+        indice, argumentos = filtro
+        if isinstance(indice, IndiceRango):
+            return indice.contar(*argumentos)
+        return len(indice.buscar(*argumentos))
+
+    # Empezar por el filtro más selectivo y comprobar los demás sobre sus filas
+    filtros = sorted(filtros, key=tamano)
+    indice, argumentos = filtros[0]
+    posiciones = indice.buscar(*argumentos)
+    for indice, argumentos in filtros[1:]:
+        if len(posiciones) == 0:
+            break
+        posiciones = posiciones[indice.comprobar(posiciones, *argumentos)]
+
+    return np.sort(posiciones)
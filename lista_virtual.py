@@ -0,0 +1,99 @@
+# Lista virtual de resultados para el asistente
+#
+# Solo existen las etiquetas de las filas que caben en pantalla. Al desplazarse
+# (barra o rueda del ratón) las mismas etiquetas se rellenan con el texto de
+# las filas que pasan a verse, que se piden a "cargar(inicio, cantidad)" solo
+# cuando hacen falta. Así se pueden recorrer cientos de resultados sin crear un
+# widget por cada uno. Si cargar devuelve None (las filas se están calculando
+# en otro hilo) se muestra un aviso de carga y, cuando lleguen, quien las
+# calcula llama a refrescar() para pintarlas.
+#
+# Con accion=(texto, funcion) cada fila lleva además un botón que llama a
+# funcion(indice) con el índice de la fila que muestra en ese momento.
+
+import customtkinter
+
+FILAS_VISIBLES = 3
+TEXTO_CARGANDO = "⏳ Cargando..."
+
+
+class ListaVirtual(customtkinter.CTkFrame):
+    def __init__(self, master, filas_visibles=FILAS_VISIBLES, accion=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self._barra = customtkinter.CTkScrollbar(self, command=self._desplazar)
+        self._barra.pack(side="right", fill="y")
+        self._contenido = customtkinter.CTkFrame(self, fg_color="transparent")
+        self._contenido.pack(side="left", fill="both", expand=True)
+
+        self._filas = [customtkinter.CTkFrame(self._contenido, fg_color="transparent") for _ in range(filas_visibles)]
+        self._etiquetas = [
+            customtkinter.CTkLabel(fila, text="", anchor="w", justify="left", font=("Arial", 14))
+            for fila in self._filas
+        ]
+        self._botones = []
+        if accion is not None:
+            texto, funcion = accion
+            self._botones = [
+                customtkinter.CTkButton(fila, text=texto, width=140,
+                                        command=lambda i=i: funcion(self._primera + i))
+                for i, fila in enumerate(self._filas)
+            ]
+        for boton in self._botones:
+            boton.pack(side="right", anchor="n", padx=10, pady=10)
+        for etiqueta in self._etiquetas:
+            etiqueta.pack(side="left", pady=10, anchor="w", padx=10, fill="x", expand=True)
+        self._total = 0
+        self._primera = 0
+        self._cargar = None
+
+        for widget in [self._contenido] + self._filas + self._etiquetas:
+            widget.bind("<MouseWheel>", self._rueda)
+            widget.bind("<Button-4>", self._rueda)
+            widget.bind("<Button-5>", self._rueda)
+
+    # Muestra una lista nueva de "total" filas desde el principio
+    def mostrar(self, total, cargar):
+        self._total = total
+        self._cargar = cargar
+        self._primera = 0
+        self._pintar()
+
+    # Vuelve a pintar las filas visibles (por ejemplo, al llegar las que faltaban)
+    def refrescar(self):
+        if self._cargar is not None:
+            self._pintar()
+
+    def ir_a(self, primera):
+        primera = max(0, min(primera, self._total - len(self._etiquetas)))
+        if primera != self._primera:
+            self._primera = primera
+            self._pintar()
+
+    # Órdenes de la barra: ("moveto", fracción) o ("scroll", n, "units"/"pages")
+    def _desplazar(self, accion, valor, unidad="units"):
+        if accion == "moveto":
+            self.ir_a(round(float(valor) * self._total))
+        else:
+            paso = len(self._etiquetas) if unidad == "pages" else 1
+            self.ir_a(self._primera + int(valor) * paso)
+
+    def _rueda(self, evento):
+        arriba = evento.num == 4 or getattr(evento, "delta", 0) > 0
+        self.ir_a(self._primera + (-1 if arriba else 1))
+
+    def _pintar(self):
+        textos = self._cargar(self._primera, len(self._etiquetas)) if self._total else []
+        if textos is None:
+            textos = [TEXTO_CARGANDO] * min(len(self._etiquetas), self._total - self._primera)
+        for i, (fila, etiqueta) in enumerate(zip(self._filas, self._etiquetas)):
+            if i < len(textos):
+                etiqueta.configure(text=textos[i])
+                fila.pack(fill="x")
+            else:
+                fila.pack_forget()
+
+        if self._total:
+            self._barra.set(self._primera / self._total,
+                            min(self._primera + len(self._etiquetas), self._total) / self._total)
+        else:
+            self._barra.set(0, 1)
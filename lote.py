@@ -0,0 +1,251 @@
+# Modo por lotes: recomienda vehículos para un archivo de perfiles de clientes
+#
+# Lee un CSV o JSONL con los mismos campos que las respuestas del asistente
+# (presupuesto_min/max, combustible, asientos, marca, hp_min/max, ...) y escribe
+# los k mejores vehículos de cada cliente con su puntuación y explicación:
+#
+#     python lote.py leads.csv recomendaciones.jsonl -k 5 --procesos 8
+#     python lote.py leads.jsonl recomendaciones.csv
+#
+# Los perfiles se reparten por bloques entre procesos. El catálogo se carga una
+# vez: con "fork" los trabajadores heredan el del proceso principal y, si no,
+# cada uno abre la caché columnar, cuyas columnas numéricas están mapeadas en
+# memoria y el sistema comparte entre procesos. Se lee, se procesa y se escribe
+# por bloques y en orden, con un número acotado de bloques en vuelo, así que la
+# memoria no depende del tamaño del archivo.
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import metricas
+import motor
+
+PERFILES_POR_BLOQUE = 500
+# A partir de este tamaño de catálogo es más rápido usar los índices perfil a
+# perfil (recomendar_top) que la puntuación vectorizada de recomendar_lote
+FILAS_LOTE_VECTORIZADO = 20_000
+
+COLUMNAS_CSV = ["cliente", "posicion", "total", "Company Names", "Cars Names", "Cars Prices",
+                "HorsePower", "Seats", "Fuel Types", "puntuacion_total", "explicacion", "error"]
+
+# Catálogo del proceso trabajador
+_catalogo = None
+
+
+def _iniciar_trabajador(ruta_dataset, ruta_metricas=None, carpeta_perfiles=None):
+    global _catalogo
+    # Cada proceso abre su propio archivo de métricas (en modo añadir)
+    if ruta_metricas or carpeta_perfiles:
+        metricas.instrumentacion.activar(ruta_metricas, carpeta_perfiles)
+    if _catalogo is None:
+        _catalogo = motor.cargar_catalogo(ruta_dataset)
+
+
+# Perfiles del archivo de entrada como (cliente, respuestas), por bloques. El
+# cliente es la columna "cliente" o "id" si existe, y si no el número de línea.
+# Una línea JSONL que no es un objeto JSON válido se entrega con un ValueError
+# en vez de las respuestas, y sale en la salida con su error.
+def leer_perfiles(ruta, tamano_bloque=PERFILES_POR_BLOQUE):
+    campos = set(motor.RESPUESTAS_POR_DEFECTO)
+    if ruta.endswith(".jsonl") or ruta.endswith(".ndjson"):
+        with open(ruta, encoding="utf-8") as archivo:
+            bloque = []
+            for numero, linea in enumerate(archivo, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    datos = json.loads(linea)
+                except ValueError as e:
+                    bloque.append((numero, ValueError(f"JSON no válido en la línea {numero}: {e}")))
+                else:
+                    if isinstance(datos, dict):
+                        cliente = datos.get("cliente", datos.get("id", numero))
+                        bloque.append((cliente, {c: v for c, v in datos.items() if c in campos}))
+                    else:
+                        bloque.append((numero, ValueError("Se esperaba un objeto JSON con las preferencias")))
+                if len(bloque) == tamano_bloque:
+                    yield bloque
+                    bloque = []
+            if bloque:
+                yield bloque
+        return
+
+    numero = 0
+    for trozo in pd.read_csv(ruta, chunksize=tamano_bloque, keep_default_na=False, dtype=str):
+        bloque = []
+        for datos in trozo.to_dict("records"):
+            numero += 1
+            cliente = datos.get("cliente") or datos.get("id") or numero
+            bloque.append((cliente, {c: v for c, v in datos.items() if c in campos}))
+        yield bloque
+
+
+def _numero(valor):
+    return None if pd.isna(valor) else float(valor)
+
+
+# Filas de salida de los vehículos recomendados (por columnas: iterrows es lo
+# más lento del lote)
+def _recomendados(resultados, explicaciones):
+    if resultados.empty:
+        return []
+    columnas = zip(resultados["Company Names"].astype(str), resultados["Cars Names"].astype(str),
+                   resultados["Cars Prices"].tolist(), resultados["HorsePower"].tolist(),
+                   resultados["Seats"].tolist(), resultados["Fuel Types"].astype(str),
+                   resultados["puntuacion_total"].tolist(), explicaciones)
+    return [
+        {"posicion": posicion, "marca": marca, "modelo": modelo, "precio": _numero(precio), "hp": _numero(hp),
+         "asientos": _numero(asientos), "combustible": combustible, "puntuacion_total": float(puntuacion),
+         "explicacion": explicacion}
+        for posicion, (marca, modelo, precio, hp, asientos, combustible, puntuacion, explicacion)
+        in enumerate(columnas, start=1)
+    ]
+
+
+# Recomendaciones de un bloque de perfiles, ya formateadas como texto de
+# salida. Un perfil no válido no detiene el lote: sale con su error.
+def procesar_bloque(bloque, k, formato):
+    medicion = metricas.consulta("lote")
+    with medicion:
+        texto = _procesar_bloque(bloque, k, formato)
+    medicion.terminar()
+    return texto, len(bloque)
+
+
+def _procesar_bloque(bloque, k, formato):
+    catalogo = _catalogo
+    validos, errores = [], {}
+    for i, (_, datos) in enumerate(bloque):
+        if isinstance(datos, ValueError):  # Línea que no se pudo leer
+            errores[i] = str(datos)
+            continue
+        try:
+            validos.append((i, motor.canonizar_respuestas(motor.leer_preferencias(datos)[0])))
+        except ValueError as e:
+            errores[i] = str(e)
+
+    # Si la puntuación vectorizada del bloque falla, se repite perfil a perfil
+    # para que solo salga con error el perfil que lo provoca
+    perfiles = [perfil for _, perfil in validos]
+    recomendaciones = None
+    if len(catalogo) <= FILAS_LOTE_VECTORIZADO:
+        try:
+            recomendaciones = motor.recomendar_lote(perfiles, catalogo, k)
+        except Exception:
+            recomendaciones = None
+    por_perfil = {}
+    for posicion, (i, perfil) in enumerate(validos):
+        if recomendaciones is not None:
+            por_perfil[i] = (perfil, recomendaciones[posicion])
+            continue
+        try:
+            por_perfil[i] = (perfil, motor.recomendar_top(perfil, catalogo, k))
+        except Exception as e:
+            errores[i] = f"Error al recomendar: {e}"
+
+    with metricas.etapa("formatear") as medicion:
+        medicion.filas = len(bloque)
+        return _formatear(bloque, errores, por_perfil, formato)
+
+
+def _formatear(bloque, errores, por_perfil, formato):
+    salida = io.StringIO()
+    escritor = csv.writer(salida, lineterminator="\n")
+    for i, (cliente, _) in enumerate(bloque):
+        if i not in errores:
+            perfil, (resultados, total) = por_perfil[i]
+            try:
+                filas = _recomendados(resultados, motor.generar_explicaciones(resultados, perfil))
+            except Exception as e:
+                errores[i] = f"Error al formatear: {e}"
+        if i in errores:
+            if formato == "jsonl":
+                salida.write(json.dumps({"cliente": cliente, "error": errores[i]}, ensure_ascii=False) + "\n")
+            else:
+                escritor.writerow([cliente] + [""] * (len(COLUMNAS_CSV) - 2) + [errores[i]])
+            continue
+
+        if formato == "jsonl":
+            salida.write(json.dumps({"cliente": cliente, "total": total, "resultados": filas},
+                                    ensure_ascii=False) + "\n")
+        else:
+            for f in filas:
+                escritor.writerow([cliente, f["posicion"], total, f["marca"], f["modelo"], f["precio"],
+                                   f["hp"], f["asientos"], f["combustible"], f["puntuacion_total"],
+                                   f["explicacion"], ""])
+    return salida.getvalue()
+
+
+def procesar_archivo(entrada, salida, k=motor.TOP_K, procesos=None, ruta_dataset=motor.RUTA_DATASET,
+                     tamano_bloque=PERFILES_POR_BLOQUE, ruta_metricas=None, carpeta_perfiles=None):
+    formato = "jsonl" if salida.endswith((".jsonl", ".ndjson")) else "csv"
+    procesos = procesos or os.cpu_count() or 1
+
+    # Con "fork" el catálogo se carga aquí y los trabajadores lo heredan
+    metodos = multiprocessing.get_all_start_methods()
+    contexto = multiprocessing.get_context("fork" if "fork" in metodos else None)
+    if contexto.get_start_method() == "fork":
+        _iniciar_trabajador(ruta_dataset, ruta_metricas, carpeta_perfiles)
+    else:
+        motor.cargar_catalogo(ruta_dataset)  # Deja la caché columnar lista para los trabajadores
+
+    clientes = 0
+    with open(salida, "w", encoding="utf-8", newline="") as archivo, \
+            ProcessPoolExecutor(procesos, mp_context=contexto, initializer=_iniciar_trabajador,
+                                initargs=(ruta_dataset, ruta_metricas, carpeta_perfiles)) as ejecutor:
+        if formato == "csv":
+            csv.writer(archivo, lineterminator="\n").writerow(COLUMNAS_CSV)
+        pendientes = deque()
+        for bloque in leer_perfiles(entrada, tamano_bloque):
+            pendientes.append(ejecutor.submit(procesar_bloque, bloque, k, formato))
+            # Como mucho dos bloques por proceso en vuelo; se escriben en orden
+            while len(pendientes) >= 2 * procesos:
+                texto, n = pendientes.popleft().result()
+                archivo.write(texto)
+                clientes += n
+        while pendientes:
+            texto, n = pendientes.popleft().result()
+            archivo.write(texto)
+            clientes += n
+    return clientes
+
+
+def _entero_positivo(texto):
+    try:
+        valor = int(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"no es un entero: {texto!r}") from None
+    if valor < 1:
+        raise argparse.ArgumentTypeError("debe ser al menos 1")
+    return valor
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Recomendaciones por lotes para un archivo de perfiles")
+    parser.add_argument("entrada", help="CSV o JSONL con las preferencias de cada cliente")
+    parser.add_argument("salida", help="Archivo de salida (.csv o .jsonl)")
+    parser.add_argument("-k", type=_entero_positivo, default=motor.TOP_K)
+    parser.add_argument("--procesos", type=_entero_positivo, default=None, help="Por defecto, uno por núcleo")
+    parser.add_argument("--bloque", type=_entero_positivo, default=PERFILES_POR_BLOQUE, help="Perfiles por bloque")
+    parser.add_argument("--dataset", default=motor.RUTA_DATASET)
+    parser.add_argument("--metricas", metavar="RUTA",
+                        help="Medir las etapas de cada bloque y exportarlas a este archivo JSON lines")
+    parser.add_argument("--perfilar", metavar="CARPETA", help="Guardar un cProfile de cada bloque")
+    args = parser.parse_args(argumentos)
+
+    clientes = procesar_archivo(args.entrada, args.salida, args.k, args.procesos, args.dataset, args.bloque,
+                                args.metricas, args.perfilar)
+    print(f"✅ {clientes:,} clientes procesados -> {args.salida}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
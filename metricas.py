@@ -0,0 +1,281 @@
+# Métricas de latencia
+#
+# VentanaLatencias guarda las últimas mediciones (en segundos) y calcula sus
+# percentiles bajo demanda. Es segura entre hilos, así que varios trabajadores
+# pueden registrar a la vez.
+
+import atexit
+import cProfile
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+TAMANO_VENTANA = 10_000
+PERCENTILES = (50, 95, 99)
+
+
+class VentanaLatencias:
+    def __init__(self, tamano=TAMANO_VENTANA):
+        self._mediciones = deque(maxlen=tamano)
+        self._candado = threading.Lock()
+        self.total = 0
+
+    def registrar(self, segundos):
+        with self._candado:
+            self._mediciones.append(segundos)
+            self.total += 1
+
+    # {"n": mediciones en la ventana, "total": desde el inicio, "p50_ms": ...}
+    def resumen(self, percentiles=PERCENTILES):
+        with self._candado:
+            mediciones = np.array(self._mediciones, dtype=float)
+            total = self.total
+        resumen = {"n": len(mediciones), "total": total}
+        for p in percentiles:
+            resumen[f"p{p}_ms"] = round(float(np.percentile(mediciones, p)) * 1000, 3) if len(mediciones) else None
+        return resumen
+
+
+# Instrumentación por etapas
+#
+# Cada etapa del motor (ingesta del CSV, filtros, puntuación, explicaciones...)
+# se mide con "with etapa(nombre) as medicion" y, si sabe cuántas filas ha
+# procesado, lo anota en medicion.filas. Mientras la instrumentación está
+# apagada etapa() devuelve un objeto vacío compartido, así que el coste es el
+# de una llamada. Encendida guarda por etapa una ventana de latencias (p50, p95,
+# p99) y las filas, y escribe en un archivo JSON lines una línea por consulta
+# con su desglose y, cada RESUMEN_CADA consultas y al salir, el resumen.
+#
+# Una consulta agrupa las etapas que se ejecutan dentro de "with consulta" (en
+# ese hilo); se puede entrar varias veces, también desde hilos distintos uno
+# tras otro, y termina con terminar(). Con una carpeta de perfiles cada
+# consulta guarda además su cProfile en un .prof.
+#
+# Se enciende con las variables de entorno ASESOR_METRICAS (ruta del archivo, o
+# "1" para metricas.jsonl) y ASESOR_PERFILAR (carpeta de los .prof), o con
+# instrumentacion.activar() (opciones --metricas/--perfilar del servicio y del
+# modo por lotes).
+
+ENTORNO_METRICAS = "ASESOR_METRICAS"
+ENTORNO_PERFILAR = "ASESOR_PERFILAR"
+RUTA_METRICAS = "metricas.jsonl"
+RESUMEN_CADA = 100
+
+
+# Sustituto de mediciones y consultas con la instrumentación apagada
+class _Apagada:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+    def __setattr__(self, nombre, valor):
+        pass
+
+    def etapa(self, nombre):
+        return self
+
+    def terminar(self):
+        return None
+
+
+_APAGADA = _Apagada()
+
+
+class _Medicion:
+    __slots__ = ("_instrumentacion", "_nombre", "_consulta", "_comienzo", "filas")
+
+    def __init__(self, instrumentacion, nombre, consulta=None):
+        self._instrumentacion = instrumentacion
+        self._nombre = nombre
+        self._consulta = consulta
+        self.filas = None
+
+    def __enter__(self):
+        self._comienzo = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        segundos = time.perf_counter() - self._comienzo
+        self._instrumentacion._registrar(self._nombre, segundos, self.filas, self._consulta)
+        return False
+
+
+# Etapas de una consulta: {etapa: {"ms", "veces" y, si se conocen, "filas"}},
+# sumando las que se repiten (p. ej. las explicaciones de cada perfil de un lote)
+class Consulta:
+    def __init__(self, instrumentacion, nombre):
+        self.nombre = nombre
+        self.etapas = {}
+        self._instrumentacion = instrumentacion
+        self._anteriores = []
+        self._comienzo = time.perf_counter()
+        self._perfil = cProfile.Profile() if instrumentacion.carpeta_perfiles else None
+
+    def __enter__(self):
+        local = self._instrumentacion._local
+        self._anteriores.append(getattr(local, "consulta", None))
+        local.consulta = self
+        if self._perfil is not None:
+            try:
+                self._perfil.enable()
+            except ValueError:  # Ya hay otro perfilador activo en este hilo
+                pass
+        return self
+
+    def __exit__(self, *excepcion):
+        if self._perfil is not None:
+            self._perfil.disable()
+        self._instrumentacion._local.consulta = self._anteriores.pop()
+        return False
+
+    # Etapa de esta consulta aunque se ejecute fuera de "with consulta"
+    def etapa(self, nombre):
+        return _Medicion(self._instrumentacion, nombre, self)
+
+    # Cierra la consulta, la exporta y devuelve su registro
+    def terminar(self):
+        return self._instrumentacion._terminar(self, time.perf_counter() - self._comienzo)
+
+
+class Instrumentacion:
+    def __init__(self):
+        self.activa = False
+        self.ruta = None
+        self.carpeta_perfiles = None
+        self.ultima = None
+        self._local = threading.local()
+        self._candado = threading.Lock()
+        self._archivo = None
+        self._pid = None
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self.consultas = VentanaLatencias()
+        self._ventanas = {}
+        self._filas = {}
+        self._numero = 0
+
+    # Enciende la instrumentación. Sin ruta solo se guardan las estadísticas en
+    # memoria (resumen() y la última consulta).
+    def activar(self, ruta=None, carpeta_perfiles=None):
+        self.desactivar()
+        with self._candado:
+            self._reiniciar()
+            self.ruta = ruta
+            self.carpeta_perfiles = carpeta_perfiles
+            if carpeta_perfiles:
+                os.makedirs(carpeta_perfiles, exist_ok=True)
+            if ruta:
+                self._archivo = open(ruta, "a", encoding="utf-8", buffering=1)
+            self._pid = os.getpid()
+            self.activa = True
+
+    # Apaga la instrumentación y escribe el resumen final (salvo en un proceso
+    # hijo creado con fork, que no debe repetir el resumen del padre)
+    def desactivar(self):
+        if not self.activa:
+            return
+        resumen = self.resumen()
+        with self._candado:
+            self.activa = False
+            if self._archivo is not None:
+                if self._pid == os.getpid() and (resumen["consultas"]["total"] or resumen["etapas"]):
+                    self._escribir({"tipo": "resumen", **resumen})
+                self._archivo.close()
+                self._archivo = None
+
+    def etapa(self, nombre):
+        if not self.activa:
+            return _APAGADA
+        return _Medicion(self, nombre)
+
+    def consulta(self, nombre):
+        if not self.activa:
+            return _APAGADA
+        return Consulta(self, nombre)
+
+    # {"consultas": percentiles de las consultas completas, "etapas": {etapa:
+    # percentiles, "filas" (total) y "filas_ultima"}}
+    def resumen(self):
+        with self._candado:
+            ventanas = dict(self._ventanas)
+            filas = {nombre: list(valores) for nombre, valores in self._filas.items()}
+        etapas = {}
+        for nombre, ventana in ventanas.items():
+            etapas[nombre] = ventana.resumen()
+            if nombre in filas:
+                etapas[nombre]["filas"], etapas[nombre]["filas_ultima"] = filas[nombre]
+        return {"consultas": self.consultas.resumen(), "etapas": etapas}
+
+    def _registrar(self, nombre, segundos, filas, consulta):
+        if not self.activa:
+            return
+        with self._candado:
+            ventana = self._ventanas.get(nombre)
+            if ventana is None:
+                ventana = self._ventanas[nombre] = VentanaLatencias()
+            if filas is not None:
+                acumuladas = self._filas.setdefault(nombre, [0, 0])
+                acumuladas[0] += int(filas)
+                acumuladas[1] = int(filas)
+        ventana.registrar(segundos)
+
+        consulta = consulta or getattr(self._local, "consulta", None)
+        if consulta is not None:
+            acumulada = consulta.etapas.setdefault(nombre, {"ms": 0.0, "veces": 0})
+            acumulada["ms"] = round(acumulada["ms"] + segundos * 1000, 3)
+            acumulada["veces"] += 1
+            if filas is not None:
+                acumulada["filas"] = acumulada.get("filas", 0) + int(filas)
+        elif self._archivo is not None:
+            registro = {"tipo": "etapa", "momento": round(time.time(), 3), "etapa": nombre,
+                        "ms": round(segundos * 1000, 3)}
+            if filas is not None:
+                registro["filas"] = int(filas)
+            with self._candado:
+                self._escribir(registro)
+
+    def _terminar(self, consulta, segundos):
+        if not self.activa:
+            return None
+        self.consultas.registrar(segundos)
+        registro = {"tipo": "consulta", "nombre": consulta.nombre, "momento": round(time.time(), 3),
+                    "total_ms": round(segundos * 1000, 3), "etapas": consulta.etapas}
+        with self._candado:
+            self._numero += 1
+            numero = self._numero
+        if consulta._perfil is not None:
+            ruta = os.path.join(self.carpeta_perfiles, f"{consulta.nombre}-{os.getpid()}-{numero:06d}.prof")
+            consulta._perfil.dump_stats(ruta)
+            registro["perfil"] = ruta
+        self.ultima = registro
+
+        if self._archivo is not None:
+            resumen = self.resumen() if numero % RESUMEN_CADA == 0 else None
+            with self._candado:
+                self._escribir(registro)
+                if resumen is not None:
+                    self._escribir({"tipo": "resumen", **resumen})
+        return registro
+
+    def _escribir(self, registro):
+        if self._archivo is not None:
+            self._archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+instrumentacion = Instrumentacion()
+etapa = instrumentacion.etapa
+consulta = instrumentacion.consulta
+
+if os.environ.get(ENTORNO_METRICAS) or os.environ.get(ENTORNO_PERFILAR):
+    _ruta = os.environ.get(ENTORNO_METRICAS) or None
+    instrumentacion.activar(RUTA_METRICAS if _ruta == "1" else _ruta, os.environ.get(ENTORNO_PERFILAR) or None)
+atexit.register(instrumentacion.desactivar)
@@ -0,0 +1,1776 @@
+# Motor de recomendación del Asesor Inteligente (sin interfaz gráfica)
+#
+# Este módulo no importa customtkinter ni PIL: se puede usar desde la ventana
+# Tk, desde trabajos por lotes o desde un servicio sin necesidad de pantalla.
+#
+#     import motor
+#     catalogo = motor.cargar_catalogo()
+#     resultados = motor.recomendar_vehiculos({"presupuesto_max": 50000, "marca": "kia"}, catalogo)
+
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+import cache_catalogo
+from cache_recomendaciones import CacheLRU
+from indices import IndiceCategorico, IndiceRango, IndiceTexto, IndiceVecinos, interseccion, reubicacion
+from metricas import etapa
+
+RUTA_DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DATASET.csv")
+
+# Sistema de ponderación
+PESOS = {
+    'precio': 0.35,
+    'caballos_fuerza': 0.25,
+    'asientos': 0.15,
+    'combustible': 0.15,
+    'marca': 0.10
+}
+
+# Columna de componente de puntuación de cada criterio de PESOS
+COMPONENTES_PESOS = {
+    'precio': 'score_precio',
+    'caballos_fuerza': 'score_hp',
+    'asientos': 'score_asientos',
+    'combustible': 'score_combustible',
+    'marca': 'score_marca'
+}
+
+# Número de sugerencias que se muestran por defecto
+TOP_K = 10
+
+# Filas por página al recorrer todos los resultados (recomendar_pagina) y
+# clasificaciones completas que se conservan por catálogo
+TAMANO_PAGINA = 20
+CLASIFICACIONES_EN_CACHE = 8
+
+# Preferencias por defecto (sin filtros)
+RESPUESTAS_POR_DEFECTO = {
+    "presupuesto_min": 0,
+    "presupuesto_max": float('inf'),
+    "combustible": "",
+    "asientos": 0,
+    "marca": "",
+    "modelo": "",
+    "hp_min": 0,
+    "hp_max": float('inf'),
+    "velocidad_min": 0,
+    "aceleracion_max": float('inf'),
+    "torque_min": 0,
+    "cilindrada_max": float('inf')
+}
+
+# Columnas de especificaciones que se convierten en rangos numéricos al cargar:
+# prefijo de las columnas "<prefijo>_min"/"<prefijo>_max" -> (columna, unidad)
+ESPECIFICACIONES = {
+    "HorsePower": ("HorsePower", r"hp"),
+    "Torque": ("Torque", r"nm"),
+    "Total Speed": ("Total Speed", r"km/h"),
+    "Performance": ("Performance(0 - 100 )KM/H", r"(?:sec|s)?"),
+    "CC": ("CC/Battery Capacity", r"cc"),
+    "Battery kWh": ("CC/Battery Capacity", r"kwh"),
+}
+
+# Filtros opcionales sobre esas columnas: respuesta -> (columna, tipo). Con
+# "min" la columna debe ser >= la respuesta y con "max", <= la respuesta.
+FILTROS_ESPECIFICACIONES = {
+    "velocidad_min": ("Total Speed_max", "min"),
+    "aceleracion_max": ("Performance_min", "max"),
+    "torque_min": ("Torque_max", "min"),
+    "cilindrada_max": ("CC_min", "max"),
+}
+
+# Banco de explicaciones ampliado y variado
+BANCO_EXPLICACIONES = {
+    'precio': [
+        ("Excelente relación precio-calidad", 0.8),
+        ("Oferta destacada en su rango de precios", 0.75),
+        ("Buena opción económica", 0.6),
+        ("Precio competitivo para sus características", 0.55),
+        ("Precio algo elevado pero justificado", 0.4),
+        ("Precio superior al promedio del mercado", 0.3)
+    ],
+    'caballos_fuerza': [
+        ("Potencia excepcional para su categoría", 0.85),
+        ("Alto rendimiento motor", 0.8),
+        ("Potencia más que suficiente", 0.7),
+        ("Balance ideal entre potencia y eficiencia", 0.6),
+        ("Potencia adecuada para uso cotidiano", 0.5),
+        ("Potencia modesta pero eficiente", 0.4)
+    ],
+    'asientos': [
+        ("Amplio espacio para familias numerosas", 7),
+        ("Ideal para familias grandes", 6),
+        ("Buen espacio para familia", 5),
+        ("Cómodo para pequeños grupos", 4),
+        ("Configuración práctica", 3),
+        ("Compacto pero funcional", 2)
+    ],
+    'combustible': [
+        ("Combustible preferido ({}) - Eficiente", 1),
+        ("Tecnología {} avanzada", 1),
+        ("Sistema {} de última generación", 1),
+        ("Motorización {} optimizada", 1),
+        ("Eficiencia en consumo de {}", 1)
+    ],
+    'marca': [
+        ("Marca preferida ({}) - Alta confiabilidad", 1),
+        ("{} reconocida por su calidad", 1),
+        ("Excelente reputación de {}", 1),
+        ("Tecnología {} de vanguardia", 1),
+        ("Servicio postventa {} destacado", 1)
+    ],
+    'general': [
+        "Elección muy bien valorada por expertos",
+        "Opción destacada en pruebas de manejo",
+        "Incluye tecnología de última generación",
+        "Sistema de seguridad muy completo",
+        "Diseño ergonómico y funcional",
+        "Bajo costo de mantenimiento",
+        "Alto valor de reventa",
+        "Paquete de conectividad avanzado",
+        "Sistema de infoentretenimiento premium",
+        "Asistencia a la conducción inteligente",
+        "Materiales de alta calidad en interior",
+        "Garantía extendida incluida",
+        "Bajas emisiones contaminantes",
+        "Suspensión optimizada para confort",
+        "Sistema de frenado de alto desempeño"
+    ]
+}
+
+
+# Normalizador mejorado
+def normalizar(texto):
+    if not isinstance(texto, str):
+        return ""
+    texto = texto.lower().strip()
+    texto = unicodedata.normalize('NFD', texto).encode('ascii', 'ignore').decode('utf-8')
+    return texto
+
+
+# Correcciones de escritura conocidas en los tipos de combustible
+CORRECCIONES_COMBUSTIBLE = {
+    "hyrbrid": "hybrid",
+    "plug in": "plug-in",
+}
+
+
+# Clave canónica de una marca o de un modelo: "KIA  ", "Kia" y "kia" son la misma
+def clave_marca(texto):
+    return re.sub(r"\s+", " ", normalizar(texto))
+
+
+# Texto de búsqueda de marcas y modelos: solo letras, cifras y "+", con las
+# palabras separadas por un espacio ("Mercedes-Benz" -> "mercedes benz")
+def clave_busqueda(texto):
+    return " ".join(re.sub(r"[^a-z0-9+]+", " ", normalizar(texto)).split())
+
+
+# clave_busqueda de muchas claves de marca o modelo (ya normalizadas) a la vez:
+# las sustituciones se hacen una sola vez sobre el texto unido
+def claves_busqueda(claves):
+    if not claves:
+        return []
+    unido = re.sub(r"[^a-z0-9+\n]+", " ", "\n".join(claves))
+    return re.sub(r" *\n *", "\n", unido).strip(" ").split("\n")
+
+
+# Clave canónica de un combustible: corrige erratas y ordena las combinaciones,
+# así "Petrol/Diesel", "Diesel/Petrol" y "Petrol, Diesel" son la misma
+def clave_combustible(texto):
+    clave = re.sub(r"\s+", " ", normalizar(texto))
+    for error, correccion in CORRECCIONES_COMBUSTIBLE.items():
+        clave = clave.replace(error, correccion)
+    partes = [parte for parte in re.split(r"\s*[/,]\s*", clave) if parte]
+    return "/".join(sorted(partes))
+
+
+# Convierte una columna de texto en categórica con una categoría por clave
+# canónica (mostrada en formato título). La clave se calcula una sola vez por
+# valor distinto, no por fila.
+def categorizar(serie, canonica):
+    codigos, valores = pd.factorize(serie)
+    claves = [canonica(valor) for valor in valores]
+    categorias = sorted({clave for clave in claves if clave})
+    codigo_de = {clave: i for i, clave in enumerate(categorias)}
+    # El código -1 (valor nulo) cae en el último elemento
+    traduccion = np.array([codigo_de.get(clave, -1) for clave in claves] + [-1], dtype=np.int32)
+    return pd.Categorical.from_codes(traduccion[codigos], categories=[c.title() for c in categorias])
+
+
+# Completa unas preferencias parciales con los valores por defecto
+def normalizar_respuestas(respuestas=None):
+    completas = dict(RESPUESTAS_POR_DEFECTO)
+    if respuestas:
+        completas.update({k: v for k, v in respuestas.items() if v is not None})
+    return completas
+
+
+# Valor numérico de una respuesta. Lanza ValueError si no es un número, si es
+# NaN o, con finito=True, si es infinito.
+def _numero_respuesta(respuestas, campo, finito=False):
+    valor = respuestas[campo]
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"Valor no numérico para {campo}: {valor!r}") from None
+    if np.isnan(numero) or (finito and np.isinf(numero)):
+        raise ValueError(f"Valor no válido para {campo}: {valor!r}")
+    return numero
+
+
+# Forma canónica de unas respuestas: rangos con mínimo <= máximo y sin valores
+# negativos, y textos normalizados (minúsculas, sin espacios ni acentos).
+# Respuestas equivalentes dan siempre la misma forma canónica. Lanza ValueError
+# si un campo numérico no es un número (o los asientos no son finitos).
+def canonizar_respuestas(respuestas=None):
+    canonicas = normalizar_respuestas(respuestas)
+    for minimo, maximo in (("presupuesto_min", "presupuesto_max"), ("hp_min", "hp_max")):
+        valor_min, valor_max = _numero_respuesta(canonicas, minimo), _numero_respuesta(canonicas, maximo)
+        if valor_min > valor_max:
+            valor_min, valor_max = valor_max, valor_min
+        canonicas[minimo] = max(valor_min, 0.0)
+        canonicas[maximo] = valor_max
+    canonicas["asientos"] = max(int(_numero_respuesta(canonicas, "asientos", finito=True)), 0)
+    for campo in FILTROS_ESPECIFICACIONES:
+        canonicas[campo] = max(_numero_respuesta(canonicas, campo), 0.0)
+    canonicas["combustible"] = clave_combustible(canonicas["combustible"])
+    canonicas["marca"] = clave_marca(canonicas["marca"])
+    canonicas["modelo"] = clave_marca(canonicas["modelo"])
+    return canonicas
+
+
+# Campos de las respuestas que son texto; los demás son numéricos
+CAMPOS_TEXTO = ("combustible", "marca", "modelo")
+
+
+# Entero recibido de un cliente (JSON o parámetro de URL): acepta 5, 5.0 y "5"
+# pero no 2.9, true ni infinito. Lanza ValueError con el nombre del campo.
+def leer_entero(valor, nombre):
+    if not isinstance(valor, bool):
+        try:
+            numero = float(valor)
+        except (TypeError, ValueError):
+            numero = np.nan
+        if np.isfinite(numero) and numero.is_integer():
+            return int(numero)
+    raise ValueError(f"{nombre} debe ser un entero: {valor!r}")
+
+
+# Preferencias recibidas de fuera (servicio HTTP, archivos del lote), validadas:
+# devuelve (respuestas, k, inicio). Lanza ValueError con un mensaje para el
+# cliente si hay campos desconocidos, números no finitos o booleanos, o k e
+# inicio no enteros o fuera de rango (k entre 1 y k_maximo, inicio >= 0).
+def leer_preferencias(datos, k_maximo=None):
+    if not isinstance(datos, dict):
+        raise ValueError("Se esperaba un objeto JSON con las preferencias")
+    datos = dict(datos)
+    k = leer_entero(datos.pop("k", TOP_K), "k")
+    inicio = leer_entero(datos.pop("inicio", 0), "inicio")
+    if k < 1 or (k_maximo is not None and k > k_maximo):
+        raise ValueError(f"k debe estar entre 1 y {k_maximo}" if k_maximo is not None
+                         else "k debe ser al menos 1")
+    if inicio < 0:
+        raise ValueError("inicio no puede ser negativo")
+
+    desconocidos = sorted(set(datos) - set(RESPUESTAS_POR_DEFECTO))
+    if desconocidos:
+        raise ValueError(f"Campos desconocidos: {', '.join(desconocidos)}")
+
+    respuestas = {}
+    for campo, valor in datos.items():
+        if valor is None or valor == "":
+            continue
+        if campo in CAMPOS_TEXTO:
+            respuestas[campo] = str(valor)
+            continue
+        if isinstance(valor, bool):
+            raise ValueError(f"Valor no numérico para {campo}: {valor!r}")
+        respuestas[campo] = _numero_respuesta(datos, campo, finito=True)
+    return respuestas, k, inicio
+
+
+# Clave hashable para la caché de recomendaciones
+def clave_respuestas(respuestas):
+    return _clave_canonica(canonizar_respuestas(respuestas))
+
+
+# La misma clave para respuestas ya canonizadas, sin volver a canonizarlas
+def _clave_canonica(canonicas):
+    return tuple(canonicas[campo] for campo in RESPUESTAS_POR_DEFECTO)
+
+
+# Mínimo y máximo de los valores con la unidad dada en un texto de
+# especificación: "70-85 hp" -> (70, 85), "1,200 cc" -> (1200, 1200),
+# "3990 cc (V8)" -> (3990, 3990). Sin valores devuelve (nan, nan).
+def rango_numerico(texto, unidad):
+    if not isinstance(texto, str):
+        return np.nan, np.nan
+    texto = re.sub(r"\([^)]*\)", " ", texto.lower())        # Quitar anotaciones "(V8)"
+    texto = re.sub(r"(?<=\d),(?=\d{3})", "", texto)          # Separador de miles
+    texto = re.sub(r"(?<=\d)\. (?=\d)", ".", texto)          # "2. 5 sec"
+    numero = r"(\d+(?:\.\d+)?)"
+    patron = numero + r"(?:\s*[-–]\s*" + numero + r")?\+?\s*(?:" + unidad + r")(?![a-z])"
+    valores = [float(v) for par in re.findall(patron, texto) for v in par if v]
+    if not valores:
+        return np.nan, np.nan
+    return min(valores), max(valores)
+
+
+# Añade las columnas "<prefijo>_min"/"<prefijo>_max" de ESPECIFICACIONES. Cada
+# texto distinto se analiza una sola vez y el resultado se reparte por códigos.
+def extraer_especificaciones(df):
+    nuevas = {}
+    for prefijo, (columna, unidad) in ESPECIFICACIONES.items():
+        if columna not in df.columns:
+            continue
+        codigos, valores = pd.factorize(df[columna])
+        rangos = np.array([rango_numerico(v, unidad) for v in valores] + [(np.nan, np.nan)], dtype=float)
+        nuevas[f"{prefijo}_min"] = rangos[codigos, 0]
+        nuevas[f"{prefijo}_max"] = rangos[codigos, 1]
+    return df.assign(**nuevas)
+
+
+# Preprocesamiento mejorado
+def preprocesar_datos(df):
+    # Rangos numéricos de las especificaciones (antes de limpiar HorsePower)
+    df = extraer_especificaciones(df)
+
+    # Limpieza de precios
+    df["Cars Prices"] = df["Cars Prices"].astype(str).str.replace("[$,]", "", regex=True)
+    df["Cars Prices"] = pd.to_numeric(df["Cars Prices"].replace('', '0'), errors='coerce')
+
+    # Limpieza de caballos de fuerza
+    df["HorsePower"] = df["HorsePower"].astype(str).str.extract(r'(\d+)')
+    df["HorsePower"] = pd.to_numeric(df["HorsePower"], errors='coerce')
+
+    # Limpieza de asientos
+    df["Seats"] = df["Seats"].astype(str).str.extract(r'(\d+)')
+    df["Seats"] = pd.to_numeric(df["Seats"], errors='coerce')
+
+    # Limpieza de torque
+    if 'Torque' in df.columns:
+        df["Torque"] = df["Torque"].fillna('N/A')
+
+    # Limpieza de performance
+    if 'Performance(0 - 100 )KM/H' in df.columns:
+        df['Performance(0 - 100 )KM/H'] = df['Performance(0 - 100 )KM/H'].fillna('N/A')
+
+    # Limpieza de marcas
+    df["Company Names"] = df["Company Names"].str.strip().fillna('Desconocido')
+
+    df = df.dropna(subset=["Company Names", "Cars Prices"])
+
+    # Marcas y combustibles como categorías canónicas (códigos enteros)
+    return df.assign(**{
+        "Company Names": categorizar(df["Company Names"], clave_marca),
+        "Fuel Types": categorizar(df["Fuel Types"], clave_combustible),
+    })
+
+
+# Mínimo y máximo (enteros) que muestra el asistente para una columna sin
+# ningún valor: catálogo vacío o columna entera sin datos
+EXTREMOS_POR_DEFECTO = (0, 0)
+
+
+def extremos_enteros(minimo, maximo):
+    if not (np.isfinite(minimo) and np.isfinite(maximo)):
+        return EXTREMOS_POR_DEFECTO
+    return int(minimo), int(maximo)
+
+
+# Catálogo preprocesado junto con las opciones y rangos que muestra el asistente
+class Catalogo:
+    def __init__(self, df, indices=None):
+        # Asegurar marcas y combustibles categóricos (p. ej. si df no viene de preprocesar_datos)
+        if not isinstance(df["Company Names"].dtype, pd.CategoricalDtype):
+            df = df.assign(**{"Company Names": categorizar(df["Company Names"], clave_marca)})
+        if not isinstance(df["Fuel Types"].dtype, pd.CategoricalDtype):
+            df = df.assign(**{"Fuel Types": categorizar(df["Fuel Types"], clave_combustible)})
+        self.df = df
+
+        # Índices para los filtros (se construyen una sola vez, salvo que
+        # vengan ya combinados desde con_cambios)
+        if indices is None:
+            indices = {
+                "precio": IndiceRango(df["Cars Prices"].to_numpy(dtype=float)),
+                "hp": IndiceRango(df["HorsePower"].to_numpy(dtype=float)),
+                "asientos": IndiceRango(df["Seats"].to_numpy(dtype=float)),
+                "combustible": IndiceCategorico(df["Fuel Types"], clave_combustible),
+                "marca": IndiceCategorico(df["Company Names"], clave_marca),
+                "especificaciones": {
+                    columna: IndiceRango(df[columna].to_numpy(dtype=float) if columna in df.columns
+                                         else np.full(len(df), np.nan))
+                    for columna, _ in FILTROS_ESPECIFICACIONES.values()
+                },
+            }
+        self.indice_precio = indices["precio"]
+        self.indice_hp = indices["hp"]
+        self.indice_asientos = indices["asientos"]
+        self.indice_combustible = indices["combustible"]
+        self.indice_marca = indices["marca"]
+        self.indices_especificaciones = indices["especificaciones"]
+
+        # Obtener opciones disponibles para filtros (una por marca/combustible canónico)
+        self.combustibles_disponibles = list(df["Fuel Types"].cat.remove_unused_categories().cat.categories)
+        self.marcas_disponibles = list(df["Company Names"].cat.remove_unused_categories().cat.categories)
+
+        # Valores mínimos y máximos (extremos de los índices ordenados)
+        self.min_precio, self.max_precio = self._extremos(self.indice_precio)
+        self.min_asientos, self.max_asientos = self._extremos(self.indice_asientos)
+        self.min_hp, self.max_hp = self._extremos(self.indice_hp)
+
+        # Caché de recomendaciones propia de estos datos, y otra pequeña para
+        # las clasificaciones completas que se recorren por páginas
+        self.cache = CacheLRU()
+        self.cache_clasificaciones = CacheLRU(capacidad=CLASIFICACIONES_EN_CACHE)
+
+        # Índice de vehículos similares: se construye una vez, en el primer uso
+        self._similitud = None
+        self._candado_similitud = threading.Lock()
+
+        # Índice de modelos y buscador de marcas y modelos: también en el
+        # primer uso (la interfaz los prepara en segundo plano al cargar)
+        self._modelo = None
+        self._buscador = None
+        self._candado_busqueda = threading.RLock()
+
+    @property
+    def indice_similitud(self):
+        with self._candado_similitud:
+            if self._similitud is None:
+                with etapa("indice_similitud") as medicion:
+                    medicion.filas = len(self.df)
+                    self._similitud = IndiceSimilitud(self.df)
+        return self._similitud
+
+    @property
+    def indice_modelo(self):
+        with self._candado_busqueda:
+            if self._modelo is None:
+                with etapa("indice_modelo") as medicion:
+                    medicion.filas = len(self.df)
+                    self._modelo = IndiceCategorico(self.df["Cars Names"], clave_marca)
+        return self._modelo
+
+    @property
+    def buscador_modelos(self):
+        with self._candado_busqueda:
+            if self._buscador is None:
+                indice_modelo = self.indice_modelo
+                with etapa("buscador_modelos") as medicion:
+                    self._buscador = BuscadorModelos(self, indice_modelo)
+                    medicion.filas = len(self._buscador.indice)
+        return self._buscador
+
+    @staticmethod
+    def _extremos(indice):
+        if not len(indice.ordenados):
+            return EXTREMOS_POR_DEFECTO
+        return extremos_enteros(indice.ordenados[0], indice.ordenados[-1])
+
+    def __len__(self):
+        return len(self.df)
+
+    # Nuevo catálogo con filas quitadas (eliminar: máscara o posiciones) y filas
+    # nuevas ya preprocesadas añadidas al final o, con "destino", en esas
+    # posiciones del resultado (crecientes; las conservadas ocupan el resto en
+    # su orden). No vuelve a preprocesar el catálogo existente: los índices se
+    # combinan y este objeto no cambia, así que quien lo esté consultando sigue
+    # viendo datos coherentes.
+    def con_cambios(self, nuevas, eliminar=None, destino=None):
+        conservar = np.ones(len(self.df), dtype=bool)
+        if eliminar is not None:
+            conservar[eliminar] = False
+
+        # Unir las categorías (ordenadas por clave canónica, como en categorizar)
+        nuevas = nuevas.reindex(columns=self.df.columns)
+        existentes = self.df.iloc[np.flatnonzero(conservar)]
+        for columna, canonica in (("Company Names", clave_marca), ("Fuel Types", clave_combustible)):
+            if not isinstance(nuevas[columna].dtype, pd.CategoricalDtype):
+                nuevas[columna] = categorizar(nuevas[columna], canonica)
+            union = {canonica(c): c for c in nuevas[columna].cat.remove_unused_categories().cat.categories}
+            union.update({canonica(c): c for c in existentes[columna].cat.remove_unused_categories().cat.categories})
+            categorias = [union[clave] for clave in sorted(union)]
+            existentes = existentes.assign(**{columna: existentes[columna].cat.set_categories(categorias)})
+            nuevas = nuevas.assign(**{columna: nuevas[columna].cat.set_categories(categorias)})
+        df = pd.concat([existentes, nuevas])
+        if destino is not None:
+            reubicar, destino = reubicacion(conservar, len(nuevas), destino)
+            orden = np.empty(len(df), dtype=np.intp)
+            orden[reubicar[conservar]] = np.arange(len(existentes))
+            orden[destino] = len(existentes) + np.arange(len(nuevas))
+            df = df.iloc[orden]
+
+        def combinar_rango(indice, columna):
+            valores = nuevas[columna].to_numpy(dtype=float) if columna in nuevas.columns else np.full(len(nuevas), np.nan)
+            return indice.combinar(conservar, valores, destino)
+
+        indices = {
+            "precio": combinar_rango(self.indice_precio, "Cars Prices"),
+            "hp": combinar_rango(self.indice_hp, "HorsePower"),
+            "asientos": combinar_rango(self.indice_asientos, "Seats"),
+            "combustible": self.indice_combustible.combinar(conservar, df["Fuel Types"], destino),
+            "marca": self.indice_marca.combinar(conservar, df["Company Names"], destino),
+            "especificaciones": {
+                columna: combinar_rango(indice, columna)
+                for columna, indice in self.indices_especificaciones.items()
+            },
+        }
+        return Catalogo(df, indices)
+
+
+# Lee y preprocesa el dataset (lanza FileNotFoundError si no existe).
+# Con usar_cache=True se reutiliza la caché columnar mientras el CSV no cambie.
+def cargar_catalogo(ruta=RUTA_DATASET, usar_cache=True):
+    if usar_cache and cache_catalogo.cache_vigente(ruta):
+        with etapa("cache_catalogo") as medicion:
+            df = cache_catalogo.cargar_cache(ruta)
+            medicion.filas = None if df is None else len(df)
+        if df is not None:
+            with etapa("indices"):
+                return Catalogo(df)
+
+    with etapa("ingesta_csv") as medicion:
+        df = preprocesar_datos(pd.read_csv(ruta, encoding='latin1'))
+        medicion.filas = len(df)
+    if usar_cache:
+        try:
+            cache_catalogo.guardar_cache(df, ruta)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar la caché del catálogo: {e}")
+    with etapa("indices"):
+        return Catalogo(df)
+
+
+# Catálogo compartido por defecto, cargado en el primer uso
+_catalogo_por_defecto = None
+
+
+def obtener_catalogo():
+    global _catalogo_por_defecto
+    if _catalogo_por_defecto is None:
+        _catalogo_por_defecto = cargar_catalogo()
+    return _catalogo_por_defecto
+
+
+# Semilla base de las frases elegidas "al azar": la misma fila con las mismas
+# respuestas produce siempre el mismo texto
+SEMILLA_EXPLICACIONES = 0
+
+
+# Mezcla de enteros de 64 bits (splitmix64), aplicada elemento a elemento
+def _mezclar(x):
+    with np.errstate(over="ignore"):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+# Mensaje del primer umbral (de mayor a menor) que alcanza cada valor, o None.
+# Los umbrales se recorren ordenados con una sola búsqueda binaria por fila.
+def _mensajes_por_umbral(valores, banco):
+    mensajes = np.array([None] + [msg for msg, _ in banco][::-1], dtype=object)
+    umbrales = np.array([umbral for _, umbral in banco][::-1], dtype=float)
+    valores = np.asarray(valores, dtype=float)
+    nivel = np.searchsorted(umbrales, valores, side="right")
+    nivel[np.isnan(valores)] = 0
+    return mensajes[nivel]
+
+
+# Hash de 64 bits de un texto, estable entre ejecuciones (a diferencia de hash())
+def _hash64(texto):
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# Parte de la semilla que depende de las respuestas, guardada por respuestas
+# tal como llegan: cada combinación se canoniza una sola vez
+_SEMILLAS_RESPUESTAS = CacheLRU()
+
+
+def _semilla_respuestas(respuestas, semilla):
+    clave = (semilla, tuple(sorted((respuestas or {}).items())))
+    valor = _SEMILLAS_RESPUESTAS.obtener(clave)
+    if valor is None:
+        valor = np.uint64(_hash64(repr((semilla, clave_respuestas(respuestas)))))
+        _SEMILLAS_RESPUESTAS.guardar(clave, valor)
+    return valor
+
+
+# Semilla por fila a partir del vehículo (marca y modelo) y de las respuestas
+def _semillas(marcas, modelos, respuestas, semilla):
+    por_vehiculo = np.fromiter((_hash64(f"{marca}\x00{modelo}") for marca, modelo in zip(marcas, modelos)),
+                               dtype=np.uint64, count=len(marcas))
+    return _mezclar(por_vehiculo ^ _semilla_respuestas(respuestas, semilla))
+
+
+# Explicaciones de todas las filas de un resultado (misma longitud y orden).
+# Los niveles de precio, potencia y asientos se resuelven para todas las filas
+# a la vez; las frases de combustible, marca y generales se eligen con una
+# semilla por (vehículo, respuestas), así que el texto es reproducible y se
+# puede guardar en caché.
+def generar_explicaciones(resultados, respuestas=None, semilla=SEMILLA_EXPLICACIONES):
+    n = len(resultados)
+    if n == 0:
+        return []
+    with etapa("explicaciones") as medicion:
+        medicion.filas = n
+        columnas = lambda nombre: resultados[nombre].to_numpy() if nombre in resultados.columns else None
+        return _generar_explicaciones(columnas, n, respuestas, semilla)
+
+
+# "columnas" devuelve los valores de una columna para las n filas, o None si
+# el resultado no la tiene
+def _generar_explicaciones(columnas, n, respuestas, semilla):
+    def columna(nombre, defecto):
+        valores = columnas(nombre)
+        return np.full(n, defecto) if valores is None else valores
+
+    partes = []
+    for nombre, banco in (('score_precio', 'precio'), ('score_hp', 'caballos_fuerza'), ('Seats', 'asientos')):
+        valores = columnas(nombre)
+        if valores is not None:
+            partes.append(_mensajes_por_umbral(valores, BANCO_EXPLICACIONES[banco]))
+
+    azar = _semillas(columna('Company Names', np.nan), columna('Cars Names', np.nan), respuestas, semilla)
+    for campo, banco, valor in (('score_combustible', 'combustible', 'Fuel Types'),
+                                ('score_marca', 'marca', 'Company Names')):
+        coincide = columna(campo, 0) == 1
+        plantillas = [msg for msg, _ in BANCO_EXPLICACIONES[banco]]
+        azar = _mezclar(azar)
+        eleccion = (azar % np.uint64(len(plantillas))).astype(np.intp)
+        valores = columna(valor, '')
+        partes.append(np.array([plantillas[e].format(v) if c else None
+                                for e, v, c in zip(eleccion, valores, coincide)], dtype=object))
+
+    # 2 o 3 frases generales distintas: las primeras de una permutación por fila
+    generales = np.array(BANCO_EXPLICACIONES['general'], dtype=object)
+    azar = _mezclar(azar)
+    cuantas = 2 + (azar % np.uint64(2)).astype(np.intp)
+    claves = _mezclar(azar[:, None] ^ np.arange(1, len(generales) + 1, dtype=np.uint64))
+    permutacion = np.argsort(claves, axis=1)[:, :3]
+
+    puntuacion = columna('puntuacion_total', 0).astype(float)
+    emojis = np.select([puntuacion >= 80, puntuacion >= 50],
+                       ["🏆 RECOMENDACIÓN TOP", "👍 BUENA OPCIÓN"], "⚠️ CONSIDERA OTRAS OPCIONES")
+
+    explicaciones = []
+    for i in range(n):
+        frases = [parte[i] for parte in partes if parte[i] is not None]
+        frases.extend(generales[permutacion[i, :cuantas[i]]])
+        explicaciones.append(f"{emojis[i]}\n💡 " + " | ".join(frases))
+    return explicaciones
+
+
+# Explicación de una sola fila (ver generar_explicaciones). Lee los valores
+# directamente de la fila, sin construir un DataFrame de una fila.
+def generar_explicacion(fila, respuestas=None, semilla=SEMILLA_EXPLICACIONES):
+    columnas = lambda nombre: np.array([fila[nombre]], dtype=object) if nombre in fila.index else None
+    return _generar_explicaciones(columnas, 1, respuestas, semilla)[0]
+
+
+# Texto de la tarjeta de un vehículo recomendado
+def texto_resultado(fila, explicacion):
+    # Obtener todos los campos con manejo seguro de valores faltantes
+    company = fila.get('Company Names', 'N/A')
+    car_name = fila.get('Cars Names', 'N/A')
+    engine = fila.get('Engines', 'N/A')
+    cc_battery = fila.get('CC/Battery Capacity', 'N/A')
+    horsepower = fila.get('HorsePower', 'N/A')
+    total_speed = fila.get('Total Speed', 'N/A')
+    performance = fila.get('Performance(0 - 100 )KM/H', 'N/A')
+    price = fila.get('Cars Prices', 'N/A')
+    fuel = fila.get('Fuel Types', 'N/A')
+    seats = fila.get('Seats', 'N/A')
+    torque = fila.get('Torque', 'N/A')
+    
+    # Formatear valores numéricos
+    try:
+        price_str = f"${float(price):,.0f}" if str(price).replace('.','').isdigit() else str(price)
+        horsepower_str = f"{int(horsepower)} hp" if str(horsepower).isdigit() else str(horsepower)
+        seats_str = str(int(seats)) if str(seats).replace('.','').isdigit() else str(seats)
+    except:
+        price_str = str(price)
+        horsepower_str = str(horsepower)
+        seats_str = str(seats)
+    
+    auto_info = (
+        f"🔹 {company} {car_name}\n"
+        f"⭐ Puntuación total: {fila.get('puntuacion_total', 'N/A')}%\n"
+        f"{explicacion}\n\n"
+        f"📌 ESPECIFICACIONES TÉCNICAS:\n"
+        f"⚙️ Motor: {engine}\n"
+        f"🔋 CC/Capacidad Batería: {cc_battery}\n"
+        f"🏇 Caballos de fuerza: {horsepower_str}\n"
+        f"🚀 Velocidad máxima: {total_speed}\n"
+        f"⏱️ Aceleración (0-100 km/h): {performance}\n"
+        f"🔧 Torque: {torque}\n\n"
+        f"💵 INFORMACIÓN GENERAL:\n"
+        f"💲 Precio: {price_str}\n"
+        f"⛽ Combustible: {fuel}\n"
+        f"🪑 Asientos: {seats_str}\n"
+        + "─" * 100
+    )
+    return auto_info
+
+
+# Filas de una columna de texto/categórica cuya clave canónica coincide con "texto"
+def _coincide(serie, canonica, texto):
+    objetivo = canonica(texto)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        claves = np.array([canonica(c) for c in serie.cat.categories] + [""], dtype=object)
+        return pd.Series(claves[serie.cat.codes.to_numpy()] == objetivo, index=serie.index)
+    return serie.astype(str).map(canonica) == objetivo
+
+
+# Función para calcular puntuación mejorada
+def calcular_puntuacion(df_resultados, respuestas):
+    respuestas = normalizar_respuestas(respuestas)
+    df = df_resultados.copy()
+
+    # Puntuación por precio (menor precio = mayor puntuación)
+    if respuestas["presupuesto_max"] < float('inf'):
+        precio_max = respuestas["presupuesto_max"]
+    else:
+        precio_max = df["Cars Prices"].max() * 1.1
+
+    df['score_precio'] = 1 - (df["Cars Prices"] / precio_max)
+
+    # Puntuación por caballos de fuerza
+    if respuestas["hp_max"] < float('inf'):
+        hp_max = respuestas["hp_max"]
+    else:
+        hp_max = df["HorsePower"].max()
+
+    df['score_hp'] = df["HorsePower"] / hp_max if hp_max > 0 else 0
+
+    # Puntuación por asientos
+    if respuestas["asientos"] > 0:
+        asientos_min = respuestas["asientos"]
+    else:
+        asientos_min = df["Seats"].min()
+
+    asientos_max = df["Seats"].max()
+    df['score_asientos'] = (df["Seats"] - asientos_min) / (asientos_max - asientos_min) if (asientos_max - asientos_min) > 0 else 0
+
+    # Puntuación por combustible y marca (con normalización)
+    df['score_combustible'] = _coincide(df["Fuel Types"], clave_combustible, respuestas["combustible"]).astype(int)
+    df['score_marca'] = _coincide(df["Company Names"], clave_marca, respuestas["marca"]).astype(int)
+
+    # Puntuación total ponderada
+    df['puntuacion_total'] = (
+        df['score_precio'] * PESOS['precio'] +
+        df['score_hp'] * PESOS['caballos_fuerza'] +
+        df['score_asientos'] * PESOS['asientos'] +
+        df['score_combustible'] * PESOS['combustible'] +
+        df['score_marca'] * PESOS['marca']
+    ) * 100
+
+    return df.round({'puntuacion_total': 2})
+
+
+# Posiciones de las filas del catálogo que cumplen los filtros de las respuestas
+def filtrar_posiciones(respuestas, catalogo):
+    with etapa("filtrar") as medicion:
+        posiciones = interseccion(filtros_activos(respuestas, catalogo), len(catalogo.df))
+        medicion.filas = len(posiciones)
+    return posiciones
+
+
+# Filtros que aplican las respuestas, como (índice, argumentos) para interseccion
+def filtros_activos(respuestas, catalogo):
+    filtros = []
+
+    # Aplicar filtros con manejo de mayúsculas/minúsculas
+    if respuestas["presupuesto_min"] > 0 or respuestas["presupuesto_max"] < float('inf'):
+        filtros.append((catalogo.indice_precio, (respuestas["presupuesto_min"], respuestas["presupuesto_max"])))
+
+    if respuestas["hp_min"] > 0 or respuestas["hp_max"] < float('inf'):
+        filtros.append((catalogo.indice_hp, (respuestas["hp_min"], respuestas["hp_max"])))
+
+    if respuestas["combustible"] != "":
+        filtros.append((catalogo.indice_combustible, (respuestas["combustible"],)))
+
+    if respuestas["asientos"] > 0:
+        filtros.append((catalogo.indice_asientos, (respuestas["asientos"],)))
+
+    if respuestas["marca"] != "":
+        filtros.append((catalogo.indice_marca, (respuestas["marca"],)))
+
+    if respuestas["modelo"] != "":
+        filtros.append((catalogo.indice_modelo, (respuestas["modelo"],)))
+
+    # Filtros opcionales sobre especificaciones numéricas
+    for campo, (columna, tipo) in FILTROS_ESPECIFICACIONES.items():
+        indice = catalogo.indices_especificaciones[columna]
+        if tipo == "min" and respuestas[campo] > 0:
+            filtros.append((indice, (respuestas[campo], np.inf)))
+        elif tipo == "max" and respuestas[campo] < float('inf'):
+            filtros.append((indice, (-np.inf, respuestas[campo])))
+
+    return filtros
+
+
+# Campos de respuestas que fija cada pregunta del asistente, en el orden en que
+# se hacen
+CAMPOS_PREGUNTA = {
+    "presupuesto": ("presupuesto_min", "presupuesto_max"),
+    "combustible": ("combustible",),
+    "asientos": ("asientos",),
+    "marca": ("marca", "modelo"),
+    "hp": ("hp_min", "hp_max"),
+}
+
+
+# Recuento en vivo de coincidencias para una pregunta. Al crearla se filtran una
+# sola vez las candidatas que dejan las demás respuestas (los pasos anteriores)
+# y se prepara la columna de la pregunta: valores ordenados para rangos o un
+# recuento por código para categorías. Cada llamada a contar() es entonces una
+# búsqueda binaria o una consulta a una tabla, sin recorrer las candidatas
+# (salvo con un modelo, que se cruza con los filtros anteriores).
+class VistaPrevia:
+    def __init__(self, pregunta, respuestas, catalogo):
+        self.pregunta = pregunta
+        anteriores = dict(canonizar_respuestas(respuestas))
+        for campo in CAMPOS_PREGUNTA[pregunta]:
+            anteriores[campo] = RESPUESTAS_POR_DEFECTO[campo]
+        filtros = filtros_activos(anteriores, catalogo)
+        candidatas = interseccion(filtros, len(catalogo.df)) if filtros else None
+        self.total = len(catalogo.df) if candidatas is None else len(candidatas)
+
+        if pregunta in ("combustible", "marca"):
+            indice = catalogo.indice_combustible if pregunta == "combustible" else catalogo.indice_marca
+            codigos = indice.codigos if candidatas is None else indice.codigos[candidatas]
+            self._catalogo, self._filtros = catalogo, filtros
+            self._indice = indice
+            self._por_codigo = np.bincount(codigos[codigos >= 0], minlength=len(indice.codigo_de))
+        else:
+            indice = {"presupuesto": catalogo.indice_precio, "asientos": catalogo.indice_asientos,
+                      "hp": catalogo.indice_hp}[pregunta]
+            if candidatas is None:
+                # Sin pasos anteriores: el propio índice ya está ordenado
+                self._ordenados = indice.ordenados
+            else:
+                valores = indice.valores[candidatas]
+                self._ordenados = np.sort(valores[~np.isnan(valores)])
+
+    # Coincidencias con el valor de la pregunta: (mínimo, máximo) para presupuesto
+    # y hp, el mínimo de asientos, o el texto de combustible/marca ("" = todas;
+    # la marca puede ir seguida de un modelo)
+    def contar(self, *valor):
+        if self.pregunta in ("combustible", "marca"):
+            texto = valor[0]
+            if len(valor) > 1 and valor[1]:
+                filtros = self._filtros + [(self._indice, (texto,)), (self._catalogo.indice_modelo, (valor[1],))]
+                return len(interseccion(filtros, len(self._catalogo.df)))
+            if texto == "":
+                return self.total
+            codigo = self._indice.codigo(texto)
+            return int(self._por_codigo[codigo]) if codigo >= 0 else 0
+
+        minimo, maximo = (valor[0], np.inf) if self.pregunta == "asientos" else valor
+        if minimo > maximo:
+            minimo, maximo = maximo, minimo
+        if minimo <= 0 and maximo == np.inf:
+            return self.total
+        inicio = np.searchsorted(self._ordenados, max(minimo, 0), side="left")
+        fin = np.searchsorted(self._ordenados, maximo, side="right")
+        return int(max(fin - inicio, 0))
+
+
+# Resultados que devuelve por defecto la búsqueda de marcas y modelos
+RESULTADOS_BUSQUEDA = 8
+
+
+# Búsqueda de marcas y modelos mientras se escribe, tolerante a erratas. Las
+# entradas son las parejas (marca, modelo) distintas del catálogo y cada marca
+# sola, con el texto "marca modelo" y pesadas por sus filas, así que una marca
+# va antes que sus modelos y los modelos con más filas antes que los demás. Las
+# claves de búsqueda se calculan una vez por marca y por modelo distintos.
+class BuscadorModelos:
+    def __init__(self, catalogo, indice_modelo):
+        marcas, modelos = catalogo.indice_marca.codigos, indice_modelo.codigos
+        validas = np.flatnonzero((marcas >= 0) & (modelos >= 0))
+        parejas, primeras, filas = np.unique(marcas[validas].astype(np.int64) << 32 | modelos[validas],
+                                             return_index=True, return_counts=True)
+        marcas_parejas = (parejas >> 32).astype(np.intp)
+        por_marca = np.bincount(marcas_parejas, weights=filas, minlength=len(catalogo.indice_marca.codigo_de))
+        solas = np.flatnonzero(por_marca)
+
+        nombres_marcas = [str(nombre) for nombre in catalogo.df["Company Names"].cat.categories]
+        claves_marcas = claves_busqueda([clave_marca(nombre) for nombre in nombres_marcas])
+        nombres_modelos = catalogo.df["Cars Names"].to_numpy()[validas[primeras]]
+        claves_modelos = claves_busqueda(list(indice_modelo.codigo_de))
+
+        # Entradas: primero las marcas solas y después las parejas
+        self.marcas = np.concatenate([solas, marcas_parejas])
+        self.modelos = [""] * len(solas) + [str(nombre).strip() for nombre in nombres_modelos]
+        self.nombres_marcas = nombres_marcas
+        claves = [claves_marcas[marca] for marca in solas]
+        claves += [f"{claves_marcas[marca]} {claves_modelos[modelo]}".strip()
+                   for marca, modelo in zip(marcas_parejas, (parejas & 0xFFFFFFFF).astype(np.intp))]
+        self.filas = np.concatenate([por_marca[solas], filas]).astype(np.int64)
+        self.indice = IndiceTexto(claves, clave_busqueda, self.filas)
+
+    # Lista de {"marca", "modelo" ("" si es la marca sola), "filas", "puntuacion"}
+    def buscar(self, texto, k=RESULTADOS_BUSQUEDA):
+        entradas, puntuaciones = self.indice.buscar(texto, k)
+        return [{"marca": self.nombres_marcas[self.marcas[entrada]], "modelo": self.modelos[entrada],
+                 "filas": int(self.filas[entrada]), "puntuacion": round(float(puntuacion), 3)}
+                for entrada, puntuacion in zip(entradas, puntuaciones)]
+
+
+def buscar_modelos(texto, catalogo=None, k=RESULTADOS_BUSQUEDA):
+    if catalogo is None:
+        catalogo = obtener_catalogo()
+    buscador = catalogo.buscador_modelos
+    with etapa("buscar_modelos") as medicion:
+        resultados = buscador.buscar(texto, k)
+        medicion.filas = len(resultados)
+    return resultados
+
+
+# Función de recomendación mejorada: devuelve los vehículos filtrados y ordenados
+def recomendar_vehiculos(respuestas=None, catalogo=None):
+    respuestas = canonizar_respuestas(respuestas)
+    if catalogo is None:
+        catalogo = obtener_catalogo()
+    resultados = catalogo.df.iloc[filtrar_posiciones(respuestas, catalogo)]
+
+    # Calcular puntuación si hay resultados
+    if not resultados.empty:
+        with etapa("calcular_puntuacion") as medicion:
+            medicion.filas = len(resultados)
+            resultados = calcular_puntuacion(resultados, respuestas)
+        with etapa("ordenar"):
+            return resultados.sort_values(by=['puntuacion_total', 'Cars Prices'], ascending=[False, True])
+
+    return resultados
+
+
+# Extremos del conjunto filtrado que usan las fórmulas de puntuación. Se
+# calculan aparte para poder combinarlos cuando el catálogo se procesa por
+# trozos (ver combinar_resumenes).
+def resumen_filtrado(precios, hp, asientos):
+    def extremo(funcion, valores):
+        return float(funcion(valores)) if len(valores) and not np.isnan(valores).all() else np.nan
+
+    return {
+        'precio_max': extremo(np.nanmax, precios),
+        'hp_max': extremo(np.nanmax, hp),
+        'asientos_min': extremo(np.nanmin, asientos),
+        'asientos_max': extremo(np.nanmax, asientos),
+    }
+
+
+def combinar_resumenes(resumenes):
+    resumenes = list(resumenes)
+    return {
+        'precio_max': float(np.fmax.reduce([r['precio_max'] for r in resumenes] or [np.nan])),
+        'hp_max': float(np.fmax.reduce([r['hp_max'] for r in resumenes] or [np.nan])),
+        'asientos_min': float(np.fmin.reduce([r['asientos_min'] for r in resumenes] or [np.nan])),
+        'asientos_max': float(np.fmax.reduce([r['asientos_max'] for r in resumenes] or [np.nan])),
+    }
+
+
+# Componentes de la puntuación (mismas fórmulas que calcular_puntuacion) a
+# partir de arreglos de valores y del resumen de todo el conjunto filtrado
+def componentes_puntuacion(precios, hp, asientos, coincide_combustible, coincide_marca, respuestas, resumen):
+    # Puntuación por precio (menor precio = mayor puntuación)
+    if respuestas["presupuesto_max"] < float('inf'):
+        precio_max = respuestas["presupuesto_max"]
+    else:
+        precio_max = resumen['precio_max'] * 1.1
+    score_precio = 1 - (precios / precio_max)
+
+    # Puntuación por caballos de fuerza
+    if respuestas["hp_max"] < float('inf'):
+        hp_max = respuestas["hp_max"]
+    else:
+        hp_max = resumen['hp_max']
+    score_hp = hp / hp_max if hp_max > 0 else np.zeros(len(precios), dtype=int)
+
+    # Puntuación por asientos
+    if respuestas["asientos"] > 0:
+        asientos_min = respuestas["asientos"]
+    else:
+        asientos_min = resumen['asientos_min']
+    asientos_max = resumen['asientos_max']
+    if (asientos_max - asientos_min) > 0:
+        score_asientos = (asientos - asientos_min) / (asientos_max - asientos_min)
+    else:
+        score_asientos = np.zeros(len(precios), dtype=int)
+
+    # Puntuación por combustible y marca
+    score_combustible = np.asarray(coincide_combustible).astype(int)
+    score_marca = np.asarray(coincide_marca).astype(int)
+
+    # Puntuación total ponderada
+    puntuacion_total = (
+        score_precio * PESOS['precio'] +
+        score_hp * PESOS['caballos_fuerza'] +
+        score_asientos * PESOS['asientos'] +
+        score_combustible * PESOS['combustible'] +
+        score_marca * PESOS['marca']
+    ) * 100
+
+    return {
+        'score_precio': score_precio,
+        'score_hp': score_hp,
+        'score_asientos': score_asientos,
+        'score_combustible': score_combustible,
+        'score_marca': score_marca,
+        'puntuacion_total': np.round(puntuacion_total, 2),
+    }
+
+
+# Componentes de la puntuación para las filas indicadas del catálogo
+def puntuar_posiciones(posiciones, respuestas, catalogo):
+    with etapa("puntuar") as medicion:
+        medicion.filas = len(posiciones)
+        return _puntuar_posiciones(posiciones, respuestas, catalogo)
+
+
+def _puntuar_posiciones(posiciones, respuestas, catalogo):
+    precios = catalogo.indice_precio.valores[posiciones]
+    hp = catalogo.indice_hp.valores[posiciones]
+    asientos = catalogo.indice_asientos.valores[posiciones]
+
+    # Combustible y marca: comparación de códigos enteros
+    indice_combustible, indice_marca = catalogo.indice_combustible, catalogo.indice_marca
+    coincide_combustible = indice_combustible.codigos[posiciones] == indice_combustible.codigo(respuestas["combustible"])
+    coincide_marca = indice_marca.codigos[posiciones] == indice_marca.codigo(respuestas["marca"])
+
+    return componentes_puntuacion(precios, hp, asientos, coincide_combustible, coincide_marca,
+                                  respuestas, resumen_filtrado(precios, hp, asientos))
+
+
+# Índices (sobre "puntuacion") de los k mejores: mayor puntuación primero y, a
+# igual puntuación, menor precio. Usa selección parcial en vez de ordenar todo.
+# Lanza ValueError si k no es un entero positivo (ver validar_k).
+def seleccionar_top(puntuacion, precios, k):
+    k = validar_k(k)
+    n = len(puntuacion)
+    clave = np.where(np.isnan(puntuacion), -np.inf, puntuacion)
+    if k < n:
+        # Umbral del k-ésimo mejor; se conservan también los empates con él
+        umbral = np.partition(clave, n - k)[n - k]
+        elegidos = np.flatnonzero(clave >= umbral)
+    else:
+        elegidos = np.arange(n)
+    # lexsort es estable: los empates completos mantienen el orden del catálogo
+    orden = np.lexsort((precios[elegidos], -puntuacion[elegidos]))
+    return elegidos[orden[:k]]
+
+
+# k como entero positivo (con k < 1 la selección parcial no tiene sentido: 0
+# rompe np.partition y un negativo tomaría filas desde el final)
+def validar_k(k):
+    try:
+        entero = int(k)
+    except (TypeError, ValueError):
+        entero = None
+    if isinstance(k, bool) or entero is None or entero != k or entero < 1:
+        raise ValueError(f"k debe ser un entero positivo: {k!r}")
+    return entero
+
+
+# Los k vehículos mejor puntuados y el número total de coincidencias, sin
+# construir ni ordenar el DataFrame de todos los resultados. Las respuestas se
+# canonizan y el resultado se memoriza en la caché LRU del catálogo. Lanza
+# ValueError si k no es un entero positivo.
+def recomendar_top(respuestas=None, catalogo=None, k=TOP_K, usar_cache=True):
+    k = validar_k(k)
+    respuestas = canonizar_respuestas(respuestas)
+    if catalogo is None:
+        catalogo = obtener_catalogo()
+    if not usar_cache:
+        return _recomendar_top(respuestas, catalogo, k)
+
+    clave = (clave_respuestas(respuestas), k)
+    guardado = catalogo.cache.obtener(clave)
+    if guardado is None:
+        guardado = _recomendar_top(respuestas, catalogo, k)
+        catalogo.cache.guardar(clave, guardado)
+    # Copia para que quien llama no pueda alterar lo guardado
+    resultados, total = guardado
+    return resultados.copy(), total
+
+
+def _recomendar_top(respuestas, catalogo, k):
+    posiciones = filtrar_posiciones(respuestas, catalogo)
+    total = len(posiciones)
+    if total == 0:
+        return catalogo.df.iloc[posiciones], 0
+
+    componentes = puntuar_posiciones(posiciones, respuestas, catalogo)
+    precios = catalogo.indice_precio.valores[posiciones]
+    with etapa("seleccionar_top"):
+        mejores = seleccionar_top(componentes['puntuacion_total'], precios, k)
+
+    resultados = catalogo.df.iloc[posiciones[mejores]].copy()
+    for nombre, valores in componentes.items():
+        resultados[nombre] = valores[mejores]
+    return resultados, total
+
+
+# Características numéricas de "más como este": columna (o prefijo de
+# ESPECIFICACIONES, del que se toma el punto medio del rango) -> si se compara
+# en escala logarítmica (precios, potencias y cilindradas varían en órdenes de
+# magnitud)
+CARACTERISTICAS_SIMILITUD = {
+    "Cars Prices": True,
+    "HorsePower": True,
+    "Seats": False,
+    "Total Speed": False,
+    "Performance": False,
+    "Torque": True,
+    "CC": True,
+}
+
+
+# Matriz (filas x características) sin normalizar; NaN donde no hay dato. Con
+# una sola fila (Series) devuelve una matriz de 1 fila.
+def caracteristicas_similitud(df):
+    una_fila = isinstance(df, pd.Series)
+    columnas_df = df.index if una_fila else df.columns
+
+    def columna(nombre):
+        return np.array([df[nombre]], dtype=float) if una_fila else df[nombre].to_numpy(dtype=float)
+
+    columnas = []
+    for nombre, logaritmica in CARACTERISTICAS_SIMILITUD.items():
+        if f"{nombre}_min" in columnas_df:
+            valores = (columna(f"{nombre}_min") + columna(f"{nombre}_max")) / 2
+        elif nombre in columnas_df:
+            valores = columna(nombre)
+        else:
+            valores = np.full(1 if una_fila else len(df), np.nan)
+        if logaritmica:
+            valores = np.log(np.where(valores > 0, valores, np.nan))
+        columnas.append(valores)
+    return np.column_stack(columnas)
+
+
+# Características normalizadas (mediana 0, desviación 1; un dato que falta
+# cuenta como la mediana) y su árbol de vecinos
+class IndiceSimilitud:
+    def __init__(self, df):
+        crudas = caracteristicas_similitud(df)
+        validas = ~np.isnan(crudas)
+        self.centro = np.array([np.median(c[v]) if v.any() else 0.0 for c, v in zip(crudas.T, validas.T)])
+        self.escala = np.array([np.std(c[v]) if v.any() else 0.0 for c, v in zip(crudas.T, validas.T)])
+        self.escala[~(self.escala > 0)] = 1.0
+        self.arbol = IndiceVecinos(self.normalizar(crudas))
+
+    def normalizar(self, crudas):
+        normalizadas = (crudas - self.centro) / self.escala
+        return np.where(np.isnan(normalizadas), 0.0, normalizadas)
+
+
+# "Más como este": los k vehículos del catálogo más parecidos a "fila" (una
+# fila del catálogo o de unos resultados) según CARACTERISTICAS_SIMILITUD, sin
+# el propio modelo. Con combustible o marca solo se buscan vehículos de ese
+# combustible o marca. Devuelve las filas ordenadas de más a menos parecida
+# con las columnas "distancia" y "similitud" (0-100).
+def vehiculos_similares(fila, catalogo=None, k=TOP_K, combustible="", marca=""):
+    if catalogo is None:
+        catalogo = obtener_catalogo()
+    with etapa("similares"):
+        indice = catalogo.indice_similitud
+        punto = indice.normalizar(caracteristicas_similitud(fila))[0]
+
+        permitidas = None
+        for texto, indice_categorico in ((combustible, catalogo.indice_combustible), (marca, catalogo.indice_marca)):
+            if texto:
+                coincide = indice_categorico.codigos == indice_categorico.codigo(texto)
+                permitidas = coincide if permitidas is None else permitidas & coincide
+
+        # El propio modelo (y sus duplicados) se descarta de lo encontrado;
+        # si se lleva demasiados resultados se pide más vecinos
+        marca_propia = catalogo.indice_marca.codigo(fila.get("Company Names", ""))
+        modelo_propio = normalizar(fila.get("Cars Names"))
+        pedidos = k + 1
+        while True:
+            posiciones, distancias = indice.arbol.vecinos(punto, pedidos, permitidas)
+            nombres = catalogo.df["Cars Names"].iloc[posiciones].tolist()
+            otros = np.array([not (catalogo.indice_marca.codigos[p] == marca_propia and normalizar(n) == modelo_propio)
+                              for p, n in zip(posiciones, nombres)], dtype=bool)
+            if otros.sum() >= k or len(posiciones) < pedidos:
+                break
+            pedidos *= 2
+        posiciones, distancias = posiciones[otros][:k], distancias[otros][:k]
+
+        return catalogo.df.iloc[posiciones].assign(distancia=np.round(distancias, 4),
+                                                   similitud=np.round(100 / (1 + distancias), 1))
+
+
+# Sugerencias cuando una búsqueda da pocos resultados: qué filtro (o el menor
+# grupo de filtros) conviene relajar, y cuánto, para llegar a "minimo"
+# coincidencias. Se calcula para cada fila qué criterios cumple (un bit por
+# criterio activo) y con un histograma de esas máscaras se obtiene el número de
+# coincidencias de las 2^k combinaciones de filtros conservados de una vez.
+CRITERIOS = ("presupuesto", "combustible", "asientos", "marca", "hp")
+MAX_SUGERENCIAS = 4
+
+
+def _cumple_criterio(criterio, respuestas, catalogo):
+    if criterio == "presupuesto":
+        return catalogo.indice_precio.comprobar(slice(None), respuestas["presupuesto_min"], respuestas["presupuesto_max"])
+    if criterio == "hp":
+        return catalogo.indice_hp.comprobar(slice(None), respuestas["hp_min"], respuestas["hp_max"])
+    if criterio == "asientos":
+        return catalogo.indice_asientos.comprobar(slice(None), respuestas["asientos"])
+    if criterio == "combustible":
+        return catalogo.indice_combustible.comprobar(slice(None), respuestas["combustible"])
+    cumple = catalogo.indice_marca.comprobar(slice(None), respuestas["marca"]) if respuestas["marca"] else True
+    if respuestas["modelo"]:
+        cumple = cumple & catalogo.indice_modelo.comprobar(slice(None), respuestas["modelo"])
+    return cumple
+
+
+def _criterio_activo(criterio, respuestas):
+    por_defecto = [respuestas[campo] == RESPUESTAS_POR_DEFECTO[campo] for campo in CAMPOS_PREGUNTA[criterio]]
+    return not all(por_defecto)
+
+
+# Ajuste mínimo de un solo criterio para llegar a "minimo" coincidencias entre
+# las filas "candidatas" (las que cumplen todos los demás). Devuelve las
+# respuestas relajadas o None si quitar el criterio no basta.
+def _ajustar_criterio(criterio, respuestas, catalogo, candidatas, minimo):
+    if len(candidatas) < minimo:
+        return None
+    ajustadas = dict(respuestas)
+
+    if criterio in ("presupuesto", "hp"):
+        indice = catalogo.indice_precio if criterio == "presupuesto" else catalogo.indice_hp
+        campo_min, campo_max = CAMPOS_PREGUNTA[criterio]
+        valores = indice.valores[candidatas]
+        valores = valores[~np.isnan(valores)]
+        if len(valores) < minimo:
+            return None
+        # Las "minimo" filas más cercanas al rango pedido marcan el rango nuevo
+        distancia = np.maximum(respuestas[campo_min] - valores, valores - respuestas[campo_max]).clip(min=0)
+        cercanas = valores[np.argpartition(distancia, minimo - 1)[:minimo]]
+        ajustadas[campo_min] = float(min(respuestas[campo_min], cercanas.min()))
+        ajustadas[campo_max] = float(max(respuestas[campo_max], cercanas.max()))
+    elif criterio == "asientos":
+        asientos = catalogo.indice_asientos.valores[candidatas]
+        asientos = np.sort(asientos[~np.isnan(asientos)])[::-1]
+        if len(asientos) < minimo:
+            return None
+        ajustadas["asientos"] = int(asientos[minimo - 1])
+    else:
+        # Otra categoría con suficientes coincidencias, o ninguna si no la hay
+        indice = catalogo.indice_combustible if criterio == "combustible" else catalogo.indice_marca
+        codigos = indice.codigos[candidatas]
+        recuento = np.bincount(codigos[codigos >= 0], minlength=len(indice.codigo_de))
+        mejor = int(np.argmax(recuento)) if len(recuento) else -1
+        columna = catalogo.df["Fuel Types" if criterio == "combustible" else "Company Names"]
+        if mejor >= 0 and recuento[mejor] >= minimo:
+            ajustadas[criterio] = str(columna.cat.categories[mejor]).lower()
+        else:
+            ajustadas[criterio] = ""
+        if criterio == "marca":
+            ajustadas["modelo"] = ""
+    return ajustadas
+
+
+# Lista de sugerencias (como mucho MAX_SUGERENCIAS), cada una un diccionario con
+# "relajar" (criterios que cambian), "respuestas" (ya relajadas) y
+# "coincidencias". Vacía si la búsqueda ya tiene "minimo" coincidencias o no
+# hay criterios que relajar.
+def sugerir_relajaciones(respuestas=None, catalogo=None, minimo=TOP_K):
+    respuestas = canonizar_respuestas(respuestas)
+    if catalogo is None:
+        catalogo = obtener_catalogo()
+    with etapa("sugerir_relajaciones"):
+        return _sugerir_relajaciones(respuestas, catalogo, minimo)
+
+
+def _sugerir_relajaciones(respuestas, catalogo, minimo):
+    activos = [criterio for criterio in CRITERIOS if _criterio_activo(criterio, respuestas)]
+    if not activos:
+        return []
+
+    # Las especificaciones opcionales no se relajan: se exigen siempre
+    base = {campo: respuestas[campo] for campo in FILTROS_ESPECIFICACIONES}
+    validas = filtrar_posiciones(canonizar_respuestas(base), catalogo)
+
+    bits = np.zeros(len(catalogo.df), dtype=np.int32)
+    for i, criterio in enumerate(activos):
+        bits |= _cumple_criterio(criterio, respuestas, catalogo).astype(np.int32) << i
+    bits = bits[validas]
+
+    # conservando[m] = filas que cumplen al menos los criterios de la máscara m
+    todos = (1 << len(activos)) - 1
+    conservando = np.bincount(bits, minlength=todos + 1)
+    for i in range(len(activos)):
+        for mascara in range(todos + 1):
+            if not mascara & (1 << i):
+                conservando[mascara] += conservando[mascara | (1 << i)]
+    if conservando[todos] >= minimo:
+        return []
+
+    def sugerencia(relajar, ajustadas):
+        return {"relajar": relajar, "respuestas": ajustadas,
+                "coincidencias": len(filtrar_posiciones(ajustadas, catalogo))}
+
+    # Primero, ajustar un solo criterio lo justo
+    sugerencias = []
+    for i, criterio in enumerate(activos):
+        resto = todos & ~(1 << i)
+        if conservando[resto] < minimo:
+            continue
+        candidatas = validas[(bits & resto) == resto]
+        ajustadas = _ajustar_criterio(criterio, respuestas, catalogo, candidatas, minimo)
+        if ajustadas is not None:
+            sugerencias.append(sugerencia((criterio,), ajustadas))
+    if sugerencias:
+        return sorted(sugerencias, key=lambda s: s["coincidencias"])[:MAX_SUGERENCIAS]
+
+    # Si no basta con uno, quitar el menor número de criterios posible
+    combinaciones = [m for m in range(todos + 1) if conservando[m] >= minimo]
+    if not combinaciones:
+        return []
+    mas_conservados = max(bin(m).count("1") for m in combinaciones)
+    for mascara in sorted(combinaciones, key=lambda m: -conservando[m]):
+        if bin(mascara).count("1") != mas_conservados:
+            continue
+        relajar = tuple(criterio for i, criterio in enumerate(activos) if not mascara & (1 << i))
+        ajustadas = dict(respuestas)
+        for criterio in relajar:
+            for campo in CAMPOS_PREGUNTA[criterio]:
+                ajustadas[campo] = RESPUESTAS_POR_DEFECTO[campo]
+        sugerencias.append(sugerencia(relajar, ajustadas))
+    return sugerencias[:MAX_SUGERENCIAS]
+
+
+# Todas las coincidencias en orden de recomendación: posiciones en el catálogo
+# y componentes de puntuación ya ordenados. Se calcula una vez por respuestas.
+def clasificar(respuestas, catalogo):
+    clave = _clave_canonica(respuestas)
+    guardado = catalogo.cache_clasificaciones.obtener(clave)
+    if guardado is None:
+        posiciones = filtrar_posiciones(respuestas, catalogo)
+        componentes = {}
+        if len(posiciones):
+            componentes = puntuar_posiciones(posiciones, respuestas, catalogo)
+            precios = catalogo.indice_precio.valores[posiciones]
+            with etapa("ordenar"):
+                orden = seleccionar_top(componentes['puntuacion_total'], precios, len(posiciones))
+            posiciones = posiciones[orden]
+            componentes = {nombre: valores[orden] for nombre, valores in componentes.items()}
+        guardado = (posiciones, componentes)
+        catalogo.cache_clasificaciones.guardar(clave, guardado)
+    return guardado
+
+
+# Filas [inicio, inicio + cantidad) de la clasificación completa y el número
+# total de coincidencias. Solo se materializan las filas pedidas, así que una
+# interfaz puede ir pidiendo páginas a medida que se desplaza. Con "pesos"
+# (criterio -> peso, los que falten como en PESOS) se ordena por esa
+# ponderación en vez de la de PESOS (ver MatrizComponentes).
+def recomendar_pagina(respuestas=None, catalogo=None, inicio=0, cantidad=TAMANO_PAGINA, pesos=None):
+    respuestas = canonizar_respuestas(respuestas)
+    if catalogo is None:
+        catalogo = obtener_catalogo()
+    tramo = slice(max(inicio, 0), max(inicio, 0) + max(cantidad, 0))
+    if pesos is not None:
+        pesos = normalizar_pesos(pesos)
+        if not pesos_por_defecto(pesos):
+            return _pagina_ponderada(respuestas, catalogo, tramo, pesos)
+
+    posiciones, componentes = clasificar(respuestas, catalogo)
+    columnas = {nombre: valores[tramo] for nombre, valores in componentes.items()}
+    return _filas_con_columnas(catalogo, posiciones[tramo], columnas), len(posiciones)
+
+
+# Filas del catálogo en "posiciones" con las columnas calculadas añadidas de una
+# vez: insertarlas de una en una es lo que más cuesta en una página corta
+def _filas_con_columnas(catalogo, posiciones, columnas):
+    filas = catalogo.df.iloc[posiciones]
+    if not len(filas):
+        return filas.copy()
+    return pd.concat([filas, pd.DataFrame(columnas, index=filas.index)], axis=1)
+
+
+# Pesos completos (los que falten como en PESOS) escalados para que sumen 1.
+# Lanza ValueError con criterios desconocidos, pesos negativos o todos a cero.
+def normalizar_pesos(pesos):
+    desconocidos = sorted(set(pesos) - set(PESOS))
+    if desconocidos:
+        raise ValueError(f"Criterios desconocidos: {', '.join(desconocidos)}")
+    completos = {}
+    for criterio, peso in dict(PESOS, **pesos).items():
+        try:
+            completos[criterio] = float(peso)
+        except (TypeError, ValueError):
+            raise ValueError(f"Peso no numérico para {criterio}: {peso!r}") from None
+        if not completos[criterio] >= 0:
+            raise ValueError(f"El peso de {criterio} no puede ser negativo")
+    total = sum(completos.values())
+    if not 0 < total < float('inf'):
+        raise ValueError("Al menos un peso debe ser positivo")
+    return {criterio: peso / total for criterio, peso in completos.items()}
+
+
+def pesos_por_defecto(pesos):
+    return all(abs(pesos[criterio] - peso) < 1e-9 for criterio, peso in PESOS.items())
+
+
+# Componentes de puntuación de la clasificación de unas respuestas como matriz
+# (coincidencias x criterios, en el orden de PESOS), para reordenar con otros
+# pesos sin volver a puntuar: la puntuación es un producto matriz-vector y se
+# seleccionan de nuevo los k primeros. La última ponderación se conserva, así
+# que paginar con los mismos pesos no repite el producto.
+class MatrizComponentes:
+    def __init__(self, posiciones, componentes, precios):
+        self.posiciones = posiciones
+        self.componentes = componentes
+        self.precios = precios
+        self.matriz = np.column_stack([np.asarray(componentes[columna], dtype=float)
+                                       for columna in COMPONENTES_PESOS.values()])
+        self._ultima = (None, None)
+        self._candado = threading.Lock()
+
+    # puntuacion_total (redondeada como la de PESOS) con los pesos normalizados
+    def puntuacion(self, pesos):
+        vector = tuple(pesos[criterio] for criterio in COMPONENTES_PESOS)
+        with self._candado:
+            ultimo, puntuacion = self._ultima
+        if ultimo != vector:
+            puntuacion = np.round(self.matriz @ (np.array(vector) * 100), 2)
+            with self._candado:
+                self._ultima = (vector, puntuacion)
+        return puntuacion
+
+
+def matriz_componentes(respuestas, catalogo):
+    clave = ("componentes", _clave_canonica(respuestas))
+    matriz = catalogo.cache_clasificaciones.obtener(clave)
+    if matriz is None:
+        posiciones, componentes = clasificar(respuestas, catalogo)
+        if not len(posiciones):
+            componentes = {columna: np.empty(0) for columna in COMPONENTES_PESOS.values()}
+        # En orden del catálogo: así los empates completos de puntuación y
+        # precio quedan como en recomendar_top y calcular_puntuacion
+        orden = np.argsort(posiciones, kind="stable")
+        posiciones = posiciones[orden]
+        componentes = {nombre: np.asarray(valores)[orden] for nombre, valores in componentes.items()}
+        matriz = MatrizComponentes(posiciones, componentes, catalogo.indice_precio.valores[posiciones])
+        catalogo.cache_clasificaciones.guardar(clave, matriz)
+    return matriz
+
+
+def _pagina_ponderada(respuestas, catalogo, tramo, pesos):
+    matriz = matriz_componentes(respuestas, catalogo)
+    total = len(matriz.posiciones)
+    # Tramo vacío o más allá del final: página vacía, como sin pesos
+    if tramo.start >= min(tramo.stop, total):
+        return catalogo.df.iloc[[]].copy(), total
+    with etapa("reponderar") as medicion:
+        medicion.filas = total
+        puntuacion = matriz.puntuacion(pesos)
+        elegidos = seleccionar_top(puntuacion, matriz.precios, tramo.stop)[tramo]
+
+    columnas = {columna: matriz.componentes[columna][elegidos] for columna in COMPONENTES_PESOS.values()}
+    columnas['puntuacion_total'] = puntuacion[elegidos]
+    return _filas_con_columnas(catalogo, matriz.posiciones[elegidos], columnas), total
+
+
+# Modo Pareto: en vez de ordenar por la puntuación ponderada (PESOS), primero
+# los vehículos que ningún otro supera a la vez en precio (menor), caballos y
+# asientos (mayores): la frontera o skyline. Después la frontera de los que
+# quedan, y así por capas; dentro de cada capa, por puntuación.
+
+# Máscara de los puntos no dominados. Se ordenan los puntos por (precio,
+# -caballos, -asientos), así que quien domina a un punto va antes que él; un
+# punto está dominado si alguno anterior con al menos sus asientos tiene al
+# menos sus caballos (máximo acumulado por nivel de asientos). Cuesta
+# O(n log n + n·m) con m valores distintos de asientos (unos pocos). Un dato
+# que falta cuenta como el peor valor; los puntos repetidos comparten resultado.
+def skyline(precios, hp, asientos):
+    orden, grupo, hp_u, asientos_u = _ordenar_skyline(precios, hp, asientos)
+    frente = np.empty(len(orden), dtype=bool)
+    frente[orden] = ~_dominados(hp_u, asientos_u)[grupo]
+    return frente
+
+
+# Orden de barrido, grupo (punto distinto) de cada posición de ese orden y
+# caballos y asientos de cada punto distinto
+def _ordenar_skyline(precios, hp, asientos):
+    # Un dato que falta pasa a ser menor que todos (finito: -inf es "ninguno")
+    def peor(valores):
+        validos = valores[~np.isnan(valores)]
+        return np.where(np.isnan(valores), validos.min() - 1 if len(validos) else 0.0, valores)
+
+    hp, asientos = peor(hp), peor(asientos)
+    orden = np.lexsort((-asientos, -hp, precios))
+    precios_o, hp_o, asientos_o = precios[orden], hp[orden], asientos[orden]
+    # Los puntos repetidos quedan contiguos
+    nuevo = np.ones(len(orden), dtype=bool)
+    nuevo[1:] = (np.diff(precios_o) != 0) | (np.diff(hp_o) != 0) | (np.diff(asientos_o) != 0)
+    return orden, np.cumsum(nuevo) - 1, hp_o[nuevo], asientos_o[nuevo]
+
+
+# Puntos dominados de una secuencia de puntos distintos en orden de barrido
+def _dominados(hp, asientos):
+    dominado = np.zeros(len(hp), dtype=bool)
+    for nivel in np.unique(asientos):
+        maximo = np.maximum.accumulate(np.where(asientos >= nivel, hp, -np.inf))
+        anterior = np.concatenate([[-np.inf], maximo[:-1]])
+        en_nivel = asientos == nivel
+        dominado[en_nivel] = anterior[en_nivel] >= hp[en_nivel]
+    return dominado
+
+
+# Capas de Pareto que se calculan a medida que se piden (para paginar sin
+# pelar todas). Se ordena una sola vez: quitar una capa no cambia el orden de
+# barrido de los puntos que quedan. Los puntos vienen en orden de puntuación,
+# y cada capa se devuelve en ese orden.
+#
+# Cada capa recorre solo los puntos que pueden estar en ella: los de iguales
+# caballos y asientos forman una cadena por precio, así que el j-ésimo más
+# barato está como pronto en la capa j (cota). Las capas hasta "limite" se
+# pelan entre los puntos con cota <= limite, y al llegar a él se dobla. Es
+# exacto: la cadena más larga que acaba en un punto de la capa j <= limite
+# pasa solo por capas anteriores, que tienen cota < j.
+CAPAS_POR_TANDA = 8
+
+
+class CapasPareto:
+    def __init__(self, precios, hp, asientos):
+        self._barrido, self._grupo, self._hp, self._asientos = _ordenar_skyline(precios, hp, asientos)
+        distintos = len(self._hp)
+        por_config = np.lexsort((np.arange(distintos), self._asientos, self._hp))
+        nueva = np.ones(distintos, dtype=bool)
+        nueva[1:] = (np.diff(self._hp[por_config]) != 0) | (np.diff(self._asientos[por_config]) != 0)
+        primera = np.maximum.accumulate(np.where(nueva, np.arange(distintos), 0))
+        self._cota = np.empty(distintos, dtype=np.intp)
+        self._cota[por_config] = np.arange(distintos) - primera + 1
+
+        self._pendiente = np.ones(distintos, dtype=bool)
+        self._quedan = distintos
+        self._limite = 0
+        self._activos = np.empty(0, dtype=np.intp)
+        self._capa = 0
+        self._orden = [np.empty(0, dtype=np.intp)]
+        self._capas = [np.empty(0, dtype=np.int32)]
+        self._calculadas = 0
+        self._candado = threading.Lock()
+
+    # (orden, capa) de al menos las n primeras posiciones (o de todas)
+    def hasta(self, n):
+        with self._candado:
+            if self._calculadas < n and self._quedan:
+                while self._calculadas < n and self._quedan:
+                    if self._capa >= self._limite:
+                        self._limite = max(2 * self._limite, CAPAS_POR_TANDA)
+                        self._activos = np.flatnonzero(self._pendiente & (self._cota <= self._limite))
+                    self._pelar()
+                self._orden = [np.concatenate(self._orden)]
+                self._capas = [np.concatenate(self._capas)]
+            return self._orden[0], self._capas[0]
+
+    def _pelar(self):
+        dominado = _dominados(self._hp[self._activos], self._asientos[self._activos])
+        frente = self._activos[~dominado]
+        self._activos = self._activos[dominado]
+        self._pendiente[frente] = False
+        self._quedan -= len(frente)
+
+        en_capa = np.zeros(len(self._hp), dtype=bool)
+        en_capa[frente] = True
+        miembros = np.sort(self._barrido[en_capa[self._grupo]])
+        self._capa += 1
+        self._orden.append(miembros)
+        self._capas.append(np.full(len(miembros), self._capa, dtype=np.int32))
+        self._calculadas += len(miembros)
+
+
+# Como recomendar_pagina pero en orden de capas de Pareto, con la columna
+# "capa_pareto" (1 = frontera). Las capas se guardan con las clasificaciones.
+def recomendar_pareto(respuestas=None, catalogo=None, inicio=0, cantidad=TAMANO_PAGINA):
+    respuestas = canonizar_respuestas(respuestas)
+    if catalogo is None:
+        catalogo = obtener_catalogo()
+    posiciones, componentes = clasificar(respuestas, catalogo)
+
+    clave = ("pareto", _clave_canonica(respuestas))
+    capas = catalogo.cache_clasificaciones.obtener(clave)
+    if capas is None:
+        capas = CapasPareto(catalogo.indice_precio.valores[posiciones], catalogo.indice_hp.valores[posiciones],
+                            catalogo.indice_asientos.valores[posiciones])
+        catalogo.cache_clasificaciones.guardar(clave, capas)
+
+    inicio, fin = max(inicio, 0), max(inicio, 0) + max(cantidad, 0)
+    with etapa("pareto") as medicion:
+        orden, capa = capas.hasta(fin)
+        medicion.filas = len(orden)
+    tramo = orden[inicio:fin]
+    resultados = catalogo.df.iloc[posiciones[tramo]].copy()
+    if len(resultados):
+        for nombre, valores in componentes.items():
+            resultados[nombre] = valores[tramo]
+        resultados["capa_pareto"] = capa[inicio:fin]
+    return resultados, len(posiciones)
+
+
+# Máximo de celdas (perfiles x filas) que se procesan a la vez en recomendar_lote
+CELDAS_POR_BLOQUE = 1 << 22
+
+
+# Recomendaciones top-k para muchos perfiles a la vez. Los filtros y las
+# puntuaciones se calculan como matrices (perfiles x catálogo) con difusión de
+# NumPy, por bloques de perfiles para acotar la memoria. Devuelve una lista con
+# (resultados, total) por perfil, igual que recomendar_top. Conviene con muchos
+# perfiles sobre catálogos pequeños o medianos; en catálogos muy grandes un
+# bucle de recomendar_top (que usa los índices) recorre menos filas.
+def recomendar_lote(perfiles, catalogo=None, k=TOP_K):
+    k = validar_k(k)
+    if catalogo is None:
+        catalogo = obtener_catalogo()
+    perfiles = [canonizar_respuestas(p) for p in perfiles]
+    filas = len(catalogo.df)
+    bloque = max(1, CELDAS_POR_BLOQUE // max(filas, 1))
+
+    salida = []
+    with etapa("recomendar_lote") as medicion:
+        medicion.filas = len(perfiles)
+        for inicio in range(0, len(perfiles), bloque):
+            salida.extend(_recomendar_bloque(perfiles[inicio:inicio + bloque], catalogo, k))
+    return salida
+
+
+def _recomendar_bloque(perfiles, catalogo, k):
+    precios = catalogo.indice_precio.valores
+    hp = catalogo.indice_hp.valores
+    asientos = catalogo.indice_asientos.valores
+    indice_combustible, indice_marca = catalogo.indice_combustible, catalogo.indice_marca
+
+    def columna(clave):
+        return np.array([p[clave] for p in perfiles], dtype=float)[:, None]
+
+    presupuesto_min, presupuesto_max = columna("presupuesto_min"), columna("presupuesto_max")
+    hp_min, hp_max = columna("hp_min"), columna("hp_max")
+    asientos_pedidos = columna("asientos")
+    combustible = np.array([indice_combustible.codigo(p["combustible"]) for p in perfiles])[:, None]
+    marca = np.array([indice_marca.codigo(p["marca"]) for p in perfiles])[:, None]
+    filtra_combustible = np.array([p["combustible"] != "" for p in perfiles])[:, None]
+    filtra_marca = np.array([p["marca"] != "" for p in perfiles])[:, None]
+
+    coincide_combustible = indice_combustible.codigos == combustible
+    coincide_marca = indice_marca.codigos == marca
+
+    # Filtros: un filtro inactivo deja pasar todas las filas (incluidas las nulas)
+    filtra_precio = (presupuesto_min > 0) | (presupuesto_max < np.inf)
+    filtra_hp = (hp_min > 0) | (hp_max < np.inf)
+    mascara = ~filtra_precio | ((precios >= presupuesto_min) & (precios <= presupuesto_max))
+    mascara &= ~filtra_hp | ((hp >= hp_min) & (hp <= hp_max))
+    mascara &= ~filtra_combustible | coincide_combustible
+    mascara &= ~(asientos_pedidos > 0) | (asientos >= asientos_pedidos)
+    mascara &= ~filtra_marca | coincide_marca
+    # El índice de modelos solo se usa (y se construye) si algún perfil lo pide
+    if any(p["modelo"] != "" for p in perfiles):
+        indice_modelo = catalogo.indice_modelo
+        modelo = np.array([indice_modelo.codigo(p["modelo"]) for p in perfiles])[:, None]
+        filtra_modelo = np.array([p["modelo"] != "" for p in perfiles])[:, None]
+        mascara &= ~filtra_modelo | (indice_modelo.codigos == modelo)
+    for campo, (nombre, tipo) in FILTROS_ESPECIFICACIONES.items():
+        valores = catalogo.indices_especificaciones[nombre].valores
+        pedido = columna(campo)
+        if tipo == "min":
+            mascara &= ~(pedido > 0) | (valores >= pedido)
+        else:
+            mascara &= ~(pedido < np.inf) | (valores <= pedido)
+    totales = mascara.sum(axis=1)
+
+    # Máximos y mínimos de cada perfil sobre sus filas filtradas
+    def reducir(valores, funcion, neutro):
+        validas = mascara & ~np.isnan(valores)
+        reducido = funcion(np.where(validas, valores, neutro), axis=1, keepdims=True)
+        return np.where(validas.any(axis=1, keepdims=True), reducido, np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Puntuación por precio (menor precio = mayor puntuación)
+        precio_max = np.where(presupuesto_max < np.inf, presupuesto_max, reducir(precios, np.max, -np.inf) * 1.1)
+        score_precio = 1 - (precios / precio_max)
+
+        # Puntuación por caballos de fuerza
+        hp_tope = np.where(hp_max < np.inf, hp_max, reducir(hp, np.max, -np.inf))
+        score_hp = np.where(hp_tope > 0, hp / hp_tope, 0)
+
+        # Puntuación por asientos
+        asientos_min = np.where(asientos_pedidos > 0, asientos_pedidos, reducir(asientos, np.min, np.inf))
+        rango_asientos = reducir(asientos, np.max, -np.inf) - asientos_min
+        score_asientos = np.where(rango_asientos > 0, (asientos - asientos_min) / rango_asientos, 0)
+
+    # Puntuación total ponderada
+    puntuacion_total = np.round((
+        score_precio * PESOS['precio'] +
+        score_hp * PESOS['caballos_fuerza'] +
+        score_asientos * PESOS['asientos'] +
+        coincide_combustible * PESOS['combustible'] +
+        coincide_marca * PESOS['marca']
+    ) * 100, 2)
+
+    # Umbral del k-ésimo mejor de cada perfil en una sola pasada; las filas
+    # filtradas con puntuación nula quedan por encima de las excluidas
+    filas = puntuacion_total.shape[1]
+    clave = puntuacion_total.copy()
+    clave[np.isnan(clave)] = -np.finfo(float).max
+    clave[~mascara] = -np.inf
+    if k < filas:
+        umbral = np.partition(clave, filas - k, axis=1)[:, filas - k][:, None]
+        candidatas = mascara & (clave >= umbral)
+    else:
+        candidatas = mascara
+
+    # Filas elegidas de todos los perfiles del bloque, ordenadas por perfil
+    elegidas = []
+    for i in range(len(perfiles)):
+        posiciones = np.flatnonzero(candidatas[i])
+        elegidas.append(posiciones[seleccionar_top(puntuacion_total[i, posiciones], precios[posiciones], k)])
+    limites = np.cumsum([0] + [len(e) for e in elegidas])
+    perfil = np.repeat(np.arange(len(perfiles)), np.diff(limites))
+    filas_elegidas = np.concatenate(elegidas) if elegidas else np.empty(0, dtype=np.intp)
+
+    # Un solo DataFrame para todo el bloque, que luego se reparte por perfil
+    combinado = catalogo.df.iloc[filas_elegidas].copy()
+    componentes = {
+        'score_precio': score_precio,
+        'score_hp': score_hp,
+        'score_asientos': score_asientos,
+        'score_combustible': coincide_combustible,
+        'score_marca': coincide_marca,
+        'puntuacion_total': puntuacion_total,
+    }
+    for nombre, valores in componentes.items():
+        combinado[nombre] = np.broadcast_to(valores, puntuacion_total.shape)[perfil, filas_elegidas]
+    combinado['score_combustible'] = combinado['score_combustible'].astype(int)
+    combinado['score_marca'] = combinado['score_marca'].astype(int)
+
+    salida = []
+    vacio = catalogo.df.iloc[[]]
+    for i in range(len(perfiles)):
+        if totales[i] == 0:
+            salida.append((vacio, 0))
+            continue
+        resultados = combinado.iloc[limites[i]:limites[i + 1]]
+        # Igual que en la ruta individual, una puntuación degenerada es el entero 0
+        if not (hp_tope[i, 0] > 0 and rango_asientos[i, 0] > 0):
+            resultados = resultados.copy()
+            if not hp_tope[i, 0] > 0:
+                resultados['score_hp'] = 0
+            if not rango_asientos[i, 0] > 0:
+                resultados['score_asientos'] = 0
+        salida.append((resultados, int(totales[i])))
+    return salida
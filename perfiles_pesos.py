@@ -0,0 +1,65 @@
+# Perfiles de pesos guardados
+#
+# Los pesos que se ajustan en la pantalla de resultados se pueden guardar con
+# un nombre y volver a usar en otra sesión. Se guardan normalizados (ver
+# motor.normalizar_pesos) en un archivo JSON junto a la aplicación,
+# {nombre: {criterio: peso}}, que se reescribe de forma atómica. El perfil
+# PERFIL_PREDETERMINADO son los PESOS del motor y no se guarda.
+
+import json
+import os
+
+import motor
+
+RUTA_PERFILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perfiles_pesos.json")
+PERFIL_PREDETERMINADO = "Predeterminado"
+
+
+def _leer(ruta):
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            datos = json.load(archivo)
+    except (OSError, ValueError):
+        return {}
+    return datos if isinstance(datos, dict) else {}
+
+
+def _escribir(ruta, perfiles):
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(perfiles, archivo, ensure_ascii=False, indent=1)
+    os.replace(temporal, ruta)
+
+
+# {nombre: pesos normalizados}, empezando por el predeterminado. Los perfiles
+# del archivo que no son válidos (editados a mano, criterios antiguos) se omiten.
+def cargar_perfiles(ruta=RUTA_PERFILES):
+    perfiles = {PERFIL_PREDETERMINADO: dict(motor.PESOS)}
+    for nombre, pesos in _leer(ruta).items():
+        if nombre == PERFIL_PREDETERMINADO or not isinstance(pesos, dict):
+            continue
+        try:
+            perfiles[nombre] = motor.normalizar_pesos(pesos)
+        except ValueError:
+            continue
+    return perfiles
+
+
+# Guarda (o sustituye) un perfil y devuelve sus pesos normalizados. Lanza
+# ValueError si el nombre está vacío o es el del predeterminado, o si los pesos
+# no son válidos.
+def guardar_perfil(nombre, pesos, ruta=RUTA_PERFILES):
+    nombre = nombre.strip()
+    if not nombre or nombre == PERFIL_PREDETERMINADO:
+        raise ValueError("Elige un nombre para el perfil de pesos")
+    pesos = motor.normalizar_pesos(pesos)
+    perfiles = _leer(ruta)
+    perfiles[nombre] = pesos
+    _escribir(ruta, perfiles)
+    return pesos
+
+
+def borrar_perfil(nombre, ruta=RUTA_PERFILES):
+    perfiles = _leer(ruta)
+    if perfiles.pop(nombre, None) is not None:
+        _escribir(ruta, perfiles)
@@ -0,0 +1,209 @@
+# Recarga en caliente del catálogo
+#
+# CatalogoVivo guarda el catálogo en uso. Cada actualización construye un
+# Catalogo nuevo a partir del anterior con Catalogo.con_cambios (solo se
+# preprocesan las filas nuevas y los índices se combinan) y después lo publica
+# con una única asignación. Una consulta toma "vivo.actual" una vez y trabaja
+# con ese objeto, que nunca se modifica, así que no puede ver una
+# actualización a medias. Con "preparar", cada catálogo nuevo se prepara (por
+# ejemplo, construyendo los índices que se crean al primer uso) antes de
+# publicarse, en el hilo que lo actualiza, así que las consultas no lo pagan.
+#
+# VigilanteCatalogo revisa periódicamente, en un hilo aparte:
+#   - DATASET.csv: compara la huella de cada línea con la de la última versión
+#     aplicada; las líneas nuevas o modificadas se añaden y las que
+#     desaparecen se quitan. Las filas añadidas se colocan en el lugar de su
+#     línea (una fila modificada no cambia de sitio), así que el catálogo queda
+#     en el mismo orden que si se cargara el CSV desde cero.
+#   - la carpeta de deltas: cada CSV con las mismas columnas sustituye las
+#     filas con la misma marca y modelo (o las añade). El archivo se mueve a
+#     "procesados" (o a "errores" si no se pudo aplicar).
+#
+# Cada fila añadida recibe una etiqueta de índice nueva (mayor que todas las
+# usadas), así que las etiquetas del catálogo nunca se repiten.
+
+import glob
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+import motor
+
+CARPETA_DELTAS = os.path.join(os.path.dirname(motor.RUTA_DATASET), "deltas")
+INTERVALO_REVISION = 2.0
+
+# Huella de las filas que no vienen de DATASET.csv (deltas)
+SIN_HUELLA = np.uint64(0)
+
+
+class CatalogoVivo:
+    def __init__(self, catalogo, preparar=None):
+        self._catalogo = catalogo
+        self._preparar = preparar
+        self._candado = threading.Lock()
+        self.version = 0
+
+    @property
+    def actual(self):
+        return self._catalogo
+
+    # Aplica filas nuevas (sin preprocesar) y quita las posiciones "eliminar".
+    # "tras" (uno por fila nueva, creciente) es la fila conservada detrás de la
+    # que va cada una, numerada entre las conservadas (-1: al principio); sin
+    # él van al final. Devuelve el catálogo publicado.
+    def aplicar(self, nuevas=None, eliminar=None, tras=None):
+        with self._candado:
+            destino = None
+            if nuevas is None:
+                nuevas = self._catalogo.df.iloc[:0]
+            else:
+                preprocesadas = motor.preprocesar_datos(nuevas)
+                if tras is not None:
+                    # Solo cuentan las filas que no descarta el preprocesado
+                    tras = pd.Series(np.asarray(tras), index=nuevas.index)[preprocesadas.index].to_numpy()
+                    destino = tras + 1 + np.arange(len(preprocesadas))
+                nuevas = preprocesadas
+            return self._publicar(self._catalogo.con_cambios(nuevas, eliminar, destino))
+
+    # Sustituye el catálogo completo (recarga desde cero)
+    def reemplazar(self, catalogo):
+        with self._candado:
+            return self._publicar(catalogo)
+
+    def _publicar(self, catalogo):
+        if self._preparar is not None:
+            self._preparar(catalogo)
+        self._catalogo = catalogo
+        self.version += 1
+        return catalogo
+
+
+# Huella de cada línea del CSV leído; las líneas repetidas se distinguen por
+# su número de aparición
+def huellas_filas(crudo):
+    por_fila = pd.util.hash_pandas_object(crudo, index=False)
+    aparicion = por_fila.groupby(por_fila).cumcount()
+    huellas = pd.util.hash_pandas_object(
+        pd.DataFrame({"fila": por_fila.to_numpy(), "aparicion": aparicion.to_numpy()}), index=False
+    ).to_numpy().copy()
+    # Reservar el 0 para las filas de deltas
+    huellas[huellas == SIN_HUELLA] = 1
+    return huellas
+
+
+# Clave de marca y modelo de cada fila (para sustituir filas desde los deltas)
+def claves_modelo(df):
+    marcas = df["Company Names"].astype(str).map(motor.clave_marca)
+    modelos = df["Cars Names"].astype(str).map(motor.normalizar)
+    return marcas + "|" + modelos
+
+
+class VigilanteCatalogo:
+    def __init__(self, vivo, ruta_csv=motor.RUTA_DATASET, carpeta_deltas=CARPETA_DELTAS,
+                 intervalo=INTERVALO_REVISION):
+        self.vivo = vivo
+        self.ruta_csv = ruta_csv
+        self.carpeta_deltas = carpeta_deltas
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._hilo = None
+
+        # Huella de cada fila del catálogo actual (alineada con sus posiciones y
+        # con sus etiquetas). El índice del catálogo recién cargado es el número
+        # de línea del CSV.
+        self._firma = self._firma_csv()
+        crudo = pd.read_csv(ruta_csv, encoding='latin1')
+        self._huellas_csv = huellas_filas(crudo)
+        etiquetas = vivo.actual.df.index
+        self._huellas = pd.Series(self._huellas_csv[etiquetas.to_numpy()], index=etiquetas)
+        self._siguiente_etiqueta = int(vivo.actual.df.index.max()) + 1 if len(vivo.actual) else 0
+
+    def _firma_csv(self):
+        try:
+            info = os.stat(self.ruta_csv)
+        except OSError:
+            return None
+        return info.st_size, info.st_mtime_ns
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._bucle, name="vigilante-catalogo", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def _bucle(self):
+        while not self._parar.wait(self.intervalo):
+            self.revisar()
+
+    # Una pasada de revisión; devuelve True si se publicó un catálogo nuevo
+    def revisar(self):
+        cambios = False
+        try:
+            cambios = self.revisar_csv()
+        except Exception as e:
+            print(f"⚠️ No se pudo recargar {self.ruta_csv}: {e}")
+        deltas = glob.glob(os.path.join(self.carpeta_deltas, "*.csv")) if self.carpeta_deltas else []
+        for ruta in sorted(deltas):
+            try:
+                self.aplicar_delta(ruta)
+                cambios = True
+                destino = "procesados"
+            except Exception as e:
+                print(f"⚠️ No se pudo aplicar el delta {ruta}: {e}")
+                destino = "errores"
+            os.makedirs(os.path.join(self.carpeta_deltas, destino), exist_ok=True)
+            shutil.move(ruta, os.path.join(self.carpeta_deltas, destino, os.path.basename(ruta)))
+        return cambios
+
+    def revisar_csv(self):
+        firma = self._firma_csv()
+        if firma is None or firma == self._firma:
+            return False
+
+        crudo = pd.read_csv(self.ruta_csv, encoding='latin1')
+        huellas_csv = huellas_filas(crudo)
+        anadidas = np.flatnonzero(~np.isin(huellas_csv, self._huellas_csv))
+        quitadas = np.setdiff1d(self._huellas_csv, huellas_csv)
+        huellas = self._huellas.to_numpy()
+        eliminar = np.flatnonzero(np.isin(huellas, quitadas))
+
+        # Posición entre las filas conservadas de cada línea que sigue en el
+        # catálogo; cada línea añadida va detrás de la última anterior a ella
+        conservadas = np.delete(huellas, eliminar)
+        orden = np.argsort(conservadas)
+        lugar = np.searchsorted(conservadas, huellas_csv, sorter=orden).clip(max=max(len(orden) - 1, 0))
+        posicion = np.full(len(huellas_csv), -1)
+        if len(orden):
+            encontradas = conservadas[orden[lugar]] == huellas_csv
+            posicion[encontradas] = orden[lugar[encontradas]]
+        tras = np.maximum.accumulate(posicion)[anadidas] if len(posicion) else posicion
+
+        self._aplicar(crudo.iloc[anadidas], eliminar, huellas_csv[anadidas], tras)
+        self._huellas_csv = huellas_csv
+        self._firma = firma
+        return True
+
+    def aplicar_delta(self, ruta):
+        delta = pd.read_csv(ruta, encoding='latin1')
+        catalogo = self.vivo.actual
+        eliminar = np.flatnonzero(claves_modelo(catalogo.df).isin(claves_modelo(delta)).to_numpy())
+        self._aplicar(delta, eliminar, np.full(len(delta), SIN_HUELLA))
+
+    # Publica el catálogo con las filas nuevas (cada una con su huella) y sin
+    # las posiciones "eliminar"; "tras" como en CatalogoVivo.aplicar
+    def _aplicar(self, nuevas, eliminar, huellas_nuevas, tras=None):
+        etiquetas = pd.RangeIndex(self._siguiente_etiqueta, self._siguiente_etiqueta + len(nuevas))
+        self._siguiente_etiqueta += len(nuevas)
+
+        catalogo = self.vivo.aplicar(nuevas.set_axis(etiquetas), eliminar, tras)
+        conservar = np.ones(len(self._huellas), dtype=bool)
+        conservar[eliminar] = False
+        huellas = pd.concat([self._huellas[conservar], pd.Series(huellas_nuevas, index=etiquetas)])
+        self._huellas = huellas.reindex(catalogo.df.index)
@@ -0,0 +1,264 @@
+# Servicio HTTP/JSON local del Asesor Inteligente
+#
+# Expone el motor para la web y las tabletas de la exposición sin la ventana
+# Tk. Cada petición trae sus propias preferencias (no hay estado global de
+# respuestas); todas comparten el mismo catálogo en memoria, que atiende un
+# grupo fijo de hilos trabajadores. Solo usa la biblioteca estándar, así que
+# funciona sin conexión:
+#
+#     python servicio.py --puerto 8000 --trabajadores 8
+#     curl -s localhost:8000/recommend -d '{"presupuesto_max": 50000, "combustible": "petrol"}'
+#
+# Rutas:
+#   POST /recommend   preferencias en JSON (mismos campos que RESPUESTAS_POR_DEFECTO,
+#                     más "k" e "inicio" opcionales); GET acepta los mismos
+#                     campos como parámetros de la URL
+#   GET  /search      ?q=texto&k=8: marcas y modelos que coinciden con lo escrito
+#                     (tolera erratas), para autocompletar antes de /recommend
+#   GET  /stats       percentiles de latencia, peticiones y caché (y de cada
+#                     etapa del motor con --metricas)
+#   GET  /health      estado y tamaño del catálogo
+
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+import motor
+import metricas
+from metricas import VentanaLatencias
+from recarga import CatalogoVivo, VigilanteCatalogo
+
+TRABAJADORES = 8
+K_MAXIMO = 100
+TAMANO_MAXIMO_PETICION = 1 << 16
+
+
+# Valor apto para JSON: tipos de NumPy a Python, NaN/infinito a null
+def _valor_json(valor):
+    if hasattr(valor, "item"):
+        valor = valor.item()
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
+
+
+class Servicio:
+    def __init__(self, vivo):
+        self.vivo = vivo
+        self.latencias = VentanaLatencias()
+        self.errores = 0
+        self.inicio = time.time()
+        self._candado = threading.Lock()
+
+    def registrar_error(self):
+        with self._candado:
+            self.errores += 1
+
+    # Respuesta de /recommend para unos datos ya decodificados del JSON
+    def recomendar(self, datos):
+        respuestas, k, inicio = motor.leer_preferencias(datos, K_MAXIMO)
+        respuestas = motor.canonizar_respuestas(respuestas)
+        catalogo = self.vivo.actual
+        if inicio == 0:
+            resultados, total = motor.recomendar_top(respuestas, catalogo, k=k)
+        else:
+            resultados, total = motor.recomendar_pagina(respuestas, catalogo, inicio, k)
+
+        explicaciones = motor.generar_explicaciones(resultados, respuestas)
+        filas = []
+        for (_, fila), explicacion in zip(resultados.iterrows(), explicaciones):
+            registro = {columna: _valor_json(valor) for columna, valor in fila.items() if not pd.isna(valor)}
+            registro["explicacion"] = explicacion
+            filas.append(registro)
+        return {
+            "respuestas": {campo: _valor_json(valor) for campo, valor in respuestas.items()},
+            "total": total,
+            "inicio": inicio,
+            "resultados": filas,
+        }
+
+    # Respuesta de /search: {"consulta", "resultados": [{"marca", "modelo", ...}]}
+    def buscar(self, datos):
+        consulta = str(datos.get("q", ""))
+        k = motor.leer_entero(datos.get("k", motor.RESULTADOS_BUSQUEDA), "k")
+        if not 1 <= k <= K_MAXIMO:
+            raise ValueError(f"k debe estar entre 1 y {K_MAXIMO}")
+        return {"consulta": consulta, "resultados": motor.buscar_modelos(consulta, self.vivo.actual, k)}
+
+    def estadisticas(self):
+        estadisticas = {
+            "latencia": self.latencias.resumen(),
+            "errores": self.errores,
+            "segundos_activo": round(time.time() - self.inicio, 1),
+            "vehiculos": len(self.vivo.actual),
+            "version_catalogo": self.vivo.version,
+            "cache": self.vivo.actual.cache.estadisticas(),
+        }
+        if metricas.instrumentacion.activa:
+            estadisticas["etapas"] = metricas.instrumentacion.resumen()["etapas"]
+        return estadisticas
+
+
+class Manejador(BaseHTTPRequestHandler):
+    server_version = "AsesorInteligente/1.0"
+
+    def do_GET(self):
+        ruta = urlsplit(self.path)
+        if ruta.path == "/recommend":
+            self._recomendar(dict(parse_qsl(ruta.query)))
+        elif ruta.path == "/search":
+            try:
+                cuerpo = self.server.servicio.buscar(dict(parse_qsl(ruta.query)))
+            except ValueError as e:
+                self.server.servicio.registrar_error()
+                self._enviar(400, {"error": str(e)})
+            except Exception as e:
+                self._error_interno(e)
+            else:
+                self._enviar(200, cuerpo)
+        elif ruta.path == "/stats":
+            self._enviar(200, self.server.servicio.estadisticas())
+        elif ruta.path == "/health":
+            self._enviar(200, {"estado": "ok", "vehiculos": len(self.server.servicio.vivo.actual)})
+        else:
+            self._enviar(404, {"error": f"Ruta desconocida: {ruta.path}"})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != "/recommend":
+            self._enviar(404, {"error": f"Ruta desconocida: {self.path}"})
+            return
+        # Sin una longitud válida no se lee el cuerpo: read(-1) esperaría a que
+        # el cliente cerrase la conexión, ocupando un trabajador
+        cabecera = self.headers.get("Content-Length")
+        if cabecera is None:
+            self._enviar(411, {"error": "Falta la cabecera Content-Length"})
+            return
+        try:
+            longitud = int(cabecera)
+        except ValueError:
+            longitud = -1
+        if longitud < 0:
+            self._enviar(400, {"error": f"Content-Length no válido: {cabecera!r}"})
+            return
+        if longitud > TAMANO_MAXIMO_PETICION:
+            self._enviar(413, {"error": "Petición demasiado grande"})
+            return
+        try:
+            datos = json.loads(self.rfile.read(longitud) or b"{}")
+        except ValueError:
+            self._enviar(400, {"error": "JSON no válido"})
+            return
+        self._recomendar(datos)
+
+    def _recomendar(self, datos):
+        servicio = self.server.servicio
+        comienzo = time.perf_counter()
+        medicion = metricas.consulta("servicio")
+        try:
+            with medicion:
+                cuerpo = servicio.recomendar(datos)
+        except ValueError as e:
+            servicio.registrar_error()
+            self._enviar(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._error_interno(e)
+            return
+        duracion = time.perf_counter() - comienzo
+        servicio.latencias.registrar(duracion)
+        cuerpo["latencia_ms"] = round(duracion * 1000, 3)
+        with medicion.etapa("enviar"):
+            self._enviar(200, cuerpo)
+        medicion.terminar()
+
+    # Un fallo inesperado del motor se registra y el cliente recibe un 500 (y
+    # no una conexión cerrada sin respuesta)
+    def _error_interno(self, error):
+        self.server.servicio.registrar_error()
+        print(f"⚠️ Error interno en {self.command} {self.path}: {error!r}", file=sys.stderr)
+        self._enviar(500, {"error": f"Error interno: {error}"})
+
+    def _enviar(self, estado, cuerpo):
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, formato, *argumentos):
+        if self.server.detallado:
+            super().log_message(formato, *argumentos)
+
+
+# Servidor HTTP que reparte las conexiones entre un número fijo de hilos (en
+# vez de crear uno por conexión como ThreadingHTTPServer)
+class ServidorRecomendaciones(HTTPServer):
+    # Conexiones en espera antes de rechazar (el valor por defecto, 5, provoca
+    # reintentos de un segundo en los clientes con carga concurrente)
+    request_queue_size = 128
+
+    def __init__(self, direccion, servicio, trabajadores=TRABAJADORES, detallado=False):
+        super().__init__(direccion, Manejador)
+        self.servicio = servicio
+        self.detallado = detallado
+        self.trabajadores = ThreadPoolExecutor(trabajadores, thread_name_prefix="servicio")
+
+    def process_request(self, request, client_address):
+        self.trabajadores.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.trabajadores.shutdown(wait=True)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON local del Asesor Inteligente")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--trabajadores", type=int, default=TRABAJADORES)
+    parser.add_argument("--dataset", default=motor.RUTA_DATASET)
+    parser.add_argument("--vigilar", action="store_true",
+                        help="Aplicar en caliente los cambios del CSV y de la carpeta deltas/")
+    parser.add_argument("--detallado", action="store_true", help="Registrar cada petición")
+    parser.add_argument("--metricas", metavar="RUTA",
+                        help="Medir las etapas de cada petición y exportarlas a este archivo JSON lines")
+    parser.add_argument("--perfilar", metavar="CARPETA", help="Guardar un cProfile de cada petición")
+    args = parser.parse_args(argumentos)
+
+    if args.metricas or args.perfilar:
+        metricas.instrumentacion.activar(args.metricas, args.perfilar)
+
+    vivo = CatalogoVivo(motor.cargar_catalogo(args.dataset), preparar=lambda catalogo: catalogo.buscador_modelos)
+    if args.vigilar:
+        VigilanteCatalogo(vivo, args.dataset).iniciar()
+
+    servidor = ServidorRecomendaciones((args.host, args.puerto), Servicio(vivo), args.trabajadores, args.detallado)
+    print(f"✅ {len(vivo.actual):,} vehículos; escuchando en http://{args.host}:{servidor.server_port}"
+          f" con {args.trabajadores} trabajadores")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
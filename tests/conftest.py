@@ -0,0 +1,43 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import motor  # noqa: E402
+
+CONSULTAS_AL_AZAR = 60
+
+
+@pytest.fixture(scope="session")
+def catalogo():
+    return motor.cargar_catalogo(usar_cache=False)
+
+
+# Consultas reproducibles con valores del propio catálogo (marcas, combustibles
+# y cuantiles de precio y potencia); cada filtro se usa con probabilidad 1/2
+@pytest.fixture(scope="session")
+def consultas(catalogo):
+    df = catalogo.df
+    azar = np.random.default_rng(0)
+    marcas = df["Company Names"].cat.categories
+    combustibles = df["Fuel Types"].cat.categories
+    lista = [{}]
+    for _ in range(CONSULTAS_AL_AZAR):
+        consulta = {}
+        if azar.random() < 0.5:
+            minimo, maximo = np.sort(np.nanquantile(df["Cars Prices"], azar.random(2)))
+            consulta.update(presupuesto_min=float(minimo), presupuesto_max=float(maximo))
+        if azar.random() < 0.5:
+            minimo, maximo = np.sort(np.nanquantile(df["HorsePower"], azar.random(2)))
+            consulta.update(hp_min=float(minimo), hp_max=float(maximo))
+        if azar.random() < 0.5:
+            consulta["asientos"] = int(azar.choice([2, 4, 5, 7]))
+        if azar.random() < 0.5:
+            consulta["combustible"] = str(azar.choice(combustibles))
+        if azar.random() < 0.5:
+            consulta["marca"] = str(azar.choice(marcas))
+        lista.append(consulta)
+    return lista
@@ -0,0 +1,52 @@
+# Las consultas sobre el almacén en disco (varios segmentos) deben dar lo mismo
+# que recomendar_top sobre el catálogo en memoria
+
+import pandas as pd
+import pytest
+
+import almacen
+import motor
+
+COLUMNAS = ["Company Names", "Cars Names", "Cars Prices", "HorsePower", "Seats", "Fuel Types",
+            "puntuacion_total"]
+
+
+@pytest.fixture(scope="module")
+def almacenado(tmp_path_factory):
+    directorio = str(tmp_path_factory.mktemp("almacen") / "catalogo")
+    almacen.ingerir_csv(motor.RUTA_DATASET, directorio, filas_por_segmento=200)
+    return almacen.AlmacenCatalogo(directorio)
+
+
+def test_almacen_igual_a_memoria(almacenado, catalogo, consultas):
+    assert len(almacenado) == len(catalogo)
+    assert len(almacenado.segmentos) > 1
+    for k in (1, motor.TOP_K, 50):
+        for respuestas in consultas:
+            obtenido, total = almacenado.recomendar_top(respuestas, k)
+            esperado, total_esperado = motor.recomendar_top(respuestas, catalogo, k, usar_cache=False)
+            assert total == total_esperado, respuestas
+            if total == 0:
+                assert obtenido.empty and esperado.empty
+                continue
+            pd.testing.assert_frame_equal(obtenido[COLUMNAS].reset_index(drop=True),
+                                          esperado[COLUMNAS].reset_index(drop=True),
+                                          check_categorical=False, check_dtype=False, obj=repr(respuestas))
+
+
+def test_almacen_k_no_valido(almacenado):
+    with pytest.raises(ValueError):
+        almacenado.recomendar_top({}, 0)
+
+
+# Sin ningún valor de potencia en el CSV, sus extremos son los de por defecto
+def test_almacen_extremos_sin_valores(tmp_path):
+    crudo = pd.read_csv(motor.RUTA_DATASET, encoding="latin1").head(300).assign(HorsePower="")
+    ruta = str(tmp_path / "DATASET.csv")
+    crudo.to_csv(ruta, index=False, encoding="latin1")
+    almacen.ingerir_csv(ruta, str(tmp_path / "catalogo"), filas_por_segmento=100)
+    almacenado = almacen.AlmacenCatalogo(str(tmp_path / "catalogo"))
+    assert (almacenado.min_hp, almacenado.max_hp) == motor.EXTREMOS_POR_DEFECTO
+    en_memoria = motor.cargar_catalogo(ruta, usar_cache=False)
+    assert (en_memoria.min_hp, en_memoria.max_hp) == motor.EXTREMOS_POR_DEFECTO
+    assert (almacenado.min_precio, almacenado.max_precio) == (en_memoria.min_precio, en_memoria.max_precio)
@@ -0,0 +1,67 @@
+# El árbol k-d de IndiceVecinos debe devolver los mismos vecinos que medir la
+# distancia a todos los puntos, también a igual distancia (menor posición
+# primero) y con una máscara de puntos permitidos
+
+import numpy as np
+import pytest
+
+from indices import MAX_DIRECTO, IndiceVecinos
+
+
+def vecinos_fuerza_bruta(puntos, punto, k, permitidas=None):
+    posiciones = np.arange(len(puntos)) if permitidas is None else np.flatnonzero(permitidas)
+    distancias = ((puntos[posiciones] - punto) ** 2).sum(axis=1)
+    orden = np.lexsort((posiciones, distancias))[:k]
+    return posiciones[orden], np.sqrt(distancias[orden])
+
+
+def comprobar(indice, puntos, punto, k, permitidas=None):
+    obtenidas, distancias = indice.vecinos(punto, k, permitidas)
+    esperadas, distancias_esperadas = vecinos_fuerza_bruta(puntos, punto, k, permitidas)
+    np.testing.assert_array_equal(obtenidas, esperadas)
+    np.testing.assert_array_equal(distancias, distancias_esperadas)
+
+
+# Puntos continuos y en una rejilla de enteros (muchos empates exactos), con
+# hojas pequeñas para que el árbol tenga varios niveles
+@pytest.mark.parametrize("rejilla", [False, True])
+@pytest.mark.parametrize("tamano_hoja", [1, 4, 32])
+def test_vecinos_igual_a_fuerza_bruta(rejilla, tamano_hoja):
+    azar = np.random.default_rng(0)
+    puntos = azar.integers(-3, 4, size=(3000, 3)).astype(float) if rejilla else azar.normal(size=(3000, 3))
+    indice = IndiceVecinos(puntos, tamano_hoja)
+    consultas = np.vstack([puntos[azar.integers(len(puntos), size=10)], azar.normal(scale=2, size=(10, 3))])
+    for punto in consultas:
+        for k in (1, 7, 50):
+            comprobar(indice, puntos, punto, k)
+
+
+# Con más de MAX_DIRECTO permitidos se recorre el árbol; con menos se mide
+# directamente
+@pytest.mark.parametrize("proporcion", [0.9, 0.5, 0.1])
+def test_vecinos_con_permitidas(proporcion):
+    azar = np.random.default_rng(1)
+    puntos = azar.integers(-4, 5, size=(6000, 2)).astype(float)
+    indice = IndiceVecinos(puntos, 8)
+    permitidas = azar.random(len(puntos)) < proporcion
+    assert (np.count_nonzero(permitidas) > MAX_DIRECTO) == (proporcion >= 0.5)
+    for punto in azar.normal(scale=3, size=(15, 2)):
+        for k in (1, 10, 40):
+            comprobar(indice, puntos, punto, k, permitidas)
+
+
+# Más vecinos pedidos que puntos: se devuelven todos, ordenados
+def test_vecinos_k_mayor_que_puntos():
+    azar = np.random.default_rng(2)
+    puntos = azar.normal(size=(20, 4))
+    indice = IndiceVecinos(puntos, 3)
+    comprobar(indice, puntos, np.zeros(4), 100)
+    comprobar(indice, puntos, np.zeros(4), 100, np.arange(20) % 3 == 0)
+
+
+# Sobre las características normalizadas del catálogo real
+def test_vecinos_catalogo(catalogo):
+    indice = catalogo.indice_similitud.arbol
+    azar = np.random.default_rng(3)
+    for posicion in azar.integers(len(indice), size=20):
+        comprobar(indice, indice.puntos, indice.puntos[posicion], 11)
@@ -0,0 +1,81 @@
+# Un perfil no válido no detiene el lote: sale con su error en su línea y los
+# demás clientes reciben sus recomendaciones, en el orden de la entrada
+
+import csv
+import json
+
+import pytest
+
+import lote
+import motor
+
+LINEAS = [
+    '{"cliente": "a", "presupuesto_max": 40000}',
+    '{"cliente": "infinito", "asientos": "inf"}',
+    '{"cliente": "desbordado", "asientos": 1e999}',
+    'esto no es JSON',
+    '{"cliente": "b", "marca": "toyota", "asientos": 5}',
+    '[1, 2, 3]',
+    '{"cliente": "booleano", "hp_min": true}',
+    '{"cliente": "c"}',
+]
+VALIDOS = {"a": {"presupuesto_max": 40000}, "b": {"marca": "toyota", "asientos": 5}, "c": {}}
+
+
+@pytest.fixture
+def entrada(tmp_path):
+    ruta = tmp_path / "perfiles.jsonl"
+    ruta.write_text("\n".join(LINEAS) + "\n", encoding="utf-8")
+    return str(ruta)
+
+
+def comprobar_registros(registros, catalogo, k):
+    assert [r["cliente"] for r in registros] == ["a", "infinito", "desbordado", 4, "b", 6, "booleano", "c"]
+    for registro in registros:
+        if registro["cliente"] not in VALIDOS:
+            assert registro["error"]
+            continue
+        esperado, total = motor.recomendar_top(VALIDOS[registro["cliente"]], catalogo, k)
+        assert registro["total"] == total
+        assert [f["modelo"] for f in registro["resultados"]] == esperado["Cars Names"].astype(str).tolist()
+
+
+def test_cli_jsonl_con_filas_no_validas(entrada, tmp_path, catalogo):
+    salida = str(tmp_path / "salida.jsonl")
+    lote.main([entrada, salida, "-k", "3", "--procesos", "1", "--bloque", "3"])
+    with open(salida, encoding="utf-8") as archivo:
+        comprobar_registros([json.loads(linea) for linea in archivo], catalogo, 3)
+
+
+def test_cli_csv_con_filas_no_validas(entrada, tmp_path):
+    salida = str(tmp_path / "salida.csv")
+    lote.main([entrada, salida, "-k", "2", "--procesos", "1"])
+    with open(salida, encoding="utf-8") as archivo:
+        filas = list(csv.DictReader(archivo))
+    errores = [fila["cliente"] for fila in filas if fila["error"]]
+    assert errores == ["infinito", "desbordado", "4", "6", "booleano"]
+    assert [fila["cliente"] for fila in filas if not fila["error"]] == ["a", "a", "b", "b", "c", "c"]
+
+
+# Si la puntuación del bloque falla, se repite perfil a perfil y solo sale con
+# error el perfil que falla
+def test_fallo_de_un_perfil_no_detiene_el_bloque(entrada, catalogo, monkeypatch):
+    recomendar_top = motor.recomendar_top
+
+    def falla_con_toyota(respuestas, *argumentos, **opciones):
+        if respuestas["marca"] == "toyota":
+            raise RuntimeError("fallo simulado")
+        return recomendar_top(respuestas, *argumentos, **opciones)
+
+    def falla_siempre(*argumentos, **opciones):
+        raise OverflowError("fallo simulado del bloque")
+
+    monkeypatch.setattr(lote, "_catalogo", catalogo)
+    monkeypatch.setattr(motor, "recomendar_lote", falla_siempre)
+    monkeypatch.setattr(motor, "recomendar_top", falla_con_toyota)
+    bloque = next(lote.leer_perfiles(entrada))
+    texto, n = lote.procesar_bloque(bloque, 3, "jsonl")
+    registros = [json.loads(linea) for linea in texto.splitlines()]
+    assert n == len(registros) == len(LINEAS)
+    assert registros[4] == {"cliente": "b", "error": "Error al recomendar: fallo simulado"}
+    assert registros[0]["total"] > 0 and registros[7]["total"] == len(catalogo)
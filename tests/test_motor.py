@@ -0,0 +1,266 @@
+# recomendar_top (selección parcial de los k primeros sobre los índices) debe
+# dar lo mismo que puntuar y ordenar todos los resultados con
+# recomendar_vehiculos y quedarse con los k primeros
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import motor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("k", [1, motor.TOP_K, 50])
+def test_recomendar_top_igual_a_recomendar_vehiculos(catalogo, consultas, k):
+    for respuestas in consultas:
+        obtenido, total = motor.recomendar_top(respuestas, catalogo, k, usar_cache=False)
+        completo = motor.recomendar_vehiculos(respuestas, catalogo)
+        assert total == len(completo), respuestas
+        pd.testing.assert_frame_equal(obtenido, completo.head(k), check_categorical=False,
+                                      obj=repr(respuestas))
+
+
+def test_recomendar_top_con_cache(catalogo, consultas):
+    for respuestas in consultas[:10]:
+        esperado, total = motor.recomendar_top(respuestas, catalogo, usar_cache=False)
+        for _ in range(2):
+            obtenido, total_cache = motor.recomendar_top(respuestas, catalogo)
+            assert total_cache == total
+            pd.testing.assert_frame_equal(obtenido, esperado)
+
+
+@pytest.mark.parametrize("k", [0, -1, 2.5, True, "3", None])
+def test_k_no_valido(catalogo, k):
+    with pytest.raises(ValueError):
+        motor.recomendar_top({}, catalogo, k)
+    with pytest.raises(ValueError):
+        motor.seleccionar_top(np.array([1.0, 2.0]), np.array([1.0, 2.0]), k)
+
+
+@pytest.mark.parametrize("asientos", ["inf", float("inf"), float("nan"), "muchos", [4]])
+def test_asientos_no_validos(asientos):
+    with pytest.raises(ValueError, match="asientos"):
+        motor.canonizar_respuestas({"asientos": asientos})
+
+
+# Un catálogo vacío, o con una columna sin ningún valor, muestra los extremos
+# por defecto en esa columna
+def test_extremos_sin_valores(catalogo):
+    vacio = motor.Catalogo(catalogo.df.iloc[:0])
+    for minimo, maximo in ((vacio.min_precio, vacio.max_precio), (vacio.min_asientos, vacio.max_asientos),
+                           (vacio.min_hp, vacio.max_hp)):
+        assert (minimo, maximo) == motor.EXTREMOS_POR_DEFECTO
+
+    sin_hp = motor.Catalogo(catalogo.df.assign(HorsePower=np.nan))
+    assert (sin_hp.min_hp, sin_hp.max_hp) == motor.EXTREMOS_POR_DEFECTO
+    assert (sin_hp.min_precio, sin_hp.max_precio) == (catalogo.min_precio, catalogo.max_precio)
+
+
+# Reordenar con otros pesos (matriz de componentes) debe dar lo mismo que volver
+# a puntuar con calcular_puntuacion usando esos pesos y ordenar por puntuación
+# y, a igual puntuación, por precio. Con solo la marca los empates son masivos.
+PESOS_PRUEBA = [
+    {"precio": 1, "caballos_fuerza": 0, "asientos": 0, "combustible": 0, "marca": 0},
+    {"precio": 0, "caballos_fuerza": 0, "asientos": 0, "combustible": 0, "marca": 1},
+    {"precio": 0.1, "caballos_fuerza": 0.6, "asientos": 0.1, "combustible": 0.1, "marca": 0.1},
+    {"precio": 3, "caballos_fuerza": 1, "asientos": 2, "combustible": 0.5, "marca": 0.25},
+]
+
+
+@pytest.mark.parametrize("pesos", PESOS_PRUEBA)
+def test_reponderar_igual_a_calcular_puntuacion(catalogo, consultas, pesos, monkeypatch):
+    normalizados = motor.normalizar_pesos(pesos)
+    for respuestas in consultas[:20]:
+        canonicas = motor.canonizar_respuestas(respuestas)
+        filtrados = catalogo.df.iloc[motor.filtrar_posiciones(canonicas, catalogo)]
+        with monkeypatch.context() as parche:
+            parche.setattr(motor, "PESOS", normalizados)
+            esperado = motor.calcular_puntuacion(filtrados, respuestas) if len(filtrados) else filtrados
+        if len(esperado):
+            esperado = esperado.sort_values(by=["puntuacion_total", "Cars Prices"], ascending=[False, True])
+
+        for inicio, cantidad in ((0, len(esperado)), (20, 20)):
+            obtenido, total = motor.recomendar_pagina(respuestas, catalogo, inicio, cantidad, pesos=pesos)
+            assert total == len(esperado)
+            parte = esperado.iloc[inicio:inicio + cantidad]
+            assert list(obtenido.index) == list(parte.index), respuestas
+            if len(parte):
+                np.testing.assert_array_equal(obtenido["puntuacion_total"], parte["puntuacion_total"])
+
+
+@pytest.mark.parametrize("pesos", [None, PESOS_PRUEBA[2]])
+def test_pagina_vacia(catalogo, pesos):
+    total = len(catalogo)
+    for inicio, cantidad in ((0, 0), (total, 20), (total + 50, 20), (5, 0)):
+        resultados, encontrados = motor.recomendar_pagina({}, catalogo, inicio, cantidad, pesos=pesos)
+        assert resultados.empty and encontrados == total
+
+
+# Capas de Pareto por fuerza bruta: se quitan una a una las filas que ninguna
+# otra de las que quedan domina (precio menor o igual, caballos y asientos
+# mayores o iguales y alguno estrictamente). Un dato que falta es el peor valor.
+def capas_fuerza_bruta(precios, hp, asientos):
+    puntos = np.column_stack([-precios, np.nan_to_num(hp, nan=-np.inf), np.nan_to_num(asientos, nan=-np.inf)])
+    capas = np.zeros(len(puntos), dtype=int)
+    capa = 0
+    while (capas == 0).any():
+        capa += 1
+        quedan = np.flatnonzero(capas == 0)
+        p = puntos[quedan]
+        al_menos = (p[:, None, :] >= p[None, :, :]).all(axis=2)
+        mejor = (p[:, None, :] > p[None, :, :]).any(axis=2)
+        capas[quedan[~(al_menos & mejor).any(axis=0)]] = capa
+    return capas
+
+
+# Pocos valores distintos (muchos repetidos y cadenas largas de igual potencia
+# y asientos) y datos que faltan
+def puntos_pareto(filas, semilla):
+    azar = np.random.default_rng(semilla)
+    precios = azar.integers(1, 40, size=filas).astype(float) * 1000
+    hp = azar.integers(50, 60, size=filas).astype(float)
+    asientos = azar.choice([2.0, 4.0, 5.0, 7.0], size=filas)
+    hp[azar.random(filas) < 0.05] = np.nan
+    asientos[azar.random(filas) < 0.05] = np.nan
+    return precios, hp, asientos
+
+
+@pytest.mark.parametrize("semilla", range(4))
+def test_capas_pareto_igual_a_fuerza_bruta(semilla):
+    precios, hp, asientos = puntos_pareto(600, semilla)
+    capas = capas_fuerza_bruta(precios, hp, asientos)
+    assert capas.max() > 2 * motor.CAPAS_POR_TANDA
+    np.testing.assert_array_equal(motor.skyline(precios, hp, asientos), capas == 1)
+
+    orden_esperado = np.lexsort((np.arange(len(capas)), capas))
+    for pedidas in (1, 37, 250, len(capas)):
+        orden, capa = motor.CapasPareto(precios, hp, asientos).hasta(pedidas)
+        # Al menos las pedidas, por capas completas y en orden de posición
+        assert len(orden) >= pedidas
+        assert len(orden) == len(capas) or capa[-1] < capas[orden_esperado[len(orden)]]
+        np.testing.assert_array_equal(orden, orden_esperado[:len(orden)])
+        np.testing.assert_array_equal(capa, capas[orden])
+
+
+def test_capas_pareto_catalogo(catalogo, consultas):
+    for respuestas in consultas[:10]:
+        resultados, total = motor.recomendar_pareto(respuestas, catalogo, 0, len(catalogo))
+        if total == 0:
+            continue
+        capas = capas_fuerza_bruta(resultados["Cars Prices"].to_numpy(dtype=float),
+                                   resultados["HorsePower"].to_numpy(dtype=float),
+                                   resultados["Seats"].to_numpy(dtype=float))
+        np.testing.assert_array_equal(resultados["capa_pareto"].to_numpy(), capas)
+        assert (np.diff(capas) >= 0).all()
+
+
+# recomendar_lote (filtros y puntuaciones como matrices perfiles x catálogo)
+# debe dar, perfil a perfil, lo mismo que recomendar_top, también con modelo y
+# filtros de especificaciones, sin resultados y repartido en varios bloques
+PERFILES_LOTE = [
+    {"marca": "ferrari", "modelo": "sf90 stradale"},
+    {"marca": "toyota", "modelo": "no existe"},
+    {"velocidad_min": 250, "aceleracion_max": 5},
+    {"torque_min": 400, "cilindrada_max": 3000, "combustible": "petrol"},
+    {"marca": "ferrari", "presupuesto_max": 10000},
+]
+
+
+@pytest.mark.parametrize("k", [1, motor.TOP_K, 50])
+@pytest.mark.parametrize("celdas", [motor.CELDAS_POR_BLOQUE, 5000])
+def test_recomendar_lote_igual_a_recomendar_top(catalogo, consultas, k, celdas, monkeypatch):
+    monkeypatch.setattr(motor, "CELDAS_POR_BLOQUE", celdas)
+    perfiles = consultas + PERFILES_LOTE
+    lote = motor.recomendar_lote(perfiles, catalogo, k)
+    assert len(lote) == len(perfiles)
+    for respuestas, (obtenido, total) in zip(perfiles, lote):
+        esperado, total_esperado = motor.recomendar_top(respuestas, catalogo, k, usar_cache=False)
+        assert total == total_esperado, respuestas
+        pd.testing.assert_frame_equal(obtenido, esperado, obj=repr(respuestas))
+
+
+# Cada sugerencia de sugerir_relajaciones debe dar las coincidencias que
+# anuncia (contadas aparte con recomendar_top), cambiar solo los criterios que
+# dice relajar y, si ajusta uno solo, llegar al mínimo pedido
+BUSQUEDAS_ESTRECHAS = [
+    {"marca": "ferrari", "presupuesto_max": 10000},
+    {"asientos": 7, "combustible": "electric", "hp_min": 500},
+    {"marca": "toyota", "hp_min": 400, "presupuesto_max": 30000, "velocidad_min": 200},
+    {"marca": "ferrari", "modelo": "sf90 stradale", "asientos": 4},
+]
+
+
+@pytest.mark.parametrize("minimo", [motor.TOP_K, 50])
+def test_sugerencias_dan_sus_coincidencias(catalogo, consultas, minimo):
+    probadas = 0
+    for respuestas in consultas + BUSQUEDAS_ESTRECHAS:
+        sugerencias = motor.sugerir_relajaciones(respuestas, catalogo, minimo)
+        _, total = motor.recomendar_top(respuestas, catalogo, usar_cache=False)
+        if total >= minimo:
+            assert sugerencias == []
+            continue
+        assert len(sugerencias) <= motor.MAX_SUGERENCIAS
+        canonicas = motor.canonizar_respuestas(respuestas)
+        for sugerencia in sugerencias:
+            _, coincidencias = motor.recomendar_top(sugerencia["respuestas"], catalogo, usar_cache=False)
+            assert coincidencias == sugerencia["coincidencias"], (respuestas, sugerencia)
+            if len(sugerencia["relajar"]) == 1:
+                assert coincidencias >= minimo
+            relajados = {campo for criterio in sugerencia["relajar"] for campo in motor.CAMPOS_PREGUNTA[criterio]}
+            cambiados = {campo for campo, valor in sugerencia["respuestas"].items() if valor != canonicas[campo]}
+            assert cambiados and cambiados <= relajados, (respuestas, sugerencia)
+            probadas += 1
+    assert probadas >= len(BUSQUEDAS_ESTRECHAS)
+
+
+# generar_explicaciones debe dar el mismo texto para la misma fila y las mismas
+# respuestas: en llamadas repetidas (con la caché de semillas vacía o llena),
+# con las respuestas escritas de otra forma, con las filas en otro orden o de
+# una en una, y en otro proceso con otra semilla de hash()
+CONSULTAS_EXPLICACIONES = [{}, {"marca": "toyota", "presupuesto_max": 60000}, {"combustible": "electric"},
+                           {"asientos": 7, "hp_min": 150}]
+GUION_EXPLICACIONES = """
+import json, sys
+import motor
+from test_motor import CONSULTAS_EXPLICACIONES
+catalogo = motor.cargar_catalogo(usar_cache=False)
+json.dump([motor.generar_explicaciones(motor.recomendar_top(respuestas, catalogo, 50, usar_cache=False)[0],
+                                       respuestas)
+           for respuestas in CONSULTAS_EXPLICACIONES], sys.stdout)
+"""
+
+
+def explicaciones_de_consultas(catalogo):
+    return [motor.generar_explicaciones(motor.recomendar_top(respuestas, catalogo, 50, usar_cache=False)[0],
+                                        respuestas)
+            for respuestas in CONSULTAS_EXPLICACIONES]
+
+
+def test_explicaciones_estables(catalogo):
+    esperadas = explicaciones_de_consultas(catalogo)
+    assert explicaciones_de_consultas(catalogo) == esperadas
+    motor._SEMILLAS_RESPUESTAS.invalidar()
+    assert explicaciones_de_consultas(catalogo) == esperadas
+
+    respuestas = CONSULTAS_EXPLICACIONES[1]
+    resultados = motor.recomendar_top(respuestas, catalogo, 50, usar_cache=False)[0]
+    otra_forma = {"presupuesto_max": "60000", "marca": "  TOYOTA "}
+    assert motor.generar_explicaciones(resultados, otra_forma) == esperadas[1]
+    orden = np.random.default_rng(0).permutation(len(resultados))
+    assert motor.generar_explicaciones(resultados.iloc[orden], respuestas) == [esperadas[1][i] for i in orden]
+    assert [motor.generar_explicacion(fila, respuestas) for _, fila in resultados.iterrows()] == esperadas[1]
+
+
+@pytest.mark.parametrize("semilla_hash", ["1", "2"])
+def test_explicaciones_iguales_en_otro_proceso(catalogo, semilla_hash):
+    entorno = dict(os.environ, PYTHONHASHSEED=semilla_hash,
+                   PYTHONPATH=os.pathsep.join([RAIZ, os.path.join(RAIZ, "tests")]))
+    salida = subprocess.run([sys.executable, "-c", GUION_EXPLICACIONES], cwd=RAIZ, env=entorno,
+                            capture_output=True, text=True, check=True).stdout
+    assert json.loads(salida) == explicaciones_de_consultas(catalogo)
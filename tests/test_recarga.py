@@ -0,0 +1,130 @@
+# La recarga en caliente debe dejar el mismo catálogo que cargar el CSV desde
+# cero (filas, orden, índices y recomendaciones) y etiquetas sin repetir
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import motor
+from recarga import CatalogoVivo, VigilanteCatalogo
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONSULTAS = [
+    {},
+    {"presupuesto_max": 40000},
+    {"asientos": 7},
+    {"marca": "toyota", "hp_min": 150},
+    {"combustible": "petrol", "presupuesto_min": 20000, "presupuesto_max": 90000},
+]
+
+
+@pytest.fixture
+def entorno(tmp_path):
+    ruta = str(tmp_path / "DATASET.csv")
+    shutil.copy(os.path.join(RAIZ, "DATASET.csv"), ruta)
+    vivo = CatalogoVivo(motor.cargar_catalogo(ruta, usar_cache=False))
+    vigilante = VigilanteCatalogo(vivo, ruta, carpeta_deltas=str(tmp_path / "deltas"))
+    return ruta, vivo, vigilante
+
+
+def escribir(ruta, crudo):
+    crudo.to_csv(ruta, index=False, encoding="latin1")
+    # Forzar una firma distinta aunque el tamaño y la hora coincidan
+    info = os.stat(ruta)
+    os.utime(ruta, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000))
+
+
+def comprobar_igual_a_carga(catalogo, ruta):
+    fresco = motor.cargar_catalogo(ruta, usar_cache=False)
+    assert not catalogo.df.index.duplicated().any()
+    pd.testing.assert_frame_equal(catalogo.df.reset_index(drop=True), fresco.df.reset_index(drop=True),
+                                  check_categorical=False)
+    for nombre in ("indice_precio", "indice_hp", "indice_asientos"):
+        indice, esperado = getattr(catalogo, nombre), getattr(fresco, nombre)
+        np.testing.assert_array_equal(indice.posiciones, esperado.posiciones)
+        np.testing.assert_array_equal(indice.ordenados, esperado.ordenados)
+    for nombre in ("indice_marca", "indice_combustible"):
+        indice, esperado = getattr(catalogo, nombre), getattr(fresco, nombre)
+        for clave, codigo in esperado.codigo_de.items():
+            np.testing.assert_array_equal(indice.buscar(clave), esperado.filas[codigo])
+    for respuestas in CONSULTAS:
+        obtenido, total = motor.recomendar_top(respuestas, catalogo, usar_cache=False)
+        esperado, total_esperado = motor.recomendar_top(respuestas, fresco, usar_cache=False)
+        assert total == total_esperado
+        pd.testing.assert_frame_equal(obtenido.reset_index(drop=True), esperado.reset_index(drop=True),
+                                      check_categorical=False)
+
+
+def test_recarga_igual_a_carga_desde_cero(entorno):
+    ruta, vivo, vigilante = entorno
+    crudo = pd.read_csv(ruta, encoding="latin1")
+
+    # Quitar una línea, editar otra, insertar una en medio y añadir otra al final
+    nuevo = crudo.drop(index=10).copy()
+    nuevo.loc[20, "Cars Prices"] = "$12,345"
+    insertada = crudo.iloc[[5]].assign(**{"Cars Names": "INSERTADO"})
+    final = crudo.iloc[[7]].assign(**{"Cars Names": "AL FINAL"})
+    nuevo = pd.concat([nuevo.loc[:29], insertada, nuevo.loc[30:], final], ignore_index=True)
+    escribir(ruta, nuevo)
+
+    assert vigilante.revisar()
+    comprobar_igual_a_carga(vivo.actual, ruta)
+
+    # Una segunda revisión sobre el catálogo ya recargado
+    nuevo = nuevo.drop(index=[0, 500]).copy()
+    nuevo.loc[100, "HorsePower"] = "999 hp"
+    escribir(ruta, pd.concat([nuevo, crudo.iloc[[3]]], ignore_index=True))
+    assert vigilante.revisar()
+    comprobar_igual_a_carga(vivo.actual, ruta)
+
+
+def test_etiquetas_unicas_tras_quitar_y_anadir(entorno):
+    ruta, vivo, vigilante = entorno
+    crudo = pd.read_csv(ruta, encoding="latin1")
+    escribir(ruta, pd.concat([crudo.drop(index=50), crudo.iloc[[1]].assign(**{"Cars Names": "NUEVO"})],
+                             ignore_index=True))
+    assert vigilante.revisar()
+    assert not vivo.actual.df.index.duplicated().any()
+    assert vivo.actual.df.index.min() >= 0
+
+
+def test_delta_y_csv(entorno, tmp_path):
+    ruta, vivo, vigilante = entorno
+    crudo = pd.read_csv(ruta, encoding="latin1")
+    os.makedirs(tmp_path / "deltas")
+    delta = crudo.iloc[[0]].assign(**{"Cars Prices": "$1"})
+    delta.to_csv(tmp_path / "deltas" / "cambio.csv", index=False, encoding="latin1")
+    assert vigilante.revisar()
+    assert (tmp_path / "deltas" / "procesados" / "cambio.csv").exists()
+
+    escribir(ruta, pd.concat([crudo, crudo.iloc[[2]].assign(**{"Cars Names": "OTRO"})], ignore_index=True))
+    assert vigilante.revisar()
+    df = vivo.actual.df
+    assert not df.index.duplicated().any()
+    assert len(df) == len(motor.cargar_catalogo(ruta, usar_cache=False).df)
+    assert (df["Cars Prices"] == 1).sum() == 1
+
+
+# Con "preparar", el catálogo se prepara antes de publicarse: una consulta
+# nunca ve un catálogo recargado sin el buscador de modelos construido
+def test_preparar_antes_de_publicar(entorno):
+    ruta, vivo, _ = entorno
+    publicados = []
+
+    def preparar(catalogo):
+        assert vivo.actual is not catalogo
+        catalogo.buscador_modelos
+        publicados.append(catalogo)
+
+    vivo = CatalogoVivo(vivo.actual, preparar=preparar)
+    vigilante = VigilanteCatalogo(vivo, ruta, carpeta_deltas=os.path.join(os.path.dirname(ruta), "deltas"))
+    crudo = pd.read_csv(ruta, encoding="latin1")
+    escribir(ruta, pd.concat([crudo, crudo.iloc[[4]].assign(**{"Cars Names": "RECIEN LLEGADO"})],
+                             ignore_index=True))
+    assert vigilante.revisar()
+    assert publicados == [vivo.actual]
+    assert vivo.actual._buscador is not None
+    assert motor.buscar_modelos("recien llegado", vivo.actual, 1)[0]["modelo"] == "RECIEN LLEGADO"
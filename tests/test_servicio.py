@@ -0,0 +1,51 @@
+# Las preferencias no válidas deben responderse con 400 (y no con un 500 del
+# motor); las válidas, con los mismos resultados que recomendar_top
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import motor
+import servicio
+from recarga import CatalogoVivo
+
+
+@pytest.fixture(scope="module")
+def url(catalogo):
+    servidor = servicio.ServidorRecomendaciones(("127.0.0.1", 0), servicio.Servicio(CatalogoVivo(catalogo)), 2)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield f"http://127.0.0.1:{servidor.server_port}/recommend"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def pedir(url, cuerpo):
+    peticion = urllib.request.Request(url, data=cuerpo.encode("utf-8"), method="POST")
+    try:
+        with urllib.request.urlopen(peticion) as respuesta:
+            return respuesta.status, json.load(respuesta)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+@pytest.mark.parametrize("cuerpo", [
+    '{"asientos": "inf"}', '{"asientos": 1e999}', '{"presupuesto_max": "Infinity"}', '{"hp_min": NaN}',
+    '{"asientos": true}', '{"k": 2.9}', '{"k": true}', '{"k": 0}', '{"k": 101}', '{"inicio": 1.5}',
+    '{"inicio": -1}', '{"color": "rojo"}', '[1, 2]',
+])
+def test_preferencias_no_validas(url, cuerpo):
+    estado, respuesta = pedir(url, cuerpo)
+    assert estado == 400, respuesta
+    assert "error" in respuesta
+
+
+def test_preferencias_validas(url, catalogo):
+    estado, respuesta = pedir(url, '{"asientos": "5", "k": 3.0, "presupuesto_max": 60000}')
+    assert estado == 200
+    esperado, total = motor.recomendar_top({"asientos": 5, "presupuesto_max": 60000}, catalogo, 3)
+    assert respuesta["total"] == total
+    assert [fila["Cars Names"] for fila in respuesta["resultados"]] == esperado["Cars Names"].astype(str).tolist()